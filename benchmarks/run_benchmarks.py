@@ -0,0 +1,345 @@
+"""
+benchmarks/run_benchmarks.py - Time the public service API on synthetic data
+
+Seeds a scratch database at each requested size (via tools/datagen.py),
+times every public method of the services in ``SERVICES`` in a fresh
+session per call, and writes the timings as JSON. With ``--compare`` the
+run is checked against a baseline file and exits non-zero when any
+method's median slows down by more than the threshold.
+
+    python -m benchmarks.run_benchmarks --sizes small,medium --out bench.json
+    python -m benchmarks.run_benchmarks --sizes small --compare bench.json
+    python -m benchmarks.run_benchmarks --current new.json --compare old.json
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+import config  # noqa: E402
+import models  # noqa: E402,F401  (registers tables)
+from models.result import Result  # noqa: E402
+from models.student import Student  # noqa: E402
+from models.subject import Subject  # noqa: E402
+from services import (  # noqa: E402
+    StudentService, ResultService, AnalyticsService, ReportService,
+    ClassService, SubjectService, TeacherService, AccountDirectory, RankingService,
+    SummaryService, ExamSessionService, ArchiveService, ResultChangeLog,
+    ReferenceDataService, DeletionService, GradeScaleService, RegradeService,
+)
+from tools.datagen import Scale, generate  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+SIZES = {
+    "small":  Scale(years=1, classes_per_year=5,  students_per_class=100, subjects_per_class=8),
+    "medium": Scale(years=1, classes_per_year=20, students_per_class=250, subjects_per_class=8),
+    "school": Scale(years=2, classes_per_year=50, students_per_class=200, subjects_per_class=8),
+    # "small" per session, with three past years behind it: current-term reads should match "small".
+    "history": Scale(years=4, classes_per_year=5, students_per_class=100, subjects_per_class=8),
+}
+SERVICES = (StudentService, ResultService, AnalyticsService, ReportService,
+            ClassService, SubjectService, TeacherService, AccountDirectory, RankingService,
+            SummaryService, ExamSessionService, ArchiveService, ResultChangeLog,
+            ReferenceDataService, DeletionService, GradeScaleService, RegradeService)
+
+
+class Context(NamedTuple):
+    exam_session_id: int    # the current session; class_id etc. have results in it
+    class_id: int
+    subject_id: int
+    student_id: int
+    result_id: int
+    teacher_id: int
+    spare_student_id: int   # belongs to class_id, has no results
+    out_dir: str
+
+
+class Case(NamedTuple):
+    args: Callable                       # (ctx, db) -> tuple of call args
+    teardown: Optional[Callable] = None  # (ctx, db, return_value) -> None
+
+
+def _student_fields(ctx, db):
+    s = db.get(Student, ctx.student_id)
+    return (s.id, s.admission_number, s.first_name, s.last_name,
+            s.gender, s.date_of_birth, s.class_id)
+
+
+def _new_student(ctx, db):
+    return StudentService(db).create(f"BENCH-{time.perf_counter_ns()}", "Bench", "Student", "Male")
+
+
+def _dirty_class(ctx, db):
+    RankingService(db).mark_dirty(ctx.class_id)
+    db.commit()
+    return [ctx.class_id]
+
+
+def _new_result(ctx, db):
+    return ResultService(db).add_result(ctx.spare_student_id, ctx.subject_id, 55.0)
+
+
+CASES = {
+    "StudentService": {
+        "get_all":          Case(lambda c, db: ()),
+        "get_by_id":        Case(lambda c, db: (c.student_id,)),
+        "get_by_admission": Case(lambda c, db: (db.get(Student, c.student_id).admission_number,)),
+        "get_by_class":     Case(lambda c, db: (c.class_id,)),
+        "search":           Case(lambda c, db: ("an", c.class_id, 1, 20)),
+        "search_rows":      Case(lambda c, db: ("an", c.class_id, 1, 20)),
+        "create":           Case(lambda c, db: (f"BENCH-{time.perf_counter_ns()}", "Bench", "Student", "Male"),
+                                 lambda c, db, ret: StudentService(db).delete(ret.id)),
+        "update":           Case(_student_fields),
+        "delete":           Case(lambda c, db: (_new_student(c, db).id,)),
+    },
+    "ResultService": {
+        "get_all":           Case(lambda c, db: ()),
+        "get_rows":          Case(lambda c, db: (c.class_id,)),
+        "get_row":           Case(lambda c, db: (c.result_id,)),
+        "get_by_id":         Case(lambda c, db: (c.result_id,)),
+        "get_by_student":    Case(lambda c, db: (c.student_id,)),
+        "transcript":        Case(lambda c, db: (c.student_id,)),
+        "get_by_subject":    Case(lambda c, db: (c.subject_id,)),
+        "get_class_results": Case(lambda c, db: (c.class_id,)),
+        "get_roster":        Case(lambda c, db: (c.subject_id,)),
+        "exists":            Case(lambda c, db: (c.student_id, c.subject_id)),
+        "add_result":        Case(lambda c, db: (c.spare_student_id, c.subject_id, 55.0),
+                                  lambda c, db, ret: ResultService(db).delete_result(ret.id)),
+        "update_result":     Case(lambda c, db: (c.result_id, db.get(Result, c.result_id).marks)),
+        "delete_result":     Case(lambda c, db: (_new_result(c, db).id,)),
+        "save_marks":        Case(lambda c, db: (c.subject_id, {c.spare_student_id: 55.0}),
+                                  lambda c, db, ret: ResultService(db).save_marks(
+                                      c.subject_id, {c.spare_student_id: None})),
+        "changes_since":     Case(lambda c, db: (0,)),
+        "change_seq":        Case(lambda c, db: ()),
+    },
+    "AnalyticsService": {
+        "class_average":     Case(lambda c, db: ()),
+        "subject_average":   Case(lambda c, db: ()),
+        "top_students":      Case(lambda c, db: (5,)),
+        "pass_fail_rate":    Case(lambda c, db: ()),
+        "gpa_distribution":  Case(lambda c, db: ()),
+        "total_stats":       Case(lambda c, db: ()),
+        "teacher_performance": Case(lambda c, db: (c.teacher_id,)),
+    },
+    "ReportService": {
+        "export_results_csv":           Case(lambda c, db: (os.path.join(c.out_dir, "results.csv"),)),
+        "generate_student_report_card": Case(lambda c, db: (c.student_id, os.path.join(c.out_dir, "card.pdf"))),
+        "generate_class_report_pdf":    Case(lambda c, db: (c.class_id, os.path.join(c.out_dir, "class.pdf"))),
+        "export_merit_list_csv":        Case(lambda c, db: (os.path.join(c.out_dir, "merit.csv"), c.class_id)),
+    },
+    "ClassService": {
+        "get_all":       Case(lambda c, db: ()),
+        "get_all_rows":  Case(lambda c, db: ()),
+        "get_by_id":     Case(lambda c, db: (c.class_id,)),
+    },
+    "SubjectService": {
+        "get_all":        Case(lambda c, db: ()),
+        "get_all_rows":   Case(lambda c, db: (c.teacher_id,)),
+        "get_by_id":      Case(lambda c, db: (c.subject_id,)),
+        "get_by_class":   Case(lambda c, db: (c.class_id,)),
+        "get_by_teacher": Case(lambda c, db: (c.teacher_id,)),
+    },
+    "TeacherService": {
+        "get_all":       Case(lambda c, db: ()),
+        "get_all_rows":  Case(lambda c, db: ()),
+        "get_by_id":     Case(lambda c, db: (c.teacher_id,)),
+        "get_by_email":  Case(lambda c, db: (f"teacher{c.teacher_id}@synthetic.local",)),
+    },
+    "AccountDirectory": {
+        "is_taken":      Case(lambda c, db: (db.get(Student, c.student_id).admission_number,)),
+        "resolve":       Case(lambda c, db: (db.get(Student, c.student_id).admission_number,)),
+    },
+    "RankingService": {
+        "refresh":           Case(lambda c, db: (_dirty_class(c, db),)),
+        "standing":          Case(lambda c, db: (c.student_id,)),
+        "subject_positions": Case(lambda c, db: (c.student_id,)),
+        "merit_list":        Case(lambda c, db: (c.class_id,)),
+        "top_students":      Case(lambda c, db: (10,)),
+    },
+    "SummaryService": {
+        "get":               Case(lambda c, db: (c.student_id,)),
+        "refresh":           Case(lambda c, db: (c.student_id,), lambda c, db, ret: db.commit()),
+    },
+    "ExamSessionService": {
+        "get_all":           Case(lambda c, db: ()),
+        "get_by_id":         Case(lambda c, db: (c.exam_session_id,)),
+        "current":           Case(lambda c, db: ()),
+        "current_id":        Case(lambda c, db: ()),
+        "resolve":           Case(lambda c, db: (None,)),
+        "is_archived":       Case(lambda c, db: (c.exam_session_id,)),
+    },
+    "ArchiveService": {
+        "archived_years":    Case(lambda c, db: ()),
+    },
+    "ResultChangeLog": {
+        "head":              Case(lambda c, db: ()),
+        "since":             Case(lambda c, db: (0,)),
+    },
+    "ReferenceDataService": {
+        "get":               Case(lambda c, db: ()),
+    },
+    "DeletionService": {
+        "delete_class":      Case(lambda c, db: (c.class_id, True)),
+        "delete_subject":    Case(lambda c, db: (c.subject_id, True)),
+        "delete_student":    Case(lambda c, db: (_new_student(c, db).id,)),
+    },
+    "GradeScaleService": {
+        "get":               Case(lambda c, db: ()),
+        "for_class":         Case(lambda c, db: (c.class_id,)),
+        "for_student":       Case(lambda c, db: (c.student_id,)),
+        "groups":            Case(lambda c, db: ()),
+        "scales":            Case(lambda c, db: ()),
+    },
+    "RegradeService": {
+        "regrade":           Case(lambda c, db: (c.class_id,)),
+    },
+}
+
+
+def public_methods(cls):
+    return [name for name, fn in inspect.getmembers(cls, inspect.isfunction)
+            if not name.startswith("_")]
+
+
+def build_context(db, out_dir):
+    session_id = ExamSessionService(db).current_id()
+    r = db.query(Result).filter(Result.exam_session_id == session_id).order_by(Result.id).first()
+    student = db.get(Student, r.student_id)
+    spare = StudentService(db).create("BENCH-SPARE", "Spare", "Student", "Female",
+                                      class_id=student.class_id)
+    return Context(exam_session_id=session_id, class_id=student.class_id, subject_id=r.subject_id, student_id=student.id,
+                   result_id=r.id, teacher_id=db.get(Subject, r.subject_id).teacher_id,
+                   spare_student_id=spare.id, out_dir=out_dir)
+
+
+def time_case(Session, svc_cls, name, case, ctx, repeat):
+    timings = []
+    for _ in range(repeat):
+        db = Session()
+        try:
+            args = case.args(ctx, db)
+            db.expire_all()
+            fn = getattr(svc_cls(db), name)
+            start = time.perf_counter()
+            ret = fn(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+            if case.teardown:
+                case.teardown(ctx, db, ret)
+        finally:
+            db.close()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "runs": len(timings),
+    }
+
+
+def run_size(size_name, url, repeat, work_dir):
+    scale = SIZES[size_name]
+    url = url or f"sqlite:///{os.path.join(work_dir, f'bench_{size_name}.db')}"
+    engine = create_engine(url)
+    # Services that open their own sessions must hit the same scratch database.
+    config.SessionLocal.configure(bind=engine)
+    config.Base.metadata.drop_all(engine)
+    config.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    started = time.perf_counter()
+    counts = generate(engine, scale, password=None)
+    seed_s = time.perf_counter() - started
+    db = Session()
+    ctx = build_context(db, work_dir)
+    db.close()
+    logger.info(f"[{size_name}] seeded {counts} in {seed_s:.1f}s")
+
+    methods, skipped = {}, []
+    for svc_cls in SERVICES:
+        cases = CASES.get(svc_cls.__name__, {})
+        for name in public_methods(svc_cls):
+            key = f"{svc_cls.__name__}.{name}"
+            if name not in cases:
+                skipped.append(key)
+                continue
+            methods[key] = time_case(Session, svc_cls, name, cases[name], ctx, repeat)
+            logger.info(f"[{size_name}] {key}: {methods[key]['median_ms']} ms")
+    engine.dispose()
+    return {"scale": counts, "seed_seconds": round(seed_s, 2),
+            "methods": methods, "skipped": skipped}
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float):
+    """Return a list of (size, method, old_ms, new_ms) regressions."""
+    regressions = []
+    for size, data in current["sizes"].items():
+        old_methods = baseline.get("sizes", {}).get(size, {}).get("methods", {})
+        for method, stats in data["methods"].items():
+            old = old_methods.get(method)
+            if not old:
+                continue
+            old_ms, new_ms = old["median_ms"], stats["median_ms"]
+            if new_ms > old_ms * (1 + threshold) and new_ms - old_ms > min_delta_ms:
+                regressions.append((size, method, old_ms, new_ms))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="small", help=f"comma list of {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--url", help="scratch database URL (dropped and re-seeded!); default: temp SQLite")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--current", help="skip the run and compare this results file instead")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail on regressions against this file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore slowdowns below this")
+    args = parser.parse_args(argv)
+
+    if args.current:
+        current = json.loads(Path(args.current).read_text())
+    else:
+        sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in SIZES]
+        if unknown:
+            parser.error(f"unknown size(s): {', '.join(unknown)}")
+        current = {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.url.split("://")[0] if args.url else "sqlite",
+            "sizes": {},
+        }
+        with tempfile.TemporaryDirectory(prefix="serms_bench_") as work_dir:
+            for size in sizes:
+                current["sizes"][size] = run_size(size, args.url, args.repeat, work_dir)
+        Path(args.out).write_text(json.dumps(current, indent=2))
+        logger.info(f"Benchmark results written to {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+        for size, method, old_ms, new_ms in regressions:
+            print(f"REGRESSION [{size}] {method}: {old_ms:.2f} ms -> {new_ms:.2f} ms")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,11 @@ config.py - Application configuration and database setup
 """
 import os
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from urllib.parse import quote_plus
 
 # Load environment variables
@@ -37,14 +38,28 @@ DATABASE_URL = f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT
 # SQLAlchemy setup
 engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Thread-local session registry. The UI thread gets one short-lived session per
+# Tk event (see utils/unit_of_work.py); worker threads get their own.
+ScopedSession = scoped_session(SessionLocal)
 Base = declarative_base()
 
+# Password hashing: bcrypt cost is calibrated once to this latency and stored
+# in app_settings; BCRYPT_ROUNDS pins it explicitly.
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "0")) or None
+
+# Result change feed: changes older than this are pruned at startup.
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+
 # Application constants
 APP_TITLE = "School Examination Results Management System"
 APP_VERSION = "1.0.0"
 WINDOW_SIZE = "1280x780"
 
-# Grade scale
+# Grade scale: the default scale seeded into grade_scales on first run, and
+# the fallback of Result.calculate_grade_gpa. Edit scales in the app after
+# that; bands start at ``low`` and run up to the next band. A mark passes
+# from the lowest band with a GPA above zero (D here).
 GRADE_SCALE = [
     (80, 100, "A", 4.0, "Distinction"),
     (70, 79,  "B", 3.0, "Credit"),
@@ -109,6 +124,7 @@ NAV_ICONS = {
     "My Profile":           "\U0001f464",
     "My Subjects & Marks":  "\u270f\ufe0f",
     "My Class Performance": "\U0001f4c8",
+    "Diagnostics":          "\U0001f6e0",
 }
 
 
@@ -121,11 +137,26 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def session_scope():
+    """Short-lived unit of work: commit on success, rollback on error, always close."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def init_db():
-    """Initialize database — create all tables."""
+    """Initialize database — create all tables and apply pending migrations."""
+    from migrations import upgrade
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully.")
+        version = upgrade(engine, Base.metadata)
+        logger.info(f"Database tables ready (schema version {version}).")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
         raise
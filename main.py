@@ -6,15 +6,38 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # ── Bootstrap ─────────────────────────────────────────────────────────────────
-from config import init_db, SessionLocal, COLORS, FONTS, APP_TITLE, WINDOW_SIZE
+from config import (
+    init_db, engine, SessionLocal, COLORS, FONTS, APP_TITLE, WINDOW_SIZE, CHANGE_LOG_RETENTION_DAYS,
+)
 from utils.ui_helpers import apply_treeview_style, center_window
+from utils import unit_of_work, query_profiler
 from services.auth_service import AuthService
+from services.account_directory import AccountDirectory
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService
+from services.ranking_service import RankingService
+from services.result_change_log import ResultChangeLog
+from services.summary_service import SummaryService
 
 logger = logging.getLogger(__name__)
 
 
+def _prepare_database(db):
+    """Backfill derived tables and seed defaults; each step is a no-op once done."""
+    AccountDirectory(db).sync_if_empty()                # login directory
+    ExamSessionService(db).ensure_current()             # an open exam session
+    GradeScaleService(db).sync_if_empty()               # default grade scale
+    SummaryService(db).sync_if_empty()                  # student summaries
+    RankingService(db).sync_if_empty()                  # queue classes for ranking
+    ResultChangeLog(db).prune(CHANGE_LOG_RETENTION_DAYS)
+    auth = AuthService(db)
+    auth.configure_hashing()                            # bcrypt cost, first run only
+    auth.seed_default_admin()
+
+
 class Application(tk.Tk):
     """Root application controller."""
 
@@ -44,13 +67,19 @@ class Application(tk.Tk):
             self.destroy()
             sys.exit(1)
 
-        # Seed default admin if needed
+        # One short-lived session per UI action instead of one per dashboard
+        unit_of_work.install(self)
+        query_profiler.install(engine)
+
         db = SessionLocal()
         try:
-            AuthService(db).seed_default_admin()
+            _prepare_database(db)
         finally:
             db.close()
 
+        # bcrypt verification is deliberately slow; keep it off the Tk thread
+        self._login_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="login")
+        self._login_future = None
         self._current_dashboard = None
         self._current_login_window = None
         self._show_home()
@@ -95,13 +124,36 @@ class Application(tk.Tk):
             self, on_login_success=self._authenticate,
             on_back_home=self._show_home
         )
-    def _authenticate(self, email: str, password: str, admission_number: str = None):
+    @staticmethod
+    def _login_worker(email: str, password: str, admission_number: str = None):
         db = SessionLocal()
         try:
-            user, role = AuthService(db).login(email, password, admission_number)
+            return AuthService(db).login(email, password, admission_number)
         finally:
             db.close()
 
+    def _authenticate(self, email: str, password: str, admission_number: str = None):
+        if self._login_future and not self._login_future.done():
+            return  # a sign-in is already being verified
+        self._set_login_busy(True)
+        self._login_future = self._login_executor.submit(
+            self._login_worker, email, password, admission_number)
+        self.after(30, self._poll_login)
+
+    def _poll_login(self):
+        future = self._login_future
+        if not future.done():
+            self.after(30, self._poll_login)
+            return
+        self._login_future = None
+        self._set_login_busy(False)
+        try:
+            user, role = future.result()
+        except Exception as e:
+            logger.error(f"Login error: {e}")
+            messagebox.showerror("Login Failed", f"Could not sign in.\n\n{e}")
+            return
+
         if not user:
             messagebox.showerror("Login Failed",
                                  "Invalid credentials. Please try again.")
@@ -114,6 +166,11 @@ class Application(tk.Tk):
 
         self._launch_dashboard(user, role)
 
+    def _set_login_busy(self, busy: bool):
+        win = self._current_login_window
+        if win is not None and win.winfo_exists():
+            win.configure(cursor="watch" if busy else "")
+
     def _launch_dashboard(self, user, role: str):
         self.deiconify()
         # Clear old dashboard if any
@@ -137,13 +194,10 @@ class Application(tk.Tk):
             self._logout()
 
     def _logout(self):
+        query_profiler.log_report()
         if self._current_dashboard:
             # Close any open db sessions
-            if hasattr(self._current_dashboard, "_db"):
-                try:
-                    self._current_dashboard._db.close()
-                except Exception:
-                    pass
+            unit_of_work.release()
         for widget in self.winfo_children():
             widget.destroy()
         self._current_dashboard = None
@@ -153,6 +207,7 @@ class Application(tk.Tk):
 def main():
     app = Application()
     app.mainloop()
+    app._login_executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""
+migrations/__init__.py - Ordered schema migrations tracked in schema_migrations
+
+``create_all`` only creates missing tables; it never adds indexes or columns
+to tables that already exist. Changes like that ship as numbered modules in
+this package, each with ``VERSION``, ``DESCRIPTION`` and ``upgrade(conn)``.
+A fresh database already gets the current schema from the models, so every
+migration is stamped as applied without running. Derived tables whose key
+changes are simply dropped by their migration; ``create_all`` runs again
+afterwards and brings them back in their current shape, empty.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect
+from . import m001_hot_query_indexes, m002_exam_sessions, m003_archive
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    m001_hot_query_indexes,
+    m002_exam_sessions,
+    m003_archive,
+]
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def upgrade(engine, metadata):
+    """Create missing tables from *metadata*, then apply (or stamp) pending migrations."""
+    fresh = not inspect(engine).get_table_names()
+    metadata.create_all(bind=engine)
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = {v for (v,) in conn.execute(schema_migrations.select().with_only_columns(
+            schema_migrations.c.version))}
+    for migration in MIGRATIONS:
+        if migration.VERSION in applied:
+            continue
+        with engine.begin() as conn:
+            if not fresh:
+                logger.info(f"Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+                migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.VERSION, description=migration.DESCRIPTION,
+                applied_at=datetime.utcnow()))
+    metadata.create_all(bind=engine)
+    return current_version(engine)
+
+
+def current_version(engine) -> int:
+    with engine.connect() as conn:
+        versions = [v for (v,) in conn.execute(schema_migrations.select().with_only_columns(
+            schema_migrations.c.version))]
+    return max(versions, default=0)
@@ -0,0 +1,104 @@
+"""
+migrations/m002_exam_sessions.py - Key results by exam session
+
+Adds ``results.exam_session_id`` (existing marks go to one session, made
+current), replaces the (student, subject) unique key with (session, student,
+subject) and moves the grade / marks indexes behind the session column.
+Student summaries and rankings are now kept per session; their old tables
+are dropped here, re-created by ``migrations.upgrade`` and refilled from the
+results at startup (``sync_if_empty``).
+"""
+from datetime import datetime
+from sqlalchemy import (
+    Column, ForeignKeyConstraint, Index, Integer, MetaData, Table, UniqueConstraint,
+    func, inspect, literal, select, text,
+)
+
+VERSION = 2
+DESCRIPTION = "Exam sessions on results; per-session summaries and rankings"
+
+UNIQUE_KEY = ("uq_result_session_student_subject", ("exam_session_id", "student_id", "subject_id"))
+NEW_INDEXES = [
+    ("ix_results_session_subject_marks", ("exam_session_id", "subject_id", "marks")),
+    ("ix_results_session_grade", ("exam_session_id", "grade")),
+    ("ix_results_session_marks", ("exam_session_id", "marks")),
+]
+REPLACED = {"uq_student_subject", "ix_results_grade", "ix_results_marks"}
+DERIVED_TABLES = ("student_summaries", "class_rankings", "subject_rankings", "ranking_dirty_classes")
+
+
+def upgrade(conn):
+    # Reflect rather than import the models, so this migration keeps
+    # describing the schema as it was when it was written.
+    if "exam_session_id" not in {c["name"] for c in inspect(conn).get_columns("results")}:
+        session_id = _legacy_session(conn)
+        if conn.dialect.name == "sqlite":
+            _rebuild_sqlite(conn, session_id)
+        else:
+            _alter(conn, session_id)
+
+    metadata = MetaData()
+    for name in DERIVED_TABLES:
+        if inspect(conn).has_table(name):
+            Table(name, metadata, autoload_with=conn).drop(conn)
+
+
+def _legacy_session(conn):
+    """Return the current session (exam_sessions was just created empty), opening one if needed."""
+    metadata = MetaData()
+    sessions = Table("exam_sessions", metadata, autoload_with=conn)
+    current = conn.execute(select(sessions.c.id).where(sessions.c.is_current.is_(True))).scalar()
+    if current is not None:
+        return current
+    classes = Table("classes", metadata, autoload_with=conn)
+    year = conn.execute(select(func.max(classes.c.academic_year))).scalar() or str(datetime.now().year)
+    return conn.execute(sessions.insert().values(
+        name=f"Term 1 {year}", academic_year=year, term=1, is_current=True,
+        created_at=datetime.utcnow())).inserted_primary_key[0]
+
+
+def _alter(conn, session_id):
+    inspector = inspect(conn)
+    existing = ({ix["name"] for ix in inspector.get_indexes("results")}
+                | {uq["name"] for uq in inspector.get_unique_constraints("results")})
+    conn.execute(text("ALTER TABLE results ADD COLUMN exam_session_id INTEGER NULL"))
+    conn.execute(text("UPDATE results SET exam_session_id = :s"), {"s": session_id})
+    # One ALTER, so MySQL rebuilds the table once for all of the key changes.
+    uq_name, uq_cols = UNIQUE_KEY
+    clauses = [
+        "MODIFY exam_session_id INTEGER NOT NULL",
+        "ADD CONSTRAINT fk_results_exam_session FOREIGN KEY (exam_session_id) REFERENCES exam_sessions (id)",
+        f"ADD CONSTRAINT {uq_name} UNIQUE ({', '.join(uq_cols)})",
+        *(f"ADD INDEX {name} ({', '.join(cols)})" for name, cols in NEW_INDEXES),
+        *(f"DROP INDEX {name}" for name in sorted(REPLACED & existing)),
+    ]
+    conn.execute(text(f"ALTER TABLE results {', '.join(clauses)}"))
+
+
+def _rebuild_sqlite(conn, session_id):
+    """SQLite cannot drop a table constraint, so copy the rows into a rebuilt table."""
+    conn.execute(text("ALTER TABLE results RENAME TO results_old"))
+    metadata = MetaData()
+    old = Table("results_old", metadata, autoload_with=conn)
+    Table("exam_sessions", metadata, autoload_with=conn)
+    kept = [(ix.name, [c.name for c in ix.columns]) for ix in old.indexes if ix.name not in REPLACED]
+    for index in list(old.indexes):
+        index.drop(conn)
+
+    uq_name, uq_cols = UNIQUE_KEY
+    results = Table(
+        "results", metadata,
+        *(Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in old.columns),
+        Column("exam_session_id", Integer, nullable=False),
+        *(ForeignKeyConstraint([fk.parent.name], [f"{fk.column.table.name}.{fk.column.name}"])
+          for fk in old.foreign_keys),
+        ForeignKeyConstraint(["exam_session_id"], ["exam_sessions.id"]),
+        UniqueConstraint(*uq_cols, name=uq_name),
+    )
+    results.create(conn)
+    conn.execute(results.insert().from_select(
+        [c.name for c in old.columns] + ["exam_session_id"],
+        select(*old.columns, literal(session_id))))
+    old.drop(conn)
+    for name, cols in kept + NEW_INDEXES:
+        Index(name, *(results.c[c] for c in cols)).create(conn)
@@ -0,0 +1,15 @@
+"""
+migrations/m003_archive.py - Mark exam sessions whose academic year was archived
+
+Adds the nullable ``exam_sessions.archived_at`` column. The archive tables
+themselves are new and come from ``create_all``.
+"""
+from sqlalchemy import inspect, text
+
+VERSION = 3
+DESCRIPTION = "Archived flag on exam sessions"
+
+
+def upgrade(conn):
+    if "archived_at" not in {c["name"] for c in inspect(conn).get_columns("exam_sessions")}:
+        conn.execute(text("ALTER TABLE exam_sessions ADD COLUMN archived_at DATETIME NULL"))
@@ -3,3 +3,11 @@ from .student import Student
 from .class_model import Class
 from .subject import Subject
 from .result import Result
+from .exam_session import ExamSession
+from .app_setting import AppSetting
+from .account import Account
+from .ranking import ClassRanking, SubjectRanking, RankingDirtyClass
+from .student_summary import StudentSummary
+from .result_change import ResultChange
+from .archive import ArchivedResult, ArchivedStanding
+from .grade_scale import GradeScale, GradeBand
@@ -0,0 +1,22 @@
+"""
+models/account.py - Unified login directory across admins, teachers and students
+"""
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from config import Base
+
+
+class Account(Base):
+    """One row per login: lower-cased email (admin/teacher) or admission number (student)."""
+    __tablename__ = "accounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String(150), unique=True, nullable=False, index=True)
+    role = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("role", "user_id", name="uq_account_user"),
+    )
+
+    def __repr__(self):
+        return f"<Account {self.role}:{self.user_id} login={self.login}>"
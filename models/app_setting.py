@@ -0,0 +1,17 @@
+"""
+models/app_setting.py - Key/value application settings stored in the database
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from config import Base
+
+
+class AppSetting(Base):
+    __tablename__ = "app_settings"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AppSetting {self.key}={self.value}>"
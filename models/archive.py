@@ -0,0 +1,76 @@
+"""
+models/archive.py - Read-only archive of closed academic years
+
+ArchiveService moves a year's results out of the live tables into these two
+denormalized tables: one row per result (with its subject position) and one
+row per student and session (with the frozen summary and positions). Names
+are copied in, so rows stay readable after the year's students, classes and
+subjects are removed. On MySQL both tables use compressed InnoDB pages.
+"""
+from sqlalchemy import Column, Integer, Float, String, Index
+from config import Base
+
+ARCHIVE_TABLE_ARGS = {"mysql_engine": "InnoDB", "mysql_row_format": "COMPRESSED"}
+
+
+class ArchivedResult(Base):
+    __tablename__ = "archived_results"
+
+    result_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, nullable=False)
+    academic_year = Column(String(20), nullable=False)
+    student_id = Column(Integer, nullable=False)
+    admission_number = Column(String(30), nullable=False)
+    first_name = Column(String(80), nullable=False)
+    last_name = Column(String(80), nullable=False)
+    class_id = Column(Integer, nullable=True)
+    class_name = Column(String(80), nullable=True)
+    subject_id = Column(Integer, nullable=False)
+    subject_name = Column(String(100), nullable=False)
+    marks = Column(Float, nullable=False)
+    grade = Column(String(5), nullable=False)
+    gpa = Column(Float, nullable=False)
+    remarks = Column(String(50), nullable=False)
+    position = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_archived_results_student", "exam_session_id", "student_id"),
+        Index("ix_archived_results_class", "exam_session_id", "class_id"),
+        Index("ix_archived_results_subject", "exam_session_id", "subject_id", "marks"),
+        Index("ix_archived_results_grade", "exam_session_id", "grade"),
+        ARCHIVE_TABLE_ARGS,
+    )
+
+    def __repr__(self):
+        return f"<ArchivedResult id={self.result_id} session={self.exam_session_id} marks={self.marks}>"
+
+
+class ArchivedStanding(Base):
+    __tablename__ = "archived_standings"
+
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, primary_key=True, autoincrement=False)
+    academic_year = Column(String(20), nullable=False)
+    admission_number = Column(String(30), nullable=False)
+    first_name = Column(String(80), nullable=False)
+    last_name = Column(String(80), nullable=False)
+    class_id = Column(Integer, nullable=True)
+    class_name = Column(String(80), nullable=True)
+    subjects = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    average = Column(Float, nullable=False)
+    average_gpa = Column(Float, nullable=False)
+    passed = Column(Integer, nullable=False)
+    division = Column(String(50), nullable=False)
+    class_position = Column(Integer, nullable=True)
+    year_position = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_archived_standings_class_position", "exam_session_id", "class_id", "class_position"),
+        Index("ix_archived_standings_year_position", "exam_session_id", "year_position"),
+        Index("ix_archived_standings_average", "exam_session_id", "average"),
+        ARCHIVE_TABLE_ARGS,
+    )
+
+    def __repr__(self):
+        return f"<ArchivedStanding student={self.student_id} session={self.exam_session_id} avg={self.average:.1f}>"
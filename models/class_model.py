@@ -2,7 +2,7 @@
 models/class_model.py - Class ORM model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
@@ -15,6 +15,10 @@ class Class(Base):
     academic_year = Column(String(20), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_classes_class_name", "class_name"),
+    )
+
     # Relationships
     students = relationship("Student", back_populates="class_", lazy="select")
     subjects = relationship("Subject", back_populates="class_", lazy="select")
@@ -0,0 +1,29 @@
+"""
+models/exam_session.py - Exam session (term within an academic year) ORM model
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, UniqueConstraint
+from sqlalchemy.orm import relationship
+from config import Base
+
+
+class ExamSession(Base):
+    __tablename__ = "exam_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(80), nullable=False)
+    academic_year = Column(String(20), nullable=False)
+    term = Column(Integer, nullable=False)
+    is_current = Column(Boolean, nullable=False, default=False, index=True)
+    archived_at = Column(DateTime, nullable=True)  # set once the year is moved to the archive
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("academic_year", "term", name="uq_exam_session_year_term"),
+    )
+
+    # Relationships
+    results = relationship("Result", back_populates="exam_session", lazy="select")
+
+    def __repr__(self):
+        return f"<ExamSession id={self.id} name={self.name} current={self.is_current} archived={self.archived_at is not None}>"
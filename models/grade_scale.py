@@ -0,0 +1,57 @@
+"""
+models/grade_scale.py - Grade scales stored as data, versioned and assignable
+
+A scale applies to one class (``class_id``), to every class of one academic
+year (``academic_year``) or, with neither set, to everything else. Changing
+a scale's bands adds a new version row and retires the old one, so earlier
+boundaries stay on record. Bands only store where they start; a band ends
+where the next one begins. ``class_id`` is a plain id like the ranking
+tables', so deleting a class retires its scale instead of failing.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from config import Base
+
+
+class GradeScale(Base):
+    __tablename__ = "grade_scales"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(80), nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    class_id = Column(Integer, nullable=True)
+    academic_year = Column(String(20), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    retired_at = Column(DateTime, nullable=True)  # set when a newer version replaces it
+
+    __table_args__ = (
+        Index("ix_grade_scales_class", "class_id"),
+        Index("ix_grade_scales_year", "academic_year"),
+    )
+
+    bands = relationship("GradeBand", back_populates="scale", cascade="all, delete-orphan",
+                         order_by="GradeBand.min_marks.desc()")
+
+    def __repr__(self):
+        return f"<GradeScale {self.name} v{self.version} class={self.class_id} year={self.academic_year}>"
+
+
+class GradeBand(Base):
+    __tablename__ = "grade_bands"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scale_id = Column(Integer, ForeignKey("grade_scales.id"), nullable=False)
+    min_marks = Column(Float, nullable=False)
+    grade = Column(String(5), nullable=False)
+    gpa = Column(Float, nullable=False)
+    remarks = Column(String(50), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("scale_id", "min_marks", name="uq_grade_band_scale_start"),
+    )
+
+    scale = relationship("GradeScale", back_populates="bands")
+
+    def __repr__(self):
+        return f"<GradeBand {self.grade} from {self.min_marks}>"
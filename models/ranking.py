@@ -0,0 +1,64 @@
+"""
+models/ranking.py - Stored class, year and subject positions (derived from results)
+
+Rows are rebuilt per class and exam session by RankingService from the
+results table, so they carry plain indexed ids rather than foreign keys. A
+(class, session) pair is queued in ``ranking_dirty_classes`` whenever its
+marks or membership change.
+"""
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index, func
+from config import Base
+
+
+class ClassRanking(Base):
+    """One row per ranked student and session: overall averages and positions."""
+    __tablename__ = "class_rankings"
+
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, primary_key=True, autoincrement=False)
+    class_id = Column(Integer, nullable=False)
+    academic_year = Column(String(20), nullable=False)
+    subjects = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    average = Column(Float, nullable=False)
+    average_gpa = Column(Float, nullable=False)
+    class_position = Column(Integer, nullable=False)
+    year_position = Column(Integer, nullable=True)
+    computed_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_class_rankings_class_position", "exam_session_id", "class_id", "class_position"),
+        Index("ix_class_rankings_year_position", "exam_session_id", "academic_year", "year_position"),
+        Index("ix_class_rankings_average", "exam_session_id", "average"),
+    )
+
+    def __repr__(self):
+        return f"<ClassRanking student={self.student_id} class_pos={self.class_position}>"
+
+
+class SubjectRanking(Base):
+    """One row per result: the student's position in that subject."""
+    __tablename__ = "subject_rankings"
+
+    result_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, nullable=False)
+    student_id = Column(Integer, nullable=False)
+    subject_id = Column(Integer, nullable=False)
+    class_id = Column(Integer, nullable=False)
+    marks = Column(Float, nullable=False)
+    position = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_subject_rankings_student", "exam_session_id", "student_id"),
+        Index("ix_subject_rankings_class", "exam_session_id", "class_id"),
+        Index("ix_subject_rankings_subject_position", "exam_session_id", "subject_id", "position"),
+    )
+
+
+class RankingDirtyClass(Base):
+    """A class whose stored positions for an exam session are out of date."""
+    __tablename__ = "ranking_dirty_classes"
+
+    class_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, primary_key=True, autoincrement=False)
+    generation = Column(Integer, nullable=False, default=1)
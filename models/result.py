@@ -2,9 +2,12 @@
 models/result.py - Result ORM model with auto grade/GPA calculation
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from config import Base, GRADE_SCALE
+from utils.grading import from_config
+
+_DEFAULT_SCALE = from_config(GRADE_SCALE)
 
 
 class Result(Base):
@@ -13,6 +16,7 @@ class Result(Base):
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
+    exam_session_id = Column(Integer, ForeignKey("exam_sessions.id"), nullable=False)
     marks = Column(Float, nullable=False)
     grade = Column(String(5), nullable=False)
     gpa = Column(Float, nullable=False)
@@ -21,21 +25,33 @@ class Result(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     __table_args__ = (
-    UniqueConstraint("student_id", "subject_id", name="uq_student_subject"),
-    {"mysql_engine": "InnoDB"},
-)
+        # One mark per student and subject in each exam session. The session
+        # leads this key and the hot indexes, so a term's queries read one
+        # contiguous index range however much history the table holds.
+        UniqueConstraint("exam_session_id", "student_id", "subject_id",
+                         name="uq_result_session_student_subject"),
+        Index("ix_results_session_subject_marks", "exam_session_id", "subject_id", "marks"),
+        Index("ix_results_session_grade", "exam_session_id", "grade"),
+        Index("ix_results_session_marks", "exam_session_id", "marks"),
+        # Covering for per-subject / per-student averages across sessions.
+        Index("ix_results_subject_marks", "subject_id", "marks"),
+        Index("ix_results_student_marks", "student_id", "marks"),
+        {"mysql_engine": "InnoDB"},
+    )
 
     # Relationships
     student = relationship("Student", back_populates="results")
     subject = relationship("Subject", back_populates="results")
+    exam_session = relationship("ExamSession", back_populates="results")
 
     @staticmethod
     def calculate_grade_gpa(marks: float):
-        """Return (grade, gpa, remarks) for given marks."""
-        for low, high, grade, gpa, remarks in GRADE_SCALE:
-            if low <= marks <= high:
-                return grade, gpa, remarks
-        return "F", 0.0, "Fail"
+        """Return (grade, gpa, remarks) for given marks on the config default scale.
+
+        Services grade with the scale that applies to the student's class
+        (GradeScaleService); this is for code without a database session.
+        """
+        return _DEFAULT_SCALE.grade(marks)
 
     def __repr__(self):
         return f"<Result student={self.student_id} subject={self.subject_id} marks={self.marks} grade={self.grade}>"
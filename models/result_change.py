@@ -0,0 +1,36 @@
+"""
+models/result_change.py - Append-only feed of result inserts, updates and deletes
+
+Every write path that touches ``results`` appends one row per affected
+result in the same transaction. ``seq`` only grows, so a client that
+remembers the last seq it applied can catch up by reading the rows after
+it. Rows copy the result's values and carry no foreign keys: they outlive
+the results they describe.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
+from config import Base
+
+
+class ResultChange(Base):
+    __tablename__ = "result_changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    result_id = Column(Integer, nullable=False)
+    op = Column(String(1), nullable=False)          # I(nsert), U(pdate), D(elete)
+    exam_session_id = Column(Integer, nullable=False)
+    student_id = Column(Integer, nullable=False)
+    subject_id = Column(Integer, nullable=False)
+    marks = Column(Float, nullable=True)
+    grade = Column(String(5), nullable=True)
+    gpa = Column(Float, nullable=True)
+    remarks = Column(String(50), nullable=True)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_result_changes_changed_at", "changed_at"),
+        {"mysql_engine": "InnoDB", "sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<ResultChange seq={self.seq} {self.op} result={self.result_id}>"
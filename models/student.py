@@ -2,7 +2,7 @@
 models/student.py - Student ORM model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
@@ -20,6 +20,12 @@ class Student(Base):
     password_hash = Column(String(255), nullable=True)  # For student login
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Class lists and searches sorted by name; the id makes it covering for paging.
+        Index("ix_students_class_first_name", "class_id", "first_name", "id"),
+        Index("ix_students_first_name", "first_name", "id"),
+    )
+
     # Relationships
     class_ = relationship("Class", back_populates="students")
     results = relationship("Result", back_populates="student", cascade="all, delete-orphan")
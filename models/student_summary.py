@@ -0,0 +1,23 @@
+"""
+models/student_summary.py - Per-student, per-exam-session result aggregates, maintained on every result write
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, DateTime
+from config import Base
+
+
+class StudentSummary(Base):
+    __tablename__ = "student_summaries"
+
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    exam_session_id = Column(Integer, primary_key=True, autoincrement=False)
+    subjects = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    average = Column(Float, nullable=False)
+    average_gpa = Column(Float, nullable=False)
+    passed = Column(Integer, nullable=False)
+    division = Column(String(50), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StudentSummary student={self.student_id} session={self.exam_session_id} avg={self.average:.1f} div={self.division}>"
@@ -2,7 +2,7 @@
 models/subject.py - Subject ORM model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
@@ -16,6 +16,12 @@ class Subject(Base):
     teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_subjects_class_name", "class_id", "subject_name"),
+        Index("ix_subjects_teacher_name", "teacher_id", "subject_name"),
+        Index("ix_subjects_subject_name", "subject_name"),
+    )
+
     # Relationships
     class_ = relationship("Class", back_populates="subjects")
     teacher = relationship("Teacher", back_populates="subjects")
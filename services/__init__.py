@@ -6,3 +6,14 @@ from .result_service import ResultService
 from .teacher_service import TeacherService
 from .report_service import ReportService
 from .analytics_service import AnalyticsService
+from .account_directory import AccountDirectory
+from .provisioning_service import ProvisioningService
+from .ranking_service import RankingService
+from .summary_service import SummaryService
+from .exam_session_service import ExamSessionService
+from .archive_service import ArchiveService
+from .result_change_log import ResultChangeLog
+from .reference_data import ReferenceDataService
+from .deletion_service import DeletionService
+from .grade_scale_service import GradeScaleService
+from .regrade_service import RegradeService
@@ -0,0 +1,99 @@
+"""
+services/account_directory.py - Indexed login lookup shared by all user tables
+
+The ``accounts`` table maps every login key to its (role, user_id). Create,
+update and delete paths in the auth, teacher and student services keep it in
+step inside their own transaction, so login resolution and registration
+uniqueness checks are each a single indexed query.
+"""
+import logging
+from sqlalchemy import and_, insert, literal, func
+from sqlalchemy.orm import Session
+from models.account import Account
+from models.user import Admin, Teacher
+from models.student import Student
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+ROLE_MODELS = {"ADMIN": Admin, "TEACHER": Teacher, "STUDENT": Student}
+
+
+@instrument
+class AccountDirectory:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def normalize(login: str) -> str:
+        login = (login or "").strip()
+        return login.lower() if "@" in login else login
+
+    def is_taken(self, login: str, role: str = None, user_id: int = None) -> bool:
+        """True if *login* belongs to any account other than (role, user_id)."""
+        row = (
+            self.db.query(Account.role, Account.user_id)
+            .filter(Account.login == self.normalize(login))
+            .first()
+        )
+        return row is not None and (row.role, row.user_id) != (role, user_id)
+
+    def resolve(self, login: str):
+        """Return (user, role) for *login* from one joined query, or (None, None)."""
+        row = (
+            self.db.query(Account.role, Admin, Teacher, Student)
+            .outerjoin(Admin, and_(Account.role == "ADMIN", Admin.id == Account.user_id))
+            .outerjoin(Teacher, and_(Account.role == "TEACHER", Teacher.id == Account.user_id))
+            .outerjoin(Student, and_(Account.role == "STUDENT", Student.id == Account.user_id))
+            .filter(Account.login == self.normalize(login))
+            .first()
+        )
+        if row is None:
+            return None, None
+        user = row[1] or row[2] or row[3]
+        return (user, row.role) if user is not None else (None, None)
+
+    def register(self, role: str, user_id: int, login: str):
+        """Stage the account row; the caller commits with the user row."""
+        self.db.add(Account(login=self.normalize(login), role=role, user_id=user_id))
+
+    def update_login(self, role: str, user_id: int, login: str):
+        updated = (
+            self.db.query(Account)
+            .filter(Account.role == role, Account.user_id == user_id)
+            .update({Account.login: self.normalize(login)}, synchronize_session=False)
+        )
+        if not updated:
+            self.register(role, user_id, login)
+
+    def remove(self, role: str, user_id: int):
+        (
+            self.db.query(Account)
+            .filter(Account.role == role, Account.user_id == user_id)
+            .delete(synchronize_session=False)
+        )
+
+    def rebuild(self):
+        """Repopulate the directory from the user tables with set-based inserts."""
+        try:
+            self.db.query(Account).delete(synchronize_session=False)
+            cols = [Account.login, Account.role, Account.user_id]
+            for role, login_col in (("ADMIN", func.lower(Admin.email)),
+                                    ("TEACHER", func.lower(Teacher.email)),
+                                    ("STUDENT", Student.admission_number)):
+                model = ROLE_MODELS[role]
+                select = self.db.query(login_col, literal(role), model.id).statement
+                self.db.execute(insert(Account).from_select(cols, select))
+            self.db.commit()
+            logger.info(f"Account directory rebuilt: {self.db.query(Account).count()} logins")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding account directory: {e}")
+            raise
+
+    def sync_if_empty(self):
+        """Backfill databases created before the directory existed."""
+        if self.db.query(Account.id).first() is not None:
+            return
+        if any(self.db.query(m.id).first() is not None for m in ROLE_MODELS.values()):
+            self.rebuild()
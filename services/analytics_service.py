@@ -1,81 +1,152 @@
 """
 services/analytics_service.py - Analytics data computation
+
+Every figure is for one exam session: the current one unless
+``exam_session_id`` names another. Archived sessions are answered from
+archived_results, which carries its own class and subject names.
 """
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, and_
+from models.archive import ArchivedResult
 from models.result import Result
 from models.student import Student
 from models.subject import Subject
 from models.class_model import Class
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService
+from services.ranking_service import RankingService
+from services.read_models import SubjectPerformance
+from services.reference_data import ReferenceDataService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def class_average(self):
+    def class_average(self, exam_session_id: int = None):
         """Return list of (class_name, avg_marks)."""
+        if self._archived(exam_session_id):
+            rows = (
+                self.db.query(ArchivedResult.class_name, func.avg(ArchivedResult.marks).label("avg"))
+                .filter(ArchivedResult.exam_session_id == exam_session_id)
+                .group_by(ArchivedResult.class_name)
+                .all()
+            )
+            return [(r.class_name, round(r.avg, 2)) for r in rows]
         rows = (
             self.db.query(Class.class_name, func.avg(Result.marks).label("avg"))
             .join(Student, Student.class_id == Class.id)
             .join(Result, Result.student_id == Student.id)
+            .filter(Result.exam_session_id == self._session(exam_session_id))
             .group_by(Class.class_name)
             .all()
         )
         return [(r.class_name, round(r.avg, 2)) for r in rows]
 
-    def subject_average(self):
+    def subject_average(self, exam_session_id: int = None):
         """Return list of (subject_name, avg_marks)."""
+        if self._archived(exam_session_id):
+            rows = (
+                self.db.query(ArchivedResult.subject_name, func.avg(ArchivedResult.marks).label("avg"))
+                .filter(ArchivedResult.exam_session_id == exam_session_id)
+                .group_by(ArchivedResult.subject_name)
+                .all()
+            )
+            return [(r.subject_name, round(r.avg, 2)) for r in rows]
         rows = (
             self.db.query(Subject.subject_name, func.avg(Result.marks).label("avg"))
             .join(Result, Result.subject_id == Subject.id)
+            .filter(Result.exam_session_id == self._session(exam_session_id))
             .group_by(Subject.subject_name)
             .all()
         )
         return [(r.subject_name, round(r.avg, 2)) for r in rows]
 
-    def top_students(self, limit: int = 5):
-        """Return list of (student_name, avg_marks) top performers."""
+    def top_students(self, limit: int = 5, exam_session_id: int = None):
+        """Return list of (student_name, avg_marks) top performers from the stored rankings."""
+        rows = RankingService(self.db).top_students(limit, exam_session_id)
+        return [(r.student_name, round(r.average, 2)) for r in rows]
+
+    def pass_fail_rate(self, exam_session_id: int = None):
+        """Return (pass_count, fail_count)."""
+        results = self._results(exam_session_id)
+        in_session = results.exam_session_id == self._session(exam_session_id)
+        total = self.db.query(results).filter(in_session).count()
+        pass_count = self.db.query(results).filter(in_session, self._passed(results)).count()
+        fail_count = total - pass_count
+        return pass_count, fail_count
+
+    def teacher_performance(self, teacher_id: int, exam_session_id: int = None):
+        """Return list[SubjectPerformance] for every subject the teacher takes, from one grouped query."""
+        grades = ReferenceDataService(self.db).get().grades
         rows = (
             self.db.query(
-                Student.first_name,
-                Student.last_name,
-                func.avg(Result.marks).label("avg"),
+                Subject.id,
+                Subject.subject_name,
+                Class.class_name,
+                func.count(Result.id),
+                func.avg(Result.marks),
+                func.coalesce(func.sum(case((GradeScaleService(self.db).passed(), 1), else_=0)), 0),
+                func.min(Result.marks),
+                func.max(Result.marks),
+                *(func.coalesce(func.sum(case((Result.grade == g, 1), else_=0)), 0) for g in grades),
             )
-            .join(Result, Result.student_id == Student.id)
-            .group_by(Student.id, Student.first_name, Student.last_name)
-            .order_by(func.avg(Result.marks).desc())
-            .limit(limit)
+            .outerjoin(Class, Subject.class_id == Class.id)
+            .outerjoin(Result, and_(Result.subject_id == Subject.id,
+                                    Result.exam_session_id == self._session(exam_session_id)))
+            .filter(Subject.teacher_id == teacher_id)
+            .group_by(Subject.id, Subject.subject_name, Class.class_name)
+            .order_by(Subject.subject_name)
             .all()
         )
-        return [(f"{r.first_name} {r.last_name}", round(r.avg, 2)) for r in rows]
+        return [
+            SubjectPerformance(subject_id, name, class_name, students, average, int(passed),
+                               min_marks, max_marks, dict(zip(grades, map(int, counts))))
+            for subject_id, name, class_name, students, average, passed, min_marks, max_marks, *counts in rows
+        ]
 
-    def pass_fail_rate(self):
-        """Return (pass_count, fail_count)."""
-        total = self.db.query(Result).count()
-        pass_count = self.db.query(Result).filter(Result.marks >= 50).count()
-        fail_count = total - pass_count
-        return pass_count, fail_count
-
-    def gpa_distribution(self):
+    def gpa_distribution(self, exam_session_id: int = None):
         """Return dict of grade -> count."""
+        results = self._results(exam_session_id)
         rows = (
-            self.db.query(Result.grade, func.count(Result.id).label("cnt"))
-            .group_by(Result.grade)
+            self.db.query(results.grade, func.count().label("cnt"))
+            .filter(results.exam_session_id == self._session(exam_session_id))
+            .group_by(results.grade)
             .all()
         )
         return {r.grade: r.cnt for r in rows}
 
-    def total_stats(self):
+    def total_stats(self, exam_session_id: int = None):
         """Return dict with overall stats."""
+        results = self._results(exam_session_id)
+        in_session = results.exam_session_id == self._session(exam_session_id)
         total_students = self.db.query(Student).count()
-        total_results = self.db.query(Result).count()
-        avg_marks = self.db.query(func.avg(Result.marks)).scalar() or 0
+        total_results = self.db.query(results).filter(in_session).count()
+        avg_marks = self.db.query(func.avg(results.marks)).filter(in_session).scalar() or 0
         return {
             "total_students": total_students,
             "total_results": total_results,
             "avg_marks": round(avg_marks, 2),
         }
+
+    def _session(self, exam_session_id):
+        return ExamSessionService(self.db).resolve(exam_session_id)
+
+    def _archived(self, exam_session_id):
+        return ExamSessionService(self.db).is_archived(exam_session_id)
+
+    def _passed(self, results):
+        """Condition for passing marks: live ones under their class's scale, archived ones
+        by the grade they were archived with (their classes may be gone)."""
+        if results is ArchivedResult:
+            return ArchivedResult.gpa > 0
+        return GradeScaleService(self.db).passed()
+
+    def _results(self, exam_session_id):
+        """The table holding the session's marks (same column names in both)."""
+        return ArchivedResult if self._archived(exam_session_id) else Result
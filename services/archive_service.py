@@ -0,0 +1,149 @@
+"""
+services/archive_service.py - Move closed academic years into the archive tables
+
+``archive_year`` is one set-based batch job: it freezes the year's
+summaries and positions, copies every result and standing into the
+denormalized archive tables, then deletes the year's results, derived rows
+and the students, subjects and classes left without live results. The live
+tables keep only the working year. The year's exam sessions stay (flagged
+``archived_at``), and ResultService, SummaryService, RankingService and
+AnalyticsService answer reads for them from the archive.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import select, insert, delete, update, func, literal
+from sqlalchemy.orm import Session
+from models.account import Account
+from models.archive import ArchivedResult, ArchivedStanding
+from models.class_model import Class
+from models.exam_session import ExamSession
+from models.ranking import ClassRanking, SubjectRanking, RankingDirtyClass
+from models.result import Result
+from models.student import Student
+from models.student_summary import StudentSummary
+from models.subject import Subject
+from services.ranking_service import RankingService
+from services.result_change_log import ResultChangeLog
+from services.read_models import ArchivedYearRow
+from services.reference_data import ReferenceDataService
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+
+@instrument
+class ArchiveService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def archived_years(self):
+        """Return list[ArchivedYearRow], newest year first."""
+        rows = (
+            self.db.query(ExamSession.academic_year,
+                          func.count(func.distinct(ExamSession.id)),
+                          func.count(func.distinct(ArchivedStanding.student_id)),
+                          func.coalesce(func.sum(ArchivedStanding.subjects), 0),
+                          func.max(ExamSession.archived_at))
+            .outerjoin(ArchivedStanding, ArchivedStanding.exam_session_id == ExamSession.id)
+            .filter(ExamSession.archived_at.isnot(None))
+            .group_by(ExamSession.academic_year)
+            .order_by(ExamSession.academic_year.desc())
+            .all()
+        )
+        return [ArchivedYearRow(year, n, s, int(r), at) for year, n, s, r, at in rows]
+
+    def archive_year(self, academic_year: str) -> ArchivedYearRow:
+        """Move every exam session of *academic_year* into the archive; return what was moved."""
+        academic_year = academic_year.strip()
+        sessions = self.db.query(ExamSession).filter(ExamSession.academic_year == academic_year).all()
+        if not sessions:
+            raise ValueError(f"No exam sessions in {academic_year}.")
+        if any(s.is_current for s in sessions):
+            raise ValueError("The current exam session's year cannot be archived.")
+        if any(s.archived_at is not None for s in sessions):
+            raise ValueError(f"{academic_year} is already archived.")
+        session_ids = [s.id for s in sessions]
+
+        # Positions are frozen as they stand now, so bring them up to date first.
+        rankings = RankingService(self.db)
+        for session_id in session_ids:
+            rankings.refresh(exam_session_id=session_id)
+
+        try:
+            results = self._copy_results(session_ids, academic_year)
+            students = self._copy_standings(session_ids, academic_year)
+            # Readers of the change feed drop archived results like deleted ones.
+            ResultChangeLog(self.db).record_deleted(Result.exam_session_id.in_(session_ids))
+            for model in (SubjectRanking, ClassRanking, StudentSummary, RankingDirtyClass, Result):
+                self.db.execute(delete(model.__table__).where(model.exam_session_id.in_(session_ids)))
+            self._retire_roster(academic_year)
+            archived_at = datetime.utcnow()
+            self.db.execute(update(ExamSession.__table__)
+                            .where(ExamSession.id.in_(session_ids))
+                            .values(archived_at=archived_at))
+            self.db.commit()
+            self.db.expire_all()
+            ReferenceDataService.invalidate()
+            logger.info(f"Archived {academic_year}: {len(session_ids)} session(s), "
+                        f"{students} student standing(s), {results} result(s)")
+            return ArchivedYearRow(academic_year, len(session_ids), students, results, archived_at)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error archiving {academic_year}: {e}")
+            raise
+
+    def _copy_results(self, session_ids, academic_year) -> int:
+        # The class is the one the subject was taught in that year, which a
+        # later promotion of the student does not change.
+        rows = (
+            select(Result.id, Result.exam_session_id, literal(academic_year), Result.student_id,
+                   Student.admission_number, Student.first_name, Student.last_name,
+                   Subject.class_id, Class.class_name, Result.subject_id, Subject.subject_name,
+                   Result.marks, Result.grade, Result.gpa, Result.remarks, SubjectRanking.position)
+            .join(Student, Result.student_id == Student.id)
+            .join(Subject, Result.subject_id == Subject.id)
+            .outerjoin(Class, Subject.class_id == Class.id)
+            .outerjoin(SubjectRanking, SubjectRanking.result_id == Result.id)
+            .where(Result.exam_session_id.in_(session_ids))
+        )
+        return self.db.execute(insert(ArchivedResult).from_select(
+            ["result_id", "exam_session_id", "academic_year", "student_id", "admission_number",
+             "first_name", "last_name", "class_id", "class_name", "subject_id", "subject_name",
+             "marks", "grade", "gpa", "remarks", "position"], rows)).rowcount
+
+    def _copy_standings(self, session_ids, academic_year) -> int:
+        rows = (
+            select(StudentSummary.student_id, StudentSummary.exam_session_id, literal(academic_year),
+                   Student.admission_number, Student.first_name, Student.last_name,
+                   ClassRanking.class_id, Class.class_name,
+                   StudentSummary.subjects, StudentSummary.total, StudentSummary.average,
+                   StudentSummary.average_gpa, StudentSummary.passed, StudentSummary.division,
+                   ClassRanking.class_position, ClassRanking.year_position)
+            .join(Student, StudentSummary.student_id == Student.id)
+            .outerjoin(ClassRanking, (ClassRanking.student_id == StudentSummary.student_id)
+                       & (ClassRanking.exam_session_id == StudentSummary.exam_session_id))
+            .outerjoin(Class, ClassRanking.class_id == Class.id)
+            .where(StudentSummary.exam_session_id.in_(session_ids))
+        )
+        return self.db.execute(insert(ArchivedStanding).from_select(
+            ["student_id", "exam_session_id", "academic_year", "admission_number",
+             "first_name", "last_name", "class_id", "class_name", "subjects", "total", "average",
+             "average_gpa", "passed", "division", "class_position", "year_position"], rows)).rowcount
+
+    def _retire_roster(self, academic_year):
+        """Delete the year's students, subjects and classes that no live result still needs."""
+        year_classes = select(Class.id).where(Class.academic_year == academic_year)
+        leaver = (Student.class_id.in_(year_classes),
+                  ~select(Result.id).where(Result.student_id == Student.id).exists())
+        self.db.execute(delete(Account.__table__).where(
+            Account.role == "STUDENT", Account.user_id.in_(select(Student.id).where(*leaver))))
+        # Conditions rather than an id subquery: MySQL cannot delete from a
+        # table that the same statement selects from.
+        self.db.execute(delete(Student.__table__).where(*leaver))
+        self.db.execute(delete(Subject.__table__).where(
+            Subject.class_id.in_(year_classes),
+            ~select(Result.id).where(Result.subject_id == Subject.id).exists()))
+        self.db.execute(delete(Class.__table__).where(
+            Class.academic_year == academic_year,
+            ~select(Student.id).where(Student.class_id == Class.id).exists(),
+            ~select(Subject.id).where(Subject.class_id == Class.id).exists()))
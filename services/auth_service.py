@@ -3,20 +3,80 @@ services/auth_service.py - Authentication and authorization service
 """
 import bcrypt
 import logging
+import time
 from sqlalchemy.orm import Session
+from config import BCRYPT_TARGET_MS, BCRYPT_ROUNDS
 from models.user import Admin, Teacher
 from models.student import Student
+from models.app_setting import AppSetting
+from services.account_directory import AccountDirectory
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class AuthService:
+    MIN_ROUNDS = 10
+    MAX_ROUNDS = 16
+    rounds = 12  # bcrypt's default until configure_hashing() runs
+
     def __init__(self, db: Session):
         self.db = db
 
     @staticmethod
     def hash_password(plain: str) -> str:
-        return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        return bcrypt.hashpw(plain.encode("utf-8"),
+                             bcrypt.gensalt(rounds=AuthService.rounds)).decode("utf-8")
+
+    @staticmethod
+    def hash_cost(hashed: str):
+        """Return the bcrypt cost factor encoded in *hashed*, or None."""
+        try:
+            return int(hashed.split("$")[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    @classmethod
+    def needs_rehash(cls, hashed: str) -> bool:
+        cost = cls.hash_cost(hashed)
+        return cost is not None and cost != cls.rounds
+
+    @classmethod
+    def calibrate_rounds(cls, target_ms: int = BCRYPT_TARGET_MS) -> int:
+        """Return the highest cost whose hash time stays within *target_ms* on this machine."""
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=cls.MIN_ROUNDS))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rounds = cls.MIN_ROUNDS
+        # Each extra round doubles the work.
+        while rounds < cls.MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+            elapsed_ms *= 2
+            rounds += 1
+        return rounds
+
+    def configure_hashing(self, recalibrate: bool = False) -> int:
+        """Set the class-wide cost: BCRYPT_ROUNDS, else the stored calibration, else calibrate now."""
+        if BCRYPT_ROUNDS:
+            AuthService.rounds = BCRYPT_ROUNDS
+            return AuthService.rounds
+        setting = self.db.get(AppSetting, "bcrypt_rounds")
+        if setting and not recalibrate:
+            AuthService.rounds = int(setting.value)
+            return AuthService.rounds
+        rounds = self.calibrate_rounds()
+        try:
+            if setting:
+                setting.value = str(rounds)
+            else:
+                self.db.add(AppSetting(key="bcrypt_rounds", value=str(rounds)))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error storing bcrypt cost: {e}")
+        AuthService.rounds = rounds
+        logger.info(f"bcrypt cost calibrated to {rounds} (target {BCRYPT_TARGET_MS} ms)")
+        return rounds
 
     @staticmethod
     def verify_password(plain: str, hashed: str) -> bool:
@@ -33,46 +93,45 @@ class AuthService:
             password: Password for authentication
             admission_number: Admission number for student login (optional, uses email if not provided)
         """
-        
-        # Try student login first if admission_number is provided
+
+        # One indexed lookup in the account directory resolves the user and role
         if admission_number:
-            try:
-                student = self.db.query(Student).filter(Student.admission_number == admission_number).first()
-                if student and student.password_hash and self.verify_password(password, student.password_hash):
-                    logger.info(f"Student login: {admission_number}")
-                    return student, "STUDENT"
-            except Exception as e:
-                logger.error(f"Error querying student: {e}")
-                self.db.rollback()
-
-        # Otherwise try email-based login (admin/teacher)
-        email = email.strip().lower() if email else ""
+            login, allowed = admission_number.strip(), ("STUDENT",)
+        else:
+            login, allowed = (email.strip().lower() if email else ""), ("ADMIN", "TEACHER")
 
         try:
-            admin = self.db.query(Admin).filter(Admin.email == email).first()
-            if admin and self.verify_password(password, admin.password_hash):
-                logger.info(f"Admin login: {email}")
-                return admin, "ADMIN"
+            user, role = AccountDirectory(self.db).resolve(login)
+            if (user is not None and role in allowed and user.password_hash
+                    and self.verify_password(password, user.password_hash)):
+                logger.info(f"{role.title()} login: {login}")
+                return self._rehash_if_outdated(user, password), role
         except Exception as e:
-            logger.error(f"Error querying admin: {e}")
+            logger.error(f"Error resolving login: {e}")
             self.db.rollback()
 
+        logger.warning(f"Failed login attempt for: {login}")
+        return None, None
+
+    def _rehash_if_outdated(self, user, password: str):
+        """Upgrade a verified password hash to the current cost; never fails the login."""
+        if not self.needs_rehash(user.password_hash):
+            return user
         try:
-            teacher = self.db.query(Teacher).filter(Teacher.email == email).first()
-            if teacher and self.verify_password(password, teacher.password_hash):
-                logger.info(f"Teacher login: {email}")
-                return teacher, "TEACHER"
+            user.password_hash = self.hash_password(password)
+            self.db.commit()
+            self.db.refresh(user)
+            logger.info(f"Password re-hashed at cost {AuthService.rounds} for {user!r}")
         except Exception as e:
-            logger.error(f"Error querying teacher: {e}")
             self.db.rollback()
-
-        logger.warning(f"Failed login attempt for: {email}")
-        return None, None
+            logger.error(f"Error re-hashing password: {e}")
+            self.db.refresh(user)
+        return user
 
     def create_admin(self, full_name: str, email: str, password: str) -> Admin:
         email = email.strip().lower()
-        if self.db.query(Admin).filter(Admin.email == email).first():
-            raise ValueError("Admin with this email already exists.")
+        if AccountDirectory(self.db).is_taken(email):
+            raise ValueError("An account with this email already exists.")
         admin = Admin(
             full_name=full_name,
             email=email,
@@ -80,6 +139,8 @@ class AuthService:
         )
         try:
             self.db.add(admin)
+            self.db.flush()
+            AccountDirectory(self.db).register("ADMIN", admin.id, email)
             self.db.commit()
             self.db.refresh(admin)
             return admin
@@ -97,10 +158,8 @@ class AuthService:
     def create_teacher(self, full_name: str, email: str, password: str) -> Teacher:
         """Register a new teacher."""
         email = email.strip().lower()
-        if self.db.query(Teacher).filter(Teacher.email == email).first():
-            raise ValueError("A teacher with this email already exists.")
-        if self.db.query(Admin).filter(Admin.email == email).first():
-            raise ValueError("An admin with this email already exists.")
+        if AccountDirectory(self.db).is_taken(email):
+            raise ValueError("An account with this email already exists.")
         teacher = Teacher(
             full_name=full_name.strip(),
             email=email,
@@ -108,6 +167,8 @@ class AuthService:
         )
         try:
             self.db.add(teacher)
+            self.db.flush()
+            AccountDirectory(self.db).register("TEACHER", teacher.id, email)
             self.db.commit()
             self.db.refresh(teacher)
             logger.info(f"Teacher registered: {teacher.full_name}")
@@ -3,11 +3,21 @@ services/class_service.py - Class CRUD service
 """
 import logging
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func
 from models.class_model import Class
+from models.student import Student
+from models.subject import Subject
+from services.deletion_service import DeletionService
+from services.grade_scale_service import GradeScaleService
+from services.read_models import ClassRow
+from services.reference_data import ReferenceDataService
+from services.regrade_service import RegradeService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class ClassService:
     def __init__(self, db: Session):
         self.db = db
@@ -15,6 +25,28 @@ class ClassService:
     def get_all(self):
         return self.db.query(Class).order_by(Class.class_name).all()
 
+    def get_all_rows(self):
+        """Return list[ClassRow] with student/subject counts, ordered by name."""
+        student_count = (
+            self.db.query(func.count(Student.id))
+            .filter(Student.class_id == Class.id)
+            .correlate(Class)
+            .scalar_subquery()
+        )
+        subject_count = (
+            self.db.query(func.count(Subject.id))
+            .filter(Subject.class_id == Class.id)
+            .correlate(Class)
+            .scalar_subquery()
+        )
+        rows = (
+            self.db.query(Class.id, Class.class_name, Class.academic_year,
+                          student_count, subject_count)
+            .order_by(Class.class_name)
+            .all()
+        )
+        return [ClassRow._make(r) for r in rows]
+
     def get_by_id(self, class_id: int):
         return self.db.query(Class).filter(Class.id == class_id).first()
 
@@ -23,6 +55,7 @@ class ClassService:
         try:
             self.db.add(cls)
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(cls)
             logger.info(f"Class created: {cls.class_name}")
             return cls
@@ -35,26 +68,26 @@ class ClassService:
         cls = self.get_by_id(class_id)
         if not cls:
             raise ValueError("Class not found.")
+        scales = GradeScaleService(self.db).get()
+        rescaled = scales.resolve(class_id, cls.academic_year) is not scales.resolve(class_id, academic_year.strip())
         cls.class_name = class_name.strip()
         cls.academic_year = academic_year.strip()
         try:
+            if rescaled:
+                # Scales resolve years through the reference data: reload it from this transaction.
+                self.db.flush()
+                ReferenceDataService.invalidate()
+                RegradeService(self.db).regrade_students(select(Student.id).where(Student.class_id == class_id))
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(cls)
             return cls
         except Exception as e:
             self.db.rollback()
+            ReferenceDataService.invalidate()
             logger.error(f"Error updating class: {e}")
             raise
 
-    def delete(self, class_id: int):
-        cls = self.get_by_id(class_id)
-        if not cls:
-            raise ValueError("Class not found.")
-        try:
-            self.db.delete(cls)
-            self.db.commit()
-            logger.info(f"Class deleted id={class_id}")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error deleting class: {e}")
-            raise
+    def delete(self, class_id: int, dry_run: bool = False):
+        """Delete the class with its students, subjects and results; see DeletionService."""
+        return DeletionService(self.db).delete_class(class_id, dry_run=dry_run)
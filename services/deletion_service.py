@@ -0,0 +1,154 @@
+"""
+services/deletion_service.py - Set-based deletes of classes, subjects and students
+
+Removing a class, subject or student also removes everything that hangs
+off it: a class takes its students and subjects, and every one of those
+takes its results, summaries, positions and login. Each table is cleared
+with one DELETE over the whole set inside a single transaction, so
+removing a class with tens of thousands of results reads no result into
+memory. Students who keep their own records but lose marks (in a deleted
+subject) get their summaries recomputed, and the classes whose positions
+change are queued for re-ranking. Archived copies are history and stay,
+and so do a deleted class's grade scales, retired.
+
+Every delete takes ``dry_run``: it then only counts what would go.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import select, delete, update, func, or_
+from sqlalchemy.orm import Session
+from models.account import Account
+from models.class_model import Class
+from models.grade_scale import GradeScale
+from models.ranking import ClassRanking, SubjectRanking, RankingDirtyClass
+from models.result import Result
+from models.student import Student
+from models.student_summary import StudentSummary
+from models.subject import Subject
+from services.ranking_service import RankingService
+from services.read_models import DeletionPlan
+from services.reference_data import ReferenceDataService
+from services.result_change_log import ResultChangeLog
+from services.grade_scale_service import GradeScaleService
+from services.summary_service import SummaryService
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+
+@instrument
+class DeletionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def delete_class(self, class_id: int, dry_run: bool = False) -> DeletionPlan:
+        """Delete a class with its students and subjects and all their results."""
+        if self.db.get(Class, class_id) is None:
+            raise ValueError("Class not found.")
+        return self._delete(f"class id={class_id}", dry_run, class_id=class_id,
+                            students=(Student.class_id == class_id,),
+                            subjects=(Subject.class_id == class_id,))
+
+    def delete_subject(self, subject_id: int, dry_run: bool = False) -> DeletionPlan:
+        """Delete a subject and its results."""
+        if self.db.get(Subject, subject_id) is None:
+            raise ValueError("Subject not found.")
+        return self._delete(f"subject id={subject_id}", dry_run,
+                            subjects=(Subject.id == subject_id,))
+
+    def delete_student(self, student_id: int, dry_run: bool = False) -> DeletionPlan:
+        """Delete a student with their results, summaries, positions and login."""
+        if self.db.get(Student, student_id) is None:
+            raise ValueError("Student not found.")
+        return self._delete(f"student id={student_id}", dry_run,
+                            students=(Student.id == student_id,))
+
+    def _delete(self, what, dry_run, class_id=None, students=None, subjects=None) -> DeletionPlan:
+        # Conditions, not id subqueries, for the tables deleted from: MySQL
+        # cannot delete from a table that the same statement selects from.
+        student_ids = select(Student.id).where(*students) if students else None
+        subject_ids = select(Subject.id).where(*subjects) if subjects else None
+        of_students = [] if student_ids is None else [Result.student_id.in_(student_ids)]
+        of_subjects = [] if subject_ids is None else [Result.subject_id.in_(subject_ids)]
+        results = or_(*of_students, *of_subjects)
+        if dry_run:
+            return self._count(class_id, students, subjects, student_ids, results)
+
+        try:
+            survivors, dirty = self._knock_on(results, student_ids, class_id)
+            ResultChangeLog(self.db).record_deleted(results)
+            self.db.execute(delete(SubjectRanking.__table__).where(
+                SubjectRanking.result_id.in_(select(Result.id).where(results))))
+            if student_ids is not None:
+                self.db.execute(delete(ClassRanking.__table__)
+                                .where(ClassRanking.student_id.in_(student_ids)))
+                self.db.execute(delete(StudentSummary.__table__)
+                                .where(StudentSummary.student_id.in_(student_ids)))
+            removed = self.db.execute(delete(Result.__table__).where(results)).rowcount
+            accounts = 0
+            if student_ids is not None:
+                accounts = self.db.execute(delete(Account.__table__).where(
+                    Account.role == "STUDENT", Account.user_id.in_(student_ids))).rowcount
+            gone_students = (self.db.execute(delete(Student.__table__).where(*students)).rowcount
+                             if students else 0)
+            gone_subjects = (self.db.execute(delete(Subject.__table__).where(*subjects)).rowcount
+                             if subjects else 0)
+            gone_classes = 0
+            if class_id is not None:
+                self.db.execute(delete(RankingDirtyClass.__table__)
+                                .where(RankingDirtyClass.class_id == class_id))
+                gone_classes = self.db.execute(delete(Class.__table__)
+                                               .where(Class.id == class_id)).rowcount
+                self.db.execute(update(GradeScale.__table__)
+                                .where(GradeScale.class_id == class_id, GradeScale.retired_at.is_(None))
+                                .values(retired_at=datetime.utcnow()))
+            SummaryService(self.db).refresh(*survivors)
+            rankings = RankingService(self.db)
+            for session_id, class_ids in dirty.items():
+                rankings.mark_dirty(*class_ids, exam_session_id=session_id)
+            self.db.commit()
+            self.db.expire_all()
+            if gone_classes or gone_subjects:
+                ReferenceDataService.invalidate()
+            if gone_classes:
+                GradeScaleService.invalidate()
+            plan = DeletionPlan(gone_classes, gone_subjects, gone_students, removed, accounts)
+            logger.info(f"Deleted {what}: {plan.describe()}")
+            return plan
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error deleting {what}: {e}")
+            raise
+
+    def _knock_on(self, results, student_ids, class_id):
+        """(ids of students who stay but lose results, {session id: class ids to re-rank})."""
+        pairs = (
+            self.db.query(Result.student_id, Student.class_id, Result.exam_session_id)
+            .join(Student, Result.student_id == Student.id)
+            .filter(results)
+            .distinct()
+            .all()
+        )
+        leaving = set()
+        if student_ids is not None:
+            leaving = {s for (s,) in self.db.execute(student_ids)}
+        survivors = {s for s, _, _ in pairs if s not in leaving}
+        dirty = defaultdict(set)
+        for _, cls, session_id in pairs:
+            if cls is not None and cls != class_id:
+                dirty[session_id].add(cls)
+        return survivors, dirty
+
+    def _count(self, class_id, students, subjects, student_ids, results) -> DeletionPlan:
+        def count(column, *where):
+            return self.db.query(func.count(column)).filter(*where).scalar() or 0
+
+        return DeletionPlan(
+            classes=1 if class_id is not None else 0,
+            subjects=count(Subject.id, *subjects) if subjects else 0,
+            students=count(Student.id, *students) if students else 0,
+            results=count(Result.id, results),
+            accounts=count(Account.id, Account.role == "STUDENT",
+                           Account.user_id.in_(student_ids)) if student_ids is not None else 0,
+        )
@@ -0,0 +1,109 @@
+"""
+services/exam_session_service.py - Exam sessions (terms) and the current session
+
+Results, summaries and rankings are all kept per exam session. Reads and
+mark entry default to the session flagged ``is_current``; past sessions stay
+queryable by passing their id. Sessions of an archived academic year are
+read-only and are served from the archive tables (see ArchiveService).
+"""
+import logging
+from datetime import datetime
+from sqlalchemy.orm import Session
+from models.exam_session import ExamSession
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+
+@instrument
+class ExamSessionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_all(self):
+        return (self.db.query(ExamSession)
+                .order_by(ExamSession.academic_year.desc(), ExamSession.term.desc())
+                .all())
+
+    def get_by_id(self, session_id: int):
+        return self.db.query(ExamSession).filter(ExamSession.id == session_id).first()
+
+    def current(self):
+        return self.db.query(ExamSession).filter(ExamSession.is_current.is_(True)).first()
+
+    def current_id(self):
+        return self.db.query(ExamSession.id).filter(ExamSession.is_current.is_(True)).scalar()
+
+    def resolve(self, session_id: int = None):
+        """Return *session_id*, or the current session's id when it is None."""
+        return session_id if session_id is not None else self.current_id()
+
+    def is_archived(self, session_id: int = None) -> bool:
+        """True if *session_id* names a session whose year was archived (the current one never is)."""
+        if session_id is None:
+            return False
+        return self.db.query(ExamSession.archived_at).filter(ExamSession.id == session_id).scalar() is not None
+
+    def create(self, name: str, academic_year: str, term: int, make_current: bool = False) -> ExamSession:
+        name, academic_year = name.strip(), academic_year.strip()
+        if not name or not academic_year:
+            raise ValueError("Session name and academic year are required.")
+        if term < 1:
+            raise ValueError("Term must be 1 or more.")
+        if self.db.query(ExamSession.id).filter(ExamSession.academic_year == academic_year,
+                                                ExamSession.term == term).first():
+            raise ValueError(f"Term {term} of {academic_year} already exists.")
+        if self.db.query(ExamSession.id).filter(ExamSession.academic_year == academic_year,
+                                                ExamSession.archived_at.isnot(None)).first():
+            raise ValueError(f"{academic_year} has been archived.")
+        session = ExamSession(name=name, academic_year=academic_year, term=term)
+        try:
+            if make_current:
+                self._clear_current()
+                session.is_current = True
+            self.db.add(session)
+            self.db.commit()
+            self.db.refresh(session)
+            logger.info(f"Exam session created: {session.name}")
+            return session
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error creating exam session: {e}")
+            raise
+
+    def set_current(self, session_id: int) -> ExamSession:
+        session = self.get_by_id(session_id)
+        if not session:
+            raise ValueError("Exam session not found.")
+        if session.archived_at is not None:
+            raise ValueError("Archived sessions are read-only and cannot be made current.")
+        try:
+            self._clear_current()
+            session.is_current = True
+            self.db.commit()
+            self.db.refresh(session)
+            logger.info(f"Current exam session: {session.name}")
+            return session
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error switching exam session: {e}")
+            raise
+
+    def ensure_current(self):
+        """Make sure a current session exists: flag the latest live one, or open term 1 of this year."""
+        if self.current_id() is not None:
+            return
+        latest = (self.db.query(ExamSession)
+                  .filter(ExamSession.archived_at.is_(None))
+                  .order_by(ExamSession.academic_year.desc(), ExamSession.term.desc())
+                  .first())
+        if latest:
+            self.set_current(latest.id)
+        else:
+            year = str(datetime.now().year)
+            self.create(f"Term 1 {year}", year, 1, make_current=True)
+
+    def _clear_current(self):
+        # Synchronised, so a loaded session that was current sees the change.
+        self.db.query(ExamSession).filter(ExamSession.is_current.is_(True)).update(
+            {ExamSession.is_current: False}, synchronize_session="evaluate")
@@ -0,0 +1,244 @@
+"""
+services/grade_scale_service.py - Grade scales as data: versions, assignment and compiled lookups
+
+Every scale in use is compiled once (utils.grading) into a snapshot shared
+by all threads, so grading a mark is an array index however many results
+are graded. The snapshot is dropped whenever a scale is added, revised or
+retired; a load that raced such a change is returned but not kept, as with
+the reference data. A class is graded by its own scale if it has one, else
+by its academic year's, else by the default scale seeded from
+``config.GRADE_SCALE`` on first run.
+"""
+import logging
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from sqlalchemy import select, case, literal, and_, or_, false
+from sqlalchemy.orm import Session, selectinload
+from config import GRADE_SCALE
+from models.class_model import Class
+from models.grade_scale import GradeScale, GradeBand
+from models.result import Result
+from models.student import Student
+from services.read_models import GradeScaleRow, GradeScales
+from services.reference_data import ReferenceDataService
+from utils.grading import Band, CompiledScale, from_config
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_version = 0
+_snapshot = None
+
+
+def banded(scale: CompiledScale, value, field: str):
+    """SQL for the *field* ("grade", "gpa" or "remarks") of the band *value* falls in."""
+    *upper, lowest = scale.bands
+    if not upper:
+        return literal(getattr(lowest, field))
+    return case(*((value >= band.min_marks, getattr(band, field)) for band in upper),
+                else_=getattr(lowest, field))
+
+
+def passes(scale: CompiledScale, marks):
+    """SQL condition: *marks* reach a band of *scale* with a GPA above zero."""
+    return false() if scale.pass_mark is None else marks >= scale.pass_mark
+
+
+@instrument
+class GradeScaleService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    def get(self) -> GradeScales:
+        """The compiled scales in use, loading them if a change invalidated the last snapshot."""
+        snapshot = _snapshot
+        if snapshot is not None:
+            return snapshot
+        return self._load(_version)
+
+    def for_class(self, class_id) -> CompiledScale:
+        """The scale that grades *class_id*'s marks (None: the default)."""
+        years = ReferenceDataService(self.db).get().class_years
+        return self.get().resolve(class_id, years.get(class_id))
+
+    def for_student(self, student_id: int) -> CompiledScale:
+        class_id = self.db.query(Student.class_id).filter(Student.id == student_id).scalar()
+        return self.for_class(class_id)
+
+    def by_class(self, class_ids) -> dict:
+        """{class id: scale} for *class_ids*; None maps to the default scale."""
+        scales, years = self.get(), ReferenceDataService(self.db).get().class_years
+        return {c: scales.resolve(c, years.get(c)) for c in set(class_ids)}
+
+    def groups(self):
+        """[(scale, class ids)] for every scale that differs from the default, plus
+        (default, None) for the rest; set-based paths run once per group."""
+        scales = self.get()
+        if not scales.by_class and not scales.by_year:
+            return [(scales.default, None)]
+        years = ReferenceDataService(self.db).get().class_years
+        grouped = {}
+        for class_id, year in years.items():
+            scale = scales.resolve(class_id, year)
+            if scale is not scales.default:
+                grouped.setdefault(scale, []).append(class_id)
+        return [*grouped.items(), (scales.default, None)]
+
+    def partition(self, student_id=Result.student_id):
+        """[(scale, conditions)] splitting rows by the scale that grades them; *student_id*
+        is the rows' student column (default: results)."""
+        groups = self.groups()
+        others = [c for _, class_ids in groups if class_ids for c in class_ids]
+        scoped = []
+        for scale, class_ids in groups:
+            if class_ids is not None:
+                where = [student_id.in_(select(Student.id).where(Student.class_id.in_(class_ids)))]
+            elif others:
+                where = [student_id.notin_(select(Student.id).where(Student.class_id.in_(others)))]
+            else:
+                where = []
+            scoped.append((scale, where))
+        return scoped
+
+    def passed(self, marks=Result.marks, student_id=Result.student_id):
+        """SQL condition: *marks* pass under the scale that grades their row's student."""
+        return or_(*(and_(passes(scale, marks), *scoped) for scale, scoped in self.partition(student_id)))
+
+    def scales(self):
+        """Return list[GradeScaleRow] of the scales in use: default first, then years, then classes."""
+        class_names = ReferenceDataService(self.db).get().class_names
+        rows = [
+            GradeScaleRow(s.id, s.name, s.version, s.class_id, class_names.get(s.class_id),
+                          s.academic_year, tuple(Band(b.min_marks, b.grade, b.gpa, b.remarks) for b in s.bands),
+                          s.created_at)
+            for s in self._active().options(selectinload(GradeScale.bands))
+        ]
+        return sorted(rows, key=lambda r: (r.class_id is not None, r.academic_year is not None,
+                                           r.academic_year or "", r.class_name or "", r.name))
+
+    # ── Changes ──────────────────────────────────────────────────────────────
+
+    def create(self, name: str, bands, class_id: int = None, academic_year: str = None) -> GradeScale:
+        """Add a scale for a class, a year or (neither) as the default.
+
+        *bands* are (min_marks, grade, gpa, remarks) rows.
+        """
+        name = (name or "").strip()
+        academic_year = (academic_year or "").strip() or None
+        if not name:
+            raise ValueError("Grade scale name is required.")
+        if class_id is not None and academic_year:
+            raise ValueError("A grade scale applies to a class or to a year, not both.")
+        if class_id is not None and self.db.get(Class, class_id) is None:
+            raise ValueError("Class not found.")
+        if self._active(*self._assigned_to(class_id, academic_year)).first():
+            raise ValueError("That class or year already has a grade scale; revise it instead.")
+        compiled = CompiledScale(bands)
+        scale = GradeScale(name=name, version=1, class_id=class_id, academic_year=academic_year,
+                           bands=self._band_rows(compiled))
+        return self._commit(scale, f"Grade scale created: {name} class={class_id} year={academic_year}")
+
+    def revise(self, scale_id: int, bands, name: str = None) -> GradeScale:
+        """Replace a scale's bands with a new version; the old version is kept, retired."""
+        old = self.db.get(GradeScale, scale_id)
+        if not old or old.retired_at is not None:
+            raise ValueError("Grade scale not found.")
+        compiled = CompiledScale(bands)
+        scale = GradeScale(name=(name or "").strip() or old.name, version=old.version + 1,
+                           class_id=old.class_id, academic_year=old.academic_year,
+                           bands=self._band_rows(compiled))
+        old.retired_at = datetime.utcnow()
+        return self._commit(scale, f"Grade scale revised: {scale.name} v{scale.version}")
+
+    def retire(self, scale_id: int):
+        """Stop using a class or year scale; its classes fall back to the next scale."""
+        scale = self.db.get(GradeScale, scale_id)
+        if not scale or scale.retired_at is not None:
+            raise ValueError("Grade scale not found.")
+        if scale.class_id is None and scale.academic_year is None:
+            raise ValueError("The default grade scale cannot be retired; revise it instead.")
+        scale.retired_at = datetime.utcnow()
+        self._commit(None, f"Grade scale retired: {scale.name} v{scale.version}")
+
+    def sync_if_empty(self):
+        """Seed the default scale from config.GRADE_SCALE on first run."""
+        if self.db.query(GradeScale.id).first() is None:
+            self.create("Default", from_config(GRADE_SCALE).bands)
+
+    @staticmethod
+    def invalidate():
+        """Drop the compiled scales; call after committing a change to grade scales."""
+        global _version, _snapshot
+        with _lock:
+            _version += 1
+            _snapshot = None
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _active(self, *where):
+        return self.db.query(GradeScale).filter(GradeScale.retired_at.is_(None), *where)
+
+    @staticmethod
+    def _assigned_to(class_id, academic_year):
+        return (GradeScale.class_id.is_(None) if class_id is None else GradeScale.class_id == class_id,
+                GradeScale.academic_year.is_(None) if academic_year is None
+                else GradeScale.academic_year == academic_year)
+
+    @staticmethod
+    def _band_rows(compiled):
+        return [GradeBand(min_marks=b.min_marks, grade=b.grade.strip(), gpa=b.gpa, remarks=b.remarks.strip())
+                for b in compiled.bands]
+
+    def _commit(self, scale, message):
+        try:
+            if scale is not None:
+                self.db.add(scale)
+            self.db.commit()
+            if scale is not None:
+                self.db.refresh(scale)
+            GradeScaleService.invalidate()
+            ReferenceDataService.invalidate()
+            logger.info(message)
+            return scale
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving grade scale: {e}")
+            raise
+
+    def _load(self, version):
+        global _snapshot
+        bands = (
+            self.db.query(GradeScale.id, GradeScale.name, GradeScale.version, GradeScale.class_id,
+                          GradeScale.academic_year, GradeBand.min_marks, GradeBand.grade,
+                          GradeBand.gpa, GradeBand.remarks)
+            .join(GradeBand, GradeBand.scale_id == GradeScale.id)
+            .filter(GradeScale.retired_at.is_(None))
+            .order_by(GradeScale.id)
+            .all()
+        )
+        scales = {}
+        for row in bands:
+            scales.setdefault(row[:5], []).append(row[5:])
+        default, by_class, by_year = None, {}, {}
+        for (scale_id, name, scale_version, class_id, year), rows in scales.items():
+            compiled = CompiledScale(rows, scale_id=scale_id, name=name, version=scale_version)
+            if class_id is not None:
+                by_class[class_id] = compiled
+            elif year is not None:
+                by_year[year] = compiled
+            else:
+                default = compiled
+        snapshot = GradeScales(
+            version=version,
+            default=default or from_config(GRADE_SCALE),
+            by_class=MappingProxyType(by_class),
+            by_year=MappingProxyType(by_year),
+        )
+        with _lock:
+            if _version == version:
+                _snapshot = snapshot
+        return snapshot
@@ -0,0 +1,169 @@
+"""
+services/provisioning_service.py - Bulk teacher/student account provisioning
+
+Passwords are generated, then hashed across a process pool (bcrypt is
+CPU-bound and deliberately slow, so one core is the bottleneck). Rows are
+written in batched transactions of Core inserts together with their account
+directory entries, and the plain-text credentials go to a CSV readable only
+by the current user.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import NamedTuple
+import bcrypt
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models.account import Account
+from models.student import Student
+from models.user import Teacher
+from services.account_directory import AccountDirectory
+from services.auth_service import AuthService
+from services.reference_data import ReferenceDataService
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+PASSWORD_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnpqrstuvwxyz23456789"
+PASSWORD_LENGTH = 10
+
+
+class StudentSpec(NamedTuple):
+    admission_number: str
+    first_name: str
+    last_name: str
+    gender: str
+    date_of_birth: object = None
+    class_id: int = None
+
+
+class TeacherSpec(NamedTuple):
+    full_name: str
+    email: str
+
+
+class ProvisionReport(NamedTuple):
+    created: int
+    skipped: list            # [(login, reason)]
+    credentials_path: str
+
+
+def generate_password(length: int = PASSWORD_LENGTH) -> str:
+    return "".join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
+
+
+def _hash_one(args):
+    # Module-level so it pickles into worker processes; the cost is passed in
+    # because spawned workers never ran AuthService.configure_hashing().
+    plain, rounds = args
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def hash_passwords(passwords, workers: int = None) -> list:
+    """Hash *passwords* at the current cost, in parallel across *workers* processes."""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(p, AuthService.rounds) for p in passwords]
+    if workers <= 1 or len(jobs) < 2:
+        return [_hash_one(job) for job in jobs]
+    # spawn, not fork: the caller may be a Tk app with live threads and connections.
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx) as pool:
+        return list(pool.map(_hash_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+@instrument
+class ProvisioningService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def provision_students(self, specs, credentials_path: str, workers: int = None,
+                           batch_size: int = BATCH_SIZE) -> ProvisionReport:
+        """Create student logins for *specs* (StudentSpec rows); existing admission numbers are skipped."""
+        specs = [StudentSpec(*s) if not isinstance(s, StudentSpec) else s for s in specs]
+        accepted, skipped = self._partition(
+            specs, lambda s: AccountDirectory.normalize(s.admission_number))
+        passwords = [generate_password() for _ in accepted]
+        hashes = hash_passwords(passwords, workers)
+        now = datetime.utcnow()
+        rows = [dict(admission_number=s.admission_number.strip(), first_name=s.first_name.strip(),
+                     last_name=s.last_name.strip(), gender=s.gender, date_of_birth=s.date_of_birth,
+                     class_id=s.class_id, password_hash=h, created_at=now)
+                for s, h in zip(accepted, hashes)]
+        credentials = [("STUDENT", r["admission_number"], f"{r['first_name']} {r['last_name']}", p)
+                       for r, p in zip(rows, passwords)]
+        self._write_batches(Student, Student.admission_number, "admission_number",
+                            "STUDENT", rows, credentials, credentials_path, batch_size)
+        logger.info(f"Provisioned {len(rows)} student accounts ({len(skipped)} skipped)")
+        return ProvisionReport(len(rows), skipped, credentials_path)
+
+    def provision_teachers(self, specs, credentials_path: str, workers: int = None,
+                           batch_size: int = BATCH_SIZE) -> ProvisionReport:
+        """Create teacher logins for *specs* (TeacherSpec rows); emails already in use are skipped."""
+        specs = [TeacherSpec(*s) if not isinstance(s, TeacherSpec) else s for s in specs]
+        accepted, skipped = self._partition(specs, lambda s: AccountDirectory.normalize(s.email))
+        passwords = [generate_password() for _ in accepted]
+        hashes = hash_passwords(passwords, workers)
+        now = datetime.utcnow()
+        rows = [dict(full_name=s.full_name.strip(), email=AccountDirectory.normalize(s.email),
+                     password_hash=h, role="TEACHER", created_at=now)
+                for s, h in zip(accepted, hashes)]
+        credentials = [("TEACHER", r["email"], r["full_name"], p) for r, p in zip(rows, passwords)]
+        self._write_batches(Teacher, Teacher.email, "email", "TEACHER",
+                            rows, credentials, credentials_path, batch_size)
+        ReferenceDataService.invalidate()
+        logger.info(f"Provisioned {len(rows)} teacher accounts ({len(skipped)} skipped)")
+        return ProvisionReport(len(rows), skipped, credentials_path)
+
+    def _partition(self, specs, login_of):
+        """Split *specs* into (new, [(login, reason)]) with one directory query per batch."""
+        accepted, skipped, seen = [], [], set()
+        for start in range(0, len(specs), BATCH_SIZE):
+            chunk = specs[start:start + BATCH_SIZE]
+            logins = [login_of(s) for s in chunk]
+            taken = {login for (login,) in self.db.query(Account.login)
+                     .filter(Account.login.in_([l for l in logins if l])).all()}
+            for spec, login in zip(chunk, logins):
+                if not login:
+                    skipped.append((login, "missing login"))
+                elif login in taken:
+                    skipped.append((login, "already exists"))
+                elif login in seen:
+                    skipped.append((login, "duplicate in input"))
+                else:
+                    seen.add(login)
+                    accepted.append(spec)
+        return accepted, skipped
+
+    def _write_batches(self, model, login_col, login_key, role, rows, credentials,
+                       credentials_path, batch_size):
+        """Insert *rows* with their account entries, one transaction per batch.
+
+        Credentials are appended only after their batch commits, so the file
+        always matches what is in the database, even if a later batch fails.
+        """
+        fd = os.open(credentials_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["role", "login", "name", "password"])
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                try:
+                    self.db.execute(insert(model), batch)
+                    ids = self.db.query(model.id, login_col).filter(
+                        login_col.in_([r[login_key] for r in batch])).all()
+                    self.db.execute(insert(Account), [
+                        dict(login=AccountDirectory.normalize(login), role=role, user_id=user_id)
+                        for user_id, login in ids
+                    ])
+                    self.db.commit()
+                except Exception as e:
+                    self.db.rollback()
+                    logger.error(f"Error provisioning {role.lower()} batch at row {start}: {e}")
+                    raise
+                writer.writerows(credentials[start:start + batch_size])
+                f.flush()
@@ -0,0 +1,368 @@
+"""
+services/ranking_service.py - Dense-rank positions per class, subject and academic year
+
+Positions are computed per exam session with ``dense_rank()`` window
+functions inside the database and stored in class_rankings /
+subject_rankings. Result and student writes only queue the affected
+(class, session) pair (mark_dirty); the next read that needs it re-ranks
+just the queued classes and refreshes year positions for their academic
+years. Databases without window functions (MySQL < 8,
+SQLite < 3.25) are ranked with pandas instead. Positions of archived
+sessions are frozen in the archive tables and read from there.
+"""
+import logging
+import pandas as pd
+from sqlalchemy import select, insert, update, delete, func, bindparam, or_
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from models.archive import ArchivedResult, ArchivedStanding
+from models.class_model import Class
+from models.ranking import ClassRanking, SubjectRanking, RankingDirtyClass
+from models.result import Result
+from models.student import Student
+from models.student_summary import StudentSummary
+from services.exam_session_service import ExamSessionService
+from services.read_models import MeritRow, Standing
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+
+@instrument
+class RankingService:
+    use_window_functions = None  # None = detect from the server version
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ── Invalidation ─────────────────────────────────────────────────────────
+
+    def mark_dirty(self, *class_ids, exam_session_id: int = None):
+        """Queue classes for re-ranking in a session (default: current); the caller commits."""
+        session_id = ExamSessionService(self.db).resolve(exam_session_id)
+        if session_id is not None:
+            self._queue({(c, session_id) for c in class_ids if c})
+
+    def mark_all_dirty(self):
+        """Queue every class in every session it has results for (after bulk loads or on first use); commits."""
+        pairs = (
+            self.db.query(Student.class_id, Result.exam_session_id)
+            .join(Result, Result.student_id == Student.id)
+            .filter(Student.class_id.isnot(None))
+            .distinct()
+        )
+        try:
+            self._queue(set(pairs))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error queueing classes for ranking: {e}")
+            raise
+
+    def _queue(self, pairs):
+        pairs = sorted(pairs)
+        if not pairs:
+            return
+        table = RankingDirtyClass.__table__
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql.insert(table).on_duplicate_key_update(generation=table.c.generation + 1)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(table).on_conflict_do_update(
+                index_elements=[table.c.class_id, table.c.exam_session_id],
+                set_={"generation": table.c.generation + 1})
+        else:
+            existing = set(self.db.query(RankingDirtyClass.class_id, RankingDirtyClass.exam_session_id)
+                           .filter(RankingDirtyClass.class_id.in_([c for c, _ in pairs])))
+            pairs = [p for p in pairs if p not in existing]
+            stmt = insert(table)
+        if pairs:
+            self.db.execute(stmt, [{"class_id": c, "exam_session_id": s, "generation": 1}
+                                   for c, s in pairs])
+
+    def sync_if_empty(self):
+        """Queue all classes when results exist but nothing has been ranked yet."""
+        if (self.db.query(ClassRanking.student_id).first() is None
+                and self.db.query(RankingDirtyClass.class_id).first() is None
+                and self.db.query(Result.id).first() is not None):
+            self.mark_all_dirty()
+
+    # ── Recomputation ────────────────────────────────────────────────────────
+
+    def refresh(self, class_ids=None, exam_session_id: int = None) -> list:
+        """Re-rank queued classes (only those in *class_ids* / *exam_session_id* if given); return the ids ranked."""
+        q = self.db.query(RankingDirtyClass.class_id, RankingDirtyClass.exam_session_id,
+                          RankingDirtyClass.generation)
+        if class_ids is not None:
+            q = q.filter(RankingDirtyClass.class_id.in_(list(class_ids)))
+        if exam_session_id is not None:
+            q = q.filter(RankingDirtyClass.exam_session_id == exam_session_id)
+        dirty = q.all()
+        if not dirty:
+            return []
+        by_session = {}
+        for c, session_id, _ in dirty:
+            by_session.setdefault(session_id, []).append(c)
+        ids = sorted({c for c, _, _ in dirty})
+        try:
+            for session_id, session_classes in by_session.items():
+                self._rank_classes(session_id, session_classes)
+            # A write that re-queued a class meanwhile bumped its generation; keep it queued.
+            table = RankingDirtyClass.__table__
+            self.db.execute(
+                delete(table).where(table.c.class_id == bindparam("c"),
+                                    table.c.exam_session_id == bindparam("s"),
+                                    table.c.generation == bindparam("g")),
+                [{"c": c, "s": session_id, "g": g} for c, session_id, g in dirty])
+            self.db.commit()
+            logger.info(f"Rankings refreshed for {len(ids)} class(es)")
+            return ids
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error refreshing rankings: {e}")
+            raise
+
+    def _rank_classes(self, session_id, class_ids):
+        # Clear the classes' rows and their students' rows: a student who moved in
+        # still has rows under the old class, which may not be re-ranked yet.
+        members = select(Student.id).where(Student.class_id.in_(class_ids))
+        self.db.execute(delete(ClassRanking.__table__).where(
+            ClassRanking.exam_session_id == session_id,
+            or_(ClassRanking.class_id.in_(class_ids), ClassRanking.student_id.in_(members))))
+        self.db.execute(delete(SubjectRanking.__table__).where(
+            SubjectRanking.exam_session_id == session_id,
+            or_(SubjectRanking.class_id.in_(class_ids), SubjectRanking.student_id.in_(members))))
+
+        # Overall positions rank the maintained per-student summaries.
+        students = (
+            select(Student.id.label("student_id"), StudentSummary.exam_session_id,
+                   Student.class_id, Class.academic_year,
+                   StudentSummary.subjects, StudentSummary.total, StudentSummary.average,
+                   StudentSummary.average_gpa)
+            .join(StudentSummary, (StudentSummary.student_id == Student.id)
+                  & (StudentSummary.exam_session_id == session_id))
+            .join(Class, Student.class_id == Class.id)
+            .where(Student.class_id.in_(class_ids))
+        )
+        self._insert_ranked(ClassRanking, students, "class_position", "class_id", "average")
+
+        marks = (
+            select(Result.id.label("result_id"), Result.exam_session_id, Result.student_id,
+                   Result.subject_id, Student.class_id, Result.marks)
+            .join(Student, Result.student_id == Student.id)
+            .where(Result.exam_session_id == session_id, Student.class_id.in_(class_ids))
+        )
+        self._insert_ranked(SubjectRanking, marks, "position", "subject_id", "marks")
+
+        years = [y for (y,) in self.db.query(Class.academic_year)
+                 .filter(Class.id.in_(class_ids)).distinct()]
+        self._rank_years(session_id, years)
+
+    def _rank_years(self, session_id, years):
+        """Year positions span every class of the year, so rank over the stored averages."""
+        if not years:
+            return
+        rows = (
+            select(ClassRanking.student_id, ClassRanking.academic_year, ClassRanking.average)
+            .where(ClassRanking.exam_session_id == session_id, ClassRanking.academic_year.in_(years))
+        )
+        positions = [{"sid": r["student_id"], "pos": r["year_position"]}
+                     for r in self._ranked_rows(rows, "year_position", "academic_year", "average")]
+        if positions:
+            table = ClassRanking.__table__
+            self.db.execute(
+                update(table).where(table.c.student_id == bindparam("sid"),
+                                    table.c.exam_session_id == session_id)
+                .values(year_position=bindparam("pos")),
+                positions)
+
+    def _insert_ranked(self, model, rows, position, partition, order):
+        if self._window_functions():
+            ranked = self._window_ranked(rows, position, partition, order)
+            self.db.execute(insert(model).from_select(
+                [c.name for c in ranked.selected_columns], ranked))
+        else:
+            records = self._ranked_rows(rows, position, partition, order)
+            if records:
+                self.db.execute(insert(model), records)
+
+    def _ranked_rows(self, rows, position, partition, order) -> list:
+        """Return *rows* as dicts with a dense *position* per *partition*, best *order* first."""
+        if self._window_functions():
+            ranked = self._window_ranked(rows, position, partition, order)
+            return [dict(r) for r in self.db.execute(ranked).mappings()]
+        df = pd.DataFrame(self.db.execute(rows).mappings().all())
+        if df.empty:
+            return []
+        df[position] = df.groupby(partition)[order].rank(method="dense", ascending=False).astype(int)
+        return df.astype(object).to_dict("records")
+
+    @staticmethod
+    def _window_ranked(rows, position, partition, order):
+        sub = rows.subquery()
+        return select(*sub.c, func.dense_rank().over(
+            partition_by=sub.c[partition], order_by=sub.c[order].desc()).label(position))
+
+    def _window_functions(self) -> bool:
+        if RankingService.use_window_functions is not None:
+            return RankingService.use_window_functions
+        dialect = self.db.get_bind().dialect
+        version = dialect.server_version_info or ()
+        if dialect.name == "sqlite":
+            return version >= (3, 25)
+        if dialect.name == "mysql":
+            return version >= ((10, 2) if getattr(dialect, "is_mariadb", False) else (8, 0))
+        return True
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def standing(self, student_id: int, exam_session_id: int = None):
+        """Return the student's Standing in a session (default: current), or None if they have no results."""
+        if ExamSessionService(self.db).is_archived(exam_session_id):
+            return self._archived_standing(student_id, exam_session_id)
+        session_id = ExamSessionService(self.db).resolve(exam_session_id)
+        class_id = self.db.query(Student.class_id).filter(Student.id == student_id).scalar()
+        self.refresh([class_id], session_id)
+        row = self.db.get(ClassRanking, (student_id, session_id))
+        if row is None:
+            return None
+        class_size = (self.db.query(func.count(ClassRanking.student_id))
+                      .filter(ClassRanking.exam_session_id == session_id,
+                              ClassRanking.class_id == row.class_id).scalar())
+        year_size = (self.db.query(func.count(ClassRanking.student_id))
+                     .filter(ClassRanking.exam_session_id == session_id,
+                             ClassRanking.academic_year == row.academic_year).scalar())
+        return Standing(row.average, row.class_position, class_size, row.year_position, year_size)
+
+    def subject_positions(self, student_id: int, exam_session_id: int = None) -> dict:
+        """Return {subject_id: (position, students ranked in the subject)} for a session (default: current)."""
+        if ExamSessionService(self.db).is_archived(exam_session_id):
+            return self._archived_subject_positions(student_id, exam_session_id)
+        session_id = ExamSessionService(self.db).resolve(exam_session_id)
+        class_id = self.db.query(Student.class_id).filter(Student.id == student_id).scalar()
+        self.refresh([class_id], session_id)
+        mine = (SubjectRanking.exam_session_id == session_id, SubjectRanking.student_id == student_id)
+        sizes = (
+            self.db.query(SubjectRanking.subject_id, func.count(SubjectRanking.result_id).label("size"))
+            .filter(SubjectRanking.exam_session_id == session_id,
+                    SubjectRanking.subject_id.in_(self.db.query(SubjectRanking.subject_id).filter(*mine)))
+            .group_by(SubjectRanking.subject_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(SubjectRanking.subject_id, SubjectRanking.position, sizes.c.size)
+            .join(sizes, sizes.c.subject_id == SubjectRanking.subject_id)
+            .filter(*mine)
+            .all()
+        )
+        return {r.subject_id: (r.position, r.size) for r in rows}
+
+    def merit_list(self, class_id: int = None, academic_year: str = None,
+                   exam_session_id: int = None) -> list:
+        """Return list[MeritRow] for a class or a whole academic year in a session (default: current), best first."""
+        if class_id is None and academic_year is None:
+            raise ValueError("Select a class or an academic year.")
+        if ExamSessionService(self.db).is_archived(exam_session_id):
+            return self._archived_merit_list(class_id, academic_year, exam_session_id)
+        session_id = ExamSessionService(self.db).resolve(exam_session_id)
+        if class_id is not None:
+            self.refresh([class_id], session_id)
+            position, scope = ClassRanking.class_position, ClassRanking.class_id == class_id
+        else:
+            self.refresh([c for (c,) in self.db.query(Class.id).filter(Class.academic_year == academic_year)],
+                         session_id)
+            position, scope = ClassRanking.year_position, ClassRanking.academic_year == academic_year
+        rows = (
+            self.db.query(position, ClassRanking.student_id, Student.admission_number,
+                          Student.first_name, Student.last_name, Class.class_name,
+                          ClassRanking.subjects, ClassRanking.total, ClassRanking.average,
+                          ClassRanking.average_gpa)
+            .join(Student, Student.id == ClassRanking.student_id)
+            .join(Class, Class.id == ClassRanking.class_id)
+            .filter(ClassRanking.exam_session_id == session_id, scope)
+            .order_by(position, Student.first_name)
+            .all()
+        )
+        return [MeritRow._make(r) for r in rows]
+
+    def top_students(self, limit: int = 5, exam_session_id: int = None) -> list:
+        """Return list[MeritRow] of a session's best averages across all classes (position = overall rank)."""
+        if ExamSessionService(self.db).is_archived(exam_session_id):
+            return self._archived_top_students(limit, exam_session_id)
+        session_id = ExamSessionService(self.db).resolve(exam_session_id)
+        self.refresh(exam_session_id=session_id)
+        rows = (
+            self.db.query(ClassRanking.student_id, Student.admission_number,
+                          Student.first_name, Student.last_name, Class.class_name,
+                          ClassRanking.subjects, ClassRanking.total, ClassRanking.average,
+                          ClassRanking.average_gpa)
+            .join(Student, Student.id == ClassRanking.student_id)
+            .join(Class, Class.id == ClassRanking.class_id)
+            .filter(ClassRanking.exam_session_id == session_id)
+            .order_by(ClassRanking.average.desc())
+            .limit(limit)
+            .all()
+        )
+        return [MeritRow(i, *r) for i, r in enumerate(rows, 1)]
+
+    # ── Archived sessions ────────────────────────────────────────────────────
+
+    def _archived_standing(self, student_id, session_id):
+        row = self.db.get(ArchivedStanding, (student_id, session_id))
+        if row is None or row.class_position is None:
+            return None
+        class_size = (self.db.query(func.count(ArchivedStanding.student_id))
+                      .filter(ArchivedStanding.exam_session_id == session_id,
+                              ArchivedStanding.class_id == row.class_id).scalar())
+        year_size = (self.db.query(func.count(ArchivedStanding.student_id))
+                     .filter(ArchivedStanding.exam_session_id == session_id,
+                             ArchivedStanding.class_id.isnot(None)).scalar())
+        return Standing(row.average, row.class_position, class_size, row.year_position, year_size)
+
+    def _archived_subject_positions(self, student_id, session_id):
+        mine = (ArchivedResult.exam_session_id == session_id, ArchivedResult.student_id == student_id)
+        sizes = (
+            self.db.query(ArchivedResult.subject_id, func.count(ArchivedResult.result_id).label("size"))
+            .filter(ArchivedResult.exam_session_id == session_id,
+                    ArchivedResult.subject_id.in_(self.db.query(ArchivedResult.subject_id).filter(*mine)))
+            .group_by(ArchivedResult.subject_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(ArchivedResult.subject_id, ArchivedResult.position, sizes.c.size)
+            .join(sizes, sizes.c.subject_id == ArchivedResult.subject_id)
+            .filter(*mine, ArchivedResult.position.isnot(None))
+            .all()
+        )
+        return {r.subject_id: (r.position, r.size) for r in rows}
+
+    def _archived_merit_list(self, class_id, academic_year, session_id):
+        if class_id is not None:
+            position, scope = ArchivedStanding.class_position, ArchivedStanding.class_id == class_id
+        else:
+            position, scope = ArchivedStanding.year_position, ArchivedStanding.academic_year == academic_year
+        rows = (
+            self.db.query(position, *self._archived_merit_columns())
+            .filter(ArchivedStanding.exam_session_id == session_id, scope, position.isnot(None))
+            .order_by(position, ArchivedStanding.first_name)
+            .all()
+        )
+        return [MeritRow._make(r) for r in rows]
+
+    def _archived_top_students(self, limit, session_id):
+        rows = (
+            self.db.query(*self._archived_merit_columns())
+            .filter(ArchivedStanding.exam_session_id == session_id,
+                    ArchivedStanding.class_position.isnot(None))
+            .order_by(ArchivedStanding.average.desc())
+            .limit(limit)
+            .all()
+        )
+        return [MeritRow(i, *r) for i, r in enumerate(rows, 1)]
+
+    @staticmethod
+    def _archived_merit_columns():
+        return (ArchivedStanding.student_id, ArchivedStanding.admission_number,
+                ArchivedStanding.first_name, ArchivedStanding.last_name, ArchivedStanding.class_name,
+                ArchivedStanding.subjects, ArchivedStanding.total, ArchivedStanding.average,
+                ArchivedStanding.average_gpa)
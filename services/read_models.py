@@ -0,0 +1,280 @@
+"""
+services/read_models.py - Lightweight read-only row types for list views
+
+Read paths project only the columns a table needs and wrap each row in a
+NamedTuple (slotted, immutable, no identity-map tracking). ORM instances are
+reserved for the write paths.
+"""
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+
+class StudentRow(NamedTuple):
+    id: int
+    admission_number: str
+    first_name: str
+    last_name: str
+    gender: str
+    date_of_birth: Optional[date]
+    class_id: Optional[int]
+    class_name: Optional[str]
+    result_count: int
+    average: Optional[float]
+    division: Optional[str]
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class ClassRow(NamedTuple):
+    id: int
+    class_name: str
+    academic_year: str
+    student_count: int
+    subject_count: int
+
+
+class SubjectRow(NamedTuple):
+    id: int
+    subject_name: str
+    class_id: Optional[int]
+    class_name: Optional[str]
+    teacher_id: Optional[int]
+    teacher_name: Optional[str]
+
+
+class TeacherRow(NamedTuple):
+    id: int
+    full_name: str
+    email: str
+    created_at: Optional[datetime]
+    subject_names: str
+
+
+class ResultRow(NamedTuple):
+    id: int
+    student_id: int
+    admission_number: str
+    first_name: str
+    last_name: str
+    class_name: Optional[str]
+    subject_id: int
+    subject_name: str
+    marks: float
+    grade: str
+    gpa: float
+    remarks: str
+
+    @property
+    def student_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class RosterRow(NamedTuple):
+    """A student of a subject's class and their mark for it, if any (marks entry grid)."""
+    student_id: int
+    admission_number: str
+    first_name: str
+    last_name: str
+    result_id: Optional[int]
+    marks: Optional[float]
+    grade: Optional[str]
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class MeritRow(NamedTuple):
+    position: int
+    student_id: int
+    admission_number: str
+    first_name: str
+    last_name: str
+    class_name: Optional[str]
+    subjects: int
+    total: float
+    average: float
+    average_gpa: float
+
+    @property
+    def student_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class Standing(NamedTuple):
+    average: float
+    class_position: int
+    class_size: int
+    year_position: Optional[int]
+    year_size: int
+
+
+class SubjectPerformance(NamedTuple):
+    subject_id: int
+    subject_name: str
+    class_name: Optional[str]
+    students: int
+    average: Optional[float]
+    passed: int
+    min_marks: Optional[float]
+    max_marks: Optional[float]
+    grade_counts: dict          # grade -> count, every grade present
+
+    @property
+    def failed(self):
+        return self.students - self.passed
+
+
+class SummaryRow(NamedTuple):
+    student_id: int
+    subjects: int
+    total: float
+    average: float
+    average_gpa: float
+    passed: int
+    division: str
+
+
+class TranscriptRow(NamedTuple):
+    result_id: int
+    subject_id: int
+    subject_name: str
+    class_name: Optional[str]
+    marks: float
+    grade: str
+    gpa: float
+    remarks: str
+
+
+class ArchivedYearRow(NamedTuple):
+    academic_year: str
+    sessions: int
+    students: int
+    results: int
+    archived_at: Optional[datetime]
+
+
+class DeletionPlan(NamedTuple):
+    """What a delete removes (dry run) or removed: row counts per table."""
+    classes: int
+    subjects: int
+    students: int
+    results: int
+    accounts: int
+
+    def describe(self) -> str:
+        """The dependents that go with the deleted class, subject or student, for confirmations."""
+        counts = [(self.results, "result(s)")]
+        if self.classes:
+            counts[:0] = [(self.students, "student(s)"), (self.subjects, "subject(s)")]
+        parts = [f"{n:,} {label}" for n, label in counts if n]
+        return ", ".join(parts) if parts else "no dependent records"
+
+
+class ResultDelta(NamedTuple):
+    """The latest change to one result: op "D" means it is gone, "I" / "U" carry its values."""
+    seq: int
+    result_id: int
+    op: str
+    exam_session_id: int
+    student_id: int
+    subject_id: int
+    marks: Optional[float]
+    grade: Optional[str]
+    gpa: Optional[float]
+    remarks: Optional[str]
+
+    @property
+    def deleted(self):
+        return self.op == "D"
+
+
+class ChangeBatch(NamedTuple):
+    """Changes read from the feed and the seq to ask from next time."""
+    cursor: int
+    deltas: list                        # ResultDelta, oldest first, one per result
+
+
+class SubjectRef(NamedTuple):
+    id: int
+    subject_name: str
+    class_id: Optional[int]
+    teacher_id: Optional[int]
+
+
+class ReferenceData(NamedTuple):
+    """Class, subject and teacher lookups for forms and filters; maps iterate in name order.
+
+    Names that repeat (a subject taught in several classes) keep the last id,
+    as the forms' name -> id maps always have.
+    """
+    version: int
+    classes: Mapping[str, int]          # class name -> id
+    class_labels: Mapping[str, int]     # "name (year)" -> id
+    class_names: Mapping[int, str]      # id -> class name
+    class_years: Mapping[int, str]      # id -> academic year
+    subjects: Mapping[str, int]         # subject name -> id
+    subject_names: Mapping[int, str]
+    teachers: Mapping[str, int]         # full name -> id
+    teacher_names: Mapping[int, str]
+    subject_refs: tuple
+    grades: tuple                       # grade letters of the scales in use, best first
+
+    def subjects_taught_by(self, teacher_id: int) -> Mapping[str, int]:
+        return MappingProxyType({s.subject_name: s.id for s in self.subject_refs
+                                 if s.teacher_id == teacher_id})
+
+
+class GradeScaleRow(NamedTuple):
+    """A grade scale in use, for the scales list."""
+    id: int
+    name: str
+    version: int
+    class_id: Optional[int]
+    class_name: Optional[str]
+    academic_year: Optional[str]
+    bands: tuple                        # utils.grading.Band, top band first
+    created_at: Optional[datetime]
+
+    @property
+    def applies_to(self):
+        if self.class_id is not None:
+            return f"Class {self.class_name or self.class_id}"
+        if self.academic_year:
+            return f"Year {self.academic_year}"
+        return "Default"
+
+
+class GradeScales(NamedTuple):
+    """Compiled scales in use: per class, per academic year and the default."""
+    version: int
+    default: object                     # utils.grading.CompiledScale
+    by_class: Mapping[int, object]
+    by_year: Mapping[str, object]
+
+    def resolve(self, class_id: Optional[int], academic_year: Optional[str]):
+        """The class's own scale, else its year's, else the default."""
+        return (self.by_class.get(class_id) or self.by_year.get(academic_year) or self.default)
+
+
+class RegradeReport(NamedTuple):
+    """What a regrade changes (dry run) or changed."""
+    results: int                        # results in scope
+    changed: int                        # results whose grade, GPA or remarks differ from their scale
+    summaries: int                      # summaries whose division differs
+    transitions: tuple                  # (old grade, new grade, results), most common first
+
+    def describe(self) -> str:
+        """A diff summary for confirmations and logs."""
+        if not self.changed and not self.summaries:
+            return f"all {self.results:,} result(s) already match their grade scale"
+        moves = ", ".join(f"{old}→{new} {n:,}" for old, new, n in self.transitions if old != new)
+        text = f"{self.changed:,} of {self.results:,} result(s) regraded"
+        if moves:
+            text += f" ({moves})"
+        if self.summaries:
+            text += f", {self.summaries:,} division(s) restated"
+        return text
@@ -0,0 +1,76 @@
+"""
+services/reference_data.py - Shared, versioned cache of the class, subject and teacher lists
+
+Forms and filters need the same id <-> name lookups every time they open.
+They are loaded once (four narrow queries) into an immutable ReferenceData
+snapshot shared by every thread, and dropped whenever ClassService,
+SubjectService, TeacherService, GradeScaleService or ArchiveService commits
+a change, or a user signs in. A load that raced an invalidation is returned but not kept.
+"""
+import threading
+from types import MappingProxyType
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.class_model import Class
+from models.grade_scale import GradeScale, GradeBand
+from models.subject import Subject
+from models.user import Teacher
+from services.read_models import ReferenceData, SubjectRef
+from utils.query_profiler import instrument
+
+_lock = threading.Lock()
+_version = 0
+_snapshot = None
+
+
+@instrument
+class ReferenceDataService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self) -> ReferenceData:
+        """The current snapshot, loading it if a write invalidated the last one."""
+        snapshot = _snapshot
+        if snapshot is not None:
+            return snapshot
+        return self._load(_version)
+
+    @staticmethod
+    def invalidate():
+        """Drop the snapshot; call after committing a change to classes, subjects, teachers or grade scales."""
+        global _version, _snapshot
+        with _lock:
+            _version += 1
+            _snapshot = None
+
+    def _load(self, version):
+        global _snapshot
+        classes = (self.db.query(Class.id, Class.class_name, Class.academic_year)
+                   .order_by(Class.class_name).all())
+        subjects = [SubjectRef._make(r) for r in
+                    self.db.query(Subject.id, Subject.subject_name, Subject.class_id, Subject.teacher_id)
+                    .order_by(Subject.subject_name)]
+        teachers = self.db.query(Teacher.id, Teacher.full_name).order_by(Teacher.full_name).all()
+        grades = (self.db.query(GradeBand.grade)
+                  .join(GradeScale, GradeBand.scale_id == GradeScale.id)
+                  .filter(GradeScale.retired_at.is_(None))
+                  .group_by(GradeBand.grade)
+                  .order_by(func.max(GradeBand.min_marks).desc())
+                  .all())
+        snapshot = ReferenceData(
+            version=version,
+            classes=MappingProxyType({c.class_name: c.id for c in classes}),
+            class_labels=MappingProxyType({f"{c.class_name} ({c.academic_year})": c.id for c in classes}),
+            class_names=MappingProxyType({c.id: c.class_name for c in classes}),
+            class_years=MappingProxyType({c.id: c.academic_year for c in classes}),
+            subjects=MappingProxyType({s.subject_name: s.id for s in subjects}),
+            subject_names=MappingProxyType({s.id: s.subject_name for s in subjects}),
+            teachers=MappingProxyType({t.full_name: t.id for t in teachers}),
+            teacher_names=MappingProxyType({t.id: t.full_name for t in teachers}),
+            subject_refs=tuple(subjects),
+            grades=tuple(g for (g,) in grades),
+        )
+        with _lock:
+            if _version == version:
+                _snapshot = snapshot
+        return snapshot
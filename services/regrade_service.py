@@ -0,0 +1,195 @@
+"""
+services/regrade_service.py - Bring stored grades back in line with their grade scales
+
+Results keep the grade, GPA and remarks they were given when their marks
+were written, so revising a scale leaves them stale. ``regrade`` rewrites
+them set-based: results are walked in id order a chunk at a time, and each
+chunk takes one UPDATE per grade scale in use, whose CASE maps marks to the
+scale's bands and whose WHERE skips results that already match. The change
+feed, the affected students' summaries and their classes' positions are
+updated in the same transaction, committed per chunk, so a long run never
+holds locks for long and can simply be started again if it stops. Summary
+divisions are restated at the end. Archived results are history and keep
+their grades.
+
+``dry_run`` only counts what would change, grade by grade.
+``regrade_students`` is the small case: it runs inside the caller's
+transaction when moving students changes the scale that grades them.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.orm import Session
+from models.class_model import Class
+from models.result import Result
+from models.student import Student
+from models.student_summary import StudentSummary
+from models.subject import Subject
+from services.grade_scale_service import GradeScaleService, banded
+from services.ranking_service import RankingService
+from services.read_models import RegradeReport
+from services.result_change_log import ResultChangeLog
+from services.summary_service import SummaryService
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+
+
+@instrument
+class RegradeService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def regrade(self, class_id: int = None, academic_year: str = None, subject_id: int = None,
+                dry_run: bool = False, progress=None, batch_size: int = BATCH_SIZE) -> RegradeReport:
+        """Regrade the live results of a class, of an academic year's classes and/or of a
+        subject (default: all of them) with the scales that now apply.
+
+        *progress*, if given, is called with (results done, results in scope) after each chunk.
+        """
+        what = self._describe_scope(class_id, academic_year, subject_id)
+        results, summaries = self._scope(class_id, academic_year, subject_id)
+        groups = GradeScaleService(self.db).partition()
+        total = self.db.query(func.count(Result.id)).filter(*results).scalar() or 0
+        # Divisions follow the average marks, which a regrade leaves alone: count them up front.
+        divisions = self._stale_divisions(summaries)
+        transitions = Counter()
+        changed = done = 0
+        after = 0
+        try:
+            while after is not None:
+                last = self._chunk_end(results, after, batch_size)
+                chunk = [*results, Result.id > after, *([] if last is None else [Result.id <= last])]
+                if dry_run:
+                    for scale, scoped in groups:
+                        transitions.update(self._diff(scale, *chunk, *scoped))
+                else:
+                    changed += self._regrade_chunk(groups, chunk, transitions)
+                    self.db.commit()
+                done = total if last is None else done + batch_size
+                after = last
+                if progress:
+                    progress(done, total)
+            if dry_run:
+                changed = sum(transitions.values())
+            else:
+                self._restate_divisions(summaries)
+                self.db.commit()
+                self.db.expire_all()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error regrading {what}: {e}")
+            raise
+        report = RegradeReport(total, changed, divisions,
+                               tuple((old, new, n) for (old, new), n in transitions.most_common()))
+        if not dry_run:
+            logger.info(f"Regraded {what}: {report.describe()}")
+        return report
+
+    def regrade_students(self, students) -> int:
+        """Regrade the live results of *students* (a select of student ids) and recompute their
+        summaries in every session; the caller flushes the move first and commits."""
+        changed = self._regrade_chunk(GradeScaleService(self.db).partition(),
+                                      [Result.student_id.in_(students)], Counter())
+        # Passes and divisions can change even where no stored grade does.
+        SummaryService(self.db).refresh(*self.db.execute(students).scalars())
+        return changed
+
+    def _regrade_chunk(self, groups, chunk, transitions) -> int:
+        """Regrade one chunk under every scale, counting *transitions*; the caller commits."""
+        changed = 0
+        touched = defaultdict(set)     # session id -> {(student id, class id)}
+        log = ResultChangeLog(self.db)
+        now = datetime.utcnow()
+        for scale, scoped in groups:
+            values, stale = self._graded(scale, *chunk, *scoped)
+            pairs = (
+                self.db.query(Result.exam_session_id, Result.student_id, Student.class_id)
+                .join(Student, Result.student_id == Student.id)
+                .filter(*stale)
+                .distinct()
+                .all()
+            )
+            if not pairs:
+                continue
+            transitions.update(self._diff(scale, *chunk, *scoped))
+            for session_id, student_id, class_id in pairs:
+                touched[session_id].add((student_id, class_id))
+            log.record_updated(*stale, **values)
+            changed += self.db.execute(update(Result.__table__).where(*stale)
+                                       .values(**values, updated_at=now)).rowcount
+        summaries, rankings = SummaryService(self.db), RankingService(self.db)
+        for session_id, students in touched.items():
+            summaries.refresh(*(s for s, _ in students), exam_session_id=session_id)
+            rankings.mark_dirty(*{c for _, c in students}, exam_session_id=session_id)
+        return changed
+
+    def _diff(self, scale, *where):
+        """{(old grade, new grade): results} for the results *scale* would change."""
+        values, stale = self._graded(scale, *where)
+        rows = (
+            self.db.query(Result.grade, values["grade"], func.count(Result.id))
+            .filter(*stale)
+            .group_by(Result.grade, values["grade"])
+        )
+        return {(old, new): n for old, new, n in rows}
+
+    def _restate_divisions(self, summaries):
+        """Reapply each scale to the averages of *summaries*; the caller commits."""
+        for scale, scoped in GradeScaleService(self.db).partition(StudentSummary.student_id):
+            division = banded(scale, StudentSummary.average, "remarks")
+            self.db.execute(update(StudentSummary.__table__)
+                            .where(*summaries, *scoped, StudentSummary.division != division)
+                            .values(division=division))
+
+    def _stale_divisions(self, summaries) -> int:
+        return sum(
+            self.db.query(func.count(StudentSummary.student_id))
+            .filter(*summaries, *scoped, StudentSummary.division != banded(scale, StudentSummary.average, "remarks"))
+            .scalar() or 0
+            for scale, scoped in GradeScaleService(self.db).partition(StudentSummary.student_id)
+        )
+
+    @staticmethod
+    def _graded(scale, *where):
+        """(the scale's grade / gpa / remarks as SQL, *where* narrowed to results that differ)."""
+        values = {field: banded(scale, Result.marks, field) for field in ("grade", "gpa", "remarks")}
+        stale = [*where, or_(*(getattr(Result, field) != value for field, value in values.items()))]
+        return values, stale
+
+    def _chunk_end(self, results, after, size):
+        """The id ending the next chunk of *size* results after *after*, or None for the last chunk."""
+        return (self.db.query(Result.id).filter(*results, Result.id > after)
+                .order_by(Result.id).offset(size - 1).limit(1).scalar())
+
+    def _scope(self, class_id, academic_year, subject_id):
+        """(conditions on results, conditions on summaries) selecting what to regrade."""
+        students, results, summaries = [], [], []
+        if class_id is not None:
+            if self.db.get(Class, class_id) is None:
+                raise ValueError("Class not found.")
+            students.append(Student.class_id == class_id)
+        if academic_year:
+            classes = select(Class.id).where(Class.academic_year == academic_year)
+            if self.db.execute(classes.limit(1)).first() is None:
+                raise ValueError(f"No classes in {academic_year}.")
+            students.append(Student.class_id.in_(classes))
+        if students:
+            results.append(Result.student_id.in_(select(Student.id).where(*students)))
+            summaries.append(StudentSummary.student_id.in_(select(Student.id).where(*students)))
+        if subject_id is not None:
+            if self.db.get(Subject, subject_id) is None:
+                raise ValueError("Subject not found.")
+            results.append(Result.subject_id == subject_id)
+            summaries.append(StudentSummary.student_id.in_(
+                select(Result.student_id).where(Result.subject_id == subject_id)))
+        return results, summaries
+
+    @staticmethod
+    def _describe_scope(class_id, academic_year, subject_id):
+        parts = [f"{name}={value}" for name, value in
+                 (("class", class_id), ("year", academic_year), ("subject", subject_id)) if value]
+        return " ".join(parts) if parts else "all results"
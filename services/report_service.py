@@ -14,22 +14,31 @@ from reportlab.platypus import (
     Spacer, HRFlowable
 )
 from sqlalchemy.orm import Session
+from models.archive import ArchivedResult
 from models.result import Result
 from models.student import Student
 from models.subject import Subject
 from models.class_model import Class
+from models.exam_session import ExamSession
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService
+from services.ranking_service import RankingService
+from services.result_service import ResultService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class ReportService:
     def __init__(self, db: Session):
         self.db = db
 
     def export_results_csv(self, filepath: str):
-        """Export all results to CSV."""
+        """Export all results, from every exam session (archived years first), to CSV."""
         rows = (
             self.db.query(
+                ExamSession.name,
                 Student.admission_number,
                 (Student.first_name + " " + Student.last_name).label("student_name"),
                 Class.class_name,
@@ -42,28 +51,59 @@ class ReportService:
             .join(Student, Result.student_id == Student.id)
             .outerjoin(Class, Student.class_id == Class.id)
             .join(Subject, Result.subject_id == Subject.id)
+            .join(ExamSession, Result.exam_session_id == ExamSession.id)
             .all()
         )
-        df = pd.DataFrame(rows, columns=[
-            "Admission No", "Student Name", "Class", "Subject",
+        archived = (
+            self.db.query(
+                ExamSession.name,
+                ArchivedResult.admission_number,
+                (ArchivedResult.first_name + " " + ArchivedResult.last_name).label("student_name"),
+                ArchivedResult.class_name,
+                ArchivedResult.subject_name,
+                ArchivedResult.marks,
+                ArchivedResult.grade,
+                ArchivedResult.gpa,
+                ArchivedResult.remarks,
+            )
+            .join(ExamSession, ArchivedResult.exam_session_id == ExamSession.id)
+            .all()
+        )
+        df = pd.DataFrame(archived + rows, columns=[
+            "Session", "Admission No", "Student Name", "Class", "Subject",
             "Marks", "Grade", "GPA", "Remarks"
         ])
         df.to_csv(filepath, index=False)
         logger.info(f"CSV exported: {filepath}")
         return filepath
 
-    def generate_student_report_card(self, student_id: int, filepath: str):
-        """Generate PDF report card for a single student."""
+    def export_merit_list_csv(self, filepath: str, class_id: int = None, academic_year: str = None,
+                              exam_session_id: int = None):
+        """Export a class or academic-year merit list (dense-ranked by average) to CSV."""
+        rows = RankingService(self.db).merit_list(class_id=class_id, academic_year=academic_year,
+                                                  exam_session_id=exam_session_id)
+        df = pd.DataFrame(
+            [(r.position, r.admission_number, r.student_name, r.class_name,
+              r.subjects, round(r.total, 1), round(r.average, 2), round(r.average_gpa, 2))
+             for r in rows],
+            columns=["Position", "Admission No", "Student Name", "Class",
+                     "Subjects", "Total", "Average", "Avg GPA"],
+        )
+        df.to_csv(filepath, index=False)
+        logger.info(f"Merit list exported: {filepath}")
+        return filepath
+
+    def generate_student_report_card(self, student_id: int, filepath: str, exam_session_id: int = None):
+        """Generate PDF report card for a single student for one exam session (default: current)."""
         student = self.db.query(Student).filter(Student.id == student_id).first()
         if not student:
             raise ValueError("Student not found.")
+        session = self._exam_session(exam_session_id)
 
-        results = (
-            self.db.query(Result, Subject.subject_name)
-            .join(Subject, Result.subject_id == Subject.id)
-            .filter(Result.student_id == student_id)
-            .all()
-        )
+        results = ResultService(self.db).transcript(student_id, session.id)
+        rankings = RankingService(self.db)
+        standing = rankings.standing(student_id, session.id)
+        subject_positions = rankings.subject_positions(student_id, session.id)
 
         doc = SimpleDocTemplate(
             filepath, pagesize=A4,
@@ -85,7 +125,7 @@ class ReportService:
             spaceAfter=4, alignment=1,
         )
         story.append(Paragraph("SCHOOL EXAMINATION RESULTS", title_style))
-        story.append(Paragraph("Student Report Card", sub_style))
+        story.append(Paragraph(f"Student Report Card — {session.name}", sub_style))
         story.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor("#1a237e")))
         story.append(Spacer(1, 0.4*cm))
 
@@ -95,6 +135,8 @@ class ReportService:
             ["Student Name:", student.full_name, "Admission No:", student.admission_number],
             ["Class:", class_name, "Gender:", student.gender],
             ["Date of Birth:", str(student.date_of_birth or "N/A"), "Date Generated:", datetime.now().strftime("%Y-%m-%d")],
+            ["Class Position:", _position(standing.class_position, standing.class_size) if standing else "N/A",
+             "Year Position:", _position(standing.year_position, standing.year_size) if standing else "N/A"],
         ]
         info_table = Table(info_data, colWidths=[3.5*cm, 5*cm, 3.5*cm, 5*cm])
         info_table.setStyle(TableStyle([
@@ -108,14 +150,15 @@ class ReportService:
         story.append(Spacer(1, 0.5*cm))
 
         # Results table
-        table_data = [["#", "Subject", "Marks", "Grade", "GPA", "Remarks"]]
+        table_data = [["#", "Subject", "Marks", "Grade", "GPA", "Position", "Remarks"]]
         total_marks = 0
         total_gpa = 0
-        for i, (result, subject_name) in enumerate(results, 1):
+        for i, result in enumerate(results, 1):
             table_data.append([
-                str(i), subject_name,
+                str(i), result.subject_name,
                 f"{result.marks:.1f}", result.grade,
-                f"{result.gpa:.1f}", result.remarks,
+                f"{result.gpa:.1f}", _position(*subject_positions.get(result.subject_id, (None, 0))),
+                result.remarks,
             ])
             total_marks += result.marks
             total_gpa += result.gpa
@@ -123,9 +166,9 @@ class ReportService:
         if results:
             avg_marks = total_marks / len(results)
             avg_gpa = total_gpa / len(results)
-            table_data.append(["", "AVERAGE", f"{avg_marks:.1f}", "", f"{avg_gpa:.2f}", ""])
+            table_data.append(["", "AVERAGE", f"{avg_marks:.1f}", "", f"{avg_gpa:.2f}", "", ""])
 
-        t = Table(table_data, colWidths=[1*cm, 5*cm, 2.5*cm, 2*cm, 2*cm, 4*cm])
+        t = Table(table_data, colWidths=[1*cm, 4.5*cm, 2*cm, 1.8*cm, 1.8*cm, 2.2*cm, 3.7*cm])
         t.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a237e")),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -152,14 +195,17 @@ class ReportService:
         logger.info(f"Report card generated: {filepath}")
         return filepath
 
-    def generate_class_report_pdf(self, class_id: int, filepath: str):
-        """Generate PDF report for an entire class."""
+    def generate_class_report_pdf(self, class_id: int, filepath: str, exam_session_id: int = None):
+        """Generate PDF report for an entire class for one exam session (default: current)."""
         cls = self.db.query(Class).filter(Class.id == class_id).first()
         if not cls:
             raise ValueError("Class not found.")
+        session = self._exam_session(exam_session_id)
 
-        students = (
-            self.db.query(Student)
+        merit = RankingService(self.db).merit_list(class_id=class_id, exam_session_id=session.id)
+        ranked = {r.student_id for r in merit}
+        roster = (
+            self.db.query(Student.id, Student.admission_number, Student.first_name, Student.last_name)
             .filter(Student.class_id == class_id)
             .order_by(Student.first_name)
             .all()
@@ -176,30 +222,29 @@ class ReportService:
             fontSize=16, textColor=colors.HexColor("#1a237e"), spaceAfter=4,
         )
         story.append(Paragraph(f"CLASS PERFORMANCE REPORT — {cls.class_name}", title_style))
-        story.append(Paragraph(f"Academic Year: {cls.academic_year}", styles["Normal"]))
+        story.append(Paragraph(f"Academic Year: {cls.academic_year} — {session.name}", styles["Normal"]))
         story.append(HRFlowable(width="100%", thickness=1.5, color=colors.HexColor("#1a237e")))
         story.append(Spacer(1, 0.5*cm))
 
-        table_data = [["Adm No", "Student Name", "Subjects", "Avg Marks", "Avg GPA", "Div"]]
-        for student in students:
-            results = self.db.query(Result).filter(Result.student_id == student.id).all()
-            if results:
-                avg_marks = sum(r.marks for r in results) / len(results)
-                avg_gpa = sum(r.gpa for r in results) / len(results)
-                _, _, remarks = Result.calculate_grade_gpa(avg_marks)
-            else:
-                avg_marks = avg_gpa = 0
-                remarks = "N/A"
+        table_data = [["Pos", "Adm No", "Student Name", "Subjects", "Avg Marks", "Avg GPA", "Div"]]
+        scale = GradeScaleService(self.db).for_class(class_id)
+        for r in merit:
+            _, _, remarks = scale.grade(r.average)
             table_data.append([
-                student.admission_number,
-                student.full_name,
-                str(len(results)),
-                f"{avg_marks:.1f}",
-                f"{avg_gpa:.2f}",
+                str(r.position),
+                r.admission_number,
+                r.student_name,
+                str(r.subjects),
+                f"{r.average:.1f}",
+                f"{r.average_gpa:.2f}",
                 remarks,
             ])
+        # Students without results cannot be ranked; list them after the ranked ones.
+        for student_id, adm, first, last in roster:
+            if student_id not in ranked:
+                table_data.append(["—", adm, f"{first} {last}", "0", "0.0", "0.00", "N/A"])
 
-        t = Table(table_data, colWidths=[2.5*cm, 5*cm, 2*cm, 2.5*cm, 2.5*cm, 3*cm])
+        t = Table(table_data, colWidths=[1.2*cm, 2.5*cm, 4.5*cm, 1.8*cm, 2.3*cm, 2.2*cm, 2.5*cm])
         t.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a237e")),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -216,3 +261,14 @@ class ReportService:
         doc.build(story)
         logger.info(f"Class report generated: {filepath}")
         return filepath
+
+    def _exam_session(self, exam_session_id):
+        sessions = ExamSessionService(self.db)
+        session = sessions.current() if exam_session_id is None else sessions.get_by_id(exam_session_id)
+        if not session:
+            raise ValueError("Exam session not found.")
+        return session
+
+
+def _position(position, size):
+    return f"{position} of {size}" if position else "N/A"
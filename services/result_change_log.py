@@ -0,0 +1,162 @@
+"""
+services/result_change_log.py - Append-only change feed for the results table
+
+Result, student, subject and archive write paths record every result they
+insert, update or delete here inside their own transaction. Readers keep
+the cursor they were handed and ask for what came after it; the answer
+is compacted to the latest change per result, so catching up costs
+O(changes) however large the results table is. Old rows are pruned after
+a retention period; a reader whose cursor falls before the pruned range is
+told to reload instead.
+
+``seq`` is taken at INSERT, not at commit, so a seq can become visible
+after higher ones (or never, if its transaction rolls back). The cursor
+handed out therefore stops short of any missing seq first seen less than
+``GAP_GRACE_SECONDS`` ago; changes past it are handed out again until the
+hole fills or is given up on, which is harmless as readers apply them by
+result id. Hole ages are timed on this process's clock.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, delete, func, literal, select
+from sqlalchemy.orm import Session
+from models.app_setting import AppSetting
+from models.result import Result
+from models.result_change import ResultChange
+from services.read_models import ChangeBatch, ResultDelta
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+PRUNED_KEY = "result_changes_pruned_through"
+GAP_GRACE_SECONDS = 30      # longer than any transaction that writes results should stay open
+
+_lock = threading.Lock()
+_gaps = {}                  # first seq seen past a missing one -> monotonic time it was seen
+
+
+@instrument
+class ResultChangeLog:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, op: str, *results):
+        """Stage one change row per ORM result (flushed, so inserts have ids); the caller commits."""
+        now = datetime.utcnow()
+        self.db.add_all(
+            ResultChange(result_id=r.id, op=op, exam_session_id=r.exam_session_id,
+                         student_id=r.student_id, subject_id=r.subject_id,
+                         **({} if op == "D" else
+                            {"marks": r.marks, "grade": r.grade, "gpa": r.gpa, "remarks": r.remarks}),
+                         changed_at=now)
+            for r in results
+        )
+
+    def record_deleted(self, *where):
+        """Record deletes for the results matching *where* with one INSERT .. SELECT.
+
+        Call before deleting them (or before a cascade does); the caller commits.
+        """
+        rows = (
+            select(Result.id, literal("D"), Result.exam_session_id, Result.student_id,
+                   Result.subject_id, literal(datetime.utcnow()))
+            .where(*where)
+            .order_by(Result.id)
+        )
+        self.db.execute(insert(ResultChange).from_select(
+            ["result_id", "op", "exam_session_id", "student_id", "subject_id", "changed_at"], rows))
+
+    def record_updated(self, *where, **values):
+        """Record updates of the results matching *where* with one INSERT .. SELECT.
+
+        *values* map marks / grade / gpa / remarks to the SQL expressions about
+        to be written (the rest are copied); call before the UPDATE, the caller commits.
+        """
+        columns = {name: values.get(name, getattr(Result, name)) for name in ("marks", "grade", "gpa", "remarks")}
+        rows = (
+            select(Result.id, literal("U"), Result.exam_session_id, Result.student_id,
+                   Result.subject_id, *columns.values(), literal(datetime.utcnow()))
+            .where(*where)
+            .order_by(Result.id)
+        )
+        self.db.execute(insert(ResultChange).from_select(
+            ["result_id", "op", "exam_session_id", "student_id", "subject_id", *columns, "changed_at"], rows))
+
+    def head(self) -> int:
+        """The cursor to read before a full load, then poll ``since`` from: the newest seq,
+        or just below a recent missing one that may still commit."""
+        pruned = self._pruned_through()
+        newest = self.db.query(func.max(ResultChange.seq)).scalar() or pruned
+        after = max(newest - BATCH_SIZE, pruned)
+        seqs = [s for (s,) in self.db.query(ResultChange.seq)
+                .filter(ResultChange.seq > after).order_by(ResultChange.seq)]
+        return _watermark(after, seqs)
+
+    def since(self, seq: int, limit: int = BATCH_SIZE):
+        """Return a ChangeBatch of the changes after *seq* (at most *limit*), or None to reload."""
+        if seq < self._pruned_through():
+            return None
+        rows = (
+            self.db.query(ResultChange.seq, ResultChange.result_id, ResultChange.op,
+                          ResultChange.exam_session_id, ResultChange.student_id,
+                          ResultChange.subject_id, ResultChange.marks, ResultChange.grade,
+                          ResultChange.gpa, ResultChange.remarks)
+            .filter(ResultChange.seq > seq)
+            .order_by(ResultChange.seq)
+            .limit(limit)
+            .all()
+        )
+        latest = {}
+        for row in rows:
+            latest.pop(row.result_id, None)   # re-inserting keeps the dict in seq order
+            latest[row.result_id] = row
+        return ChangeBatch(_watermark(seq, [row.seq for row in rows]),
+                           [ResultDelta._make(r) for r in latest.values()])
+
+    def prune(self, keep_days: int) -> int:
+        """Drop changes older than *keep_days* and remember the last seq dropped; commits."""
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+        # Keep the newest row even when it is old: an emptied table may hand out
+        # seq values again after a MySQL 5.7 restart.
+        newest = self.db.query(func.max(ResultChange.seq)).scalar_subquery()
+        through = (self.db.query(func.max(ResultChange.seq))
+                   .filter(ResultChange.changed_at < cutoff, ResultChange.seq < newest).scalar())
+        if through is None:
+            return 0
+        try:
+            pruned = self.db.execute(delete(ResultChange.__table__)
+                                     .where(ResultChange.seq <= through)).rowcount
+            setting = self.db.get(AppSetting, PRUNED_KEY)
+            if setting:
+                setting.value = str(through)
+            else:
+                self.db.add(AppSetting(key=PRUNED_KEY, value=str(through)))
+            self.db.commit()
+            logger.info(f"Result change log pruned: {pruned} change(s) through seq {through}")
+            return pruned
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error pruning result change log: {e}")
+            raise
+
+    def _pruned_through(self) -> int:
+        setting = self.db.get(AppSetting, PRUNED_KEY)
+        return int(setting.value) if setting else 0
+
+
+def _watermark(after, seqs):
+    """The highest of *seqs* (ascending, all after *after*) that no recent missing seq precedes."""
+    now = time.monotonic()
+    expected = after + 1
+    with _lock:
+        for seq in seqs:
+            if seq > expected and now - _gaps.setdefault(seq, now) < GAP_GRACE_SECONDS:
+                return expected - 1
+            expected = seq + 1
+        for seq, seen in list(_gaps.items()):
+            if now - seen > 10 * GAP_GRACE_SECONDS:
+                del _gaps[seq]
+    return expected - 1
@@ -1,13 +1,32 @@
 """
 services/result_service.py - Result CRUD service
+
+Reads and writes are scoped to one exam session: the current session
+unless ``exam_session_id`` names another. Row reads (get_rows, transcript)
+for an archived session come from the archive tables; ORM reads and writes
+only see live results. Every write is appended to the result change log,
+which ``changes_since`` reads back as deltas.
 """
 import logging
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
+from models.archive import ArchivedResult
 from models.result import Result
+from models.student import Student
+from models.subject import Subject
+from models.class_model import Class
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService
+from services.read_models import ResultRow, RosterRow, TranscriptRow
+from services.ranking_service import RankingService
+from services.result_change_log import ResultChangeLog, BATCH_SIZE as CHANGE_BATCH
+from services.summary_service import SummaryService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class ResultService:
     def __init__(self, db: Session):
         self.db = db
@@ -15,30 +34,118 @@ class ResultService:
     def get_all(self):
         return self.db.query(Result).all()
 
+    def get_rows(self, class_id: int = None, subject_id: int = None, result_ids=None,
+                 exam_session_id: int = None):
+        """Return list[ResultRow] from one joined projection, optionally filtered.
+
+        Rows come from one session (default: current) unless *result_ids* picks them.
+        """
+        q = (
+            self.db.query(
+                Result.id, Result.student_id, Student.admission_number,
+                Student.first_name, Student.last_name, Class.class_name,
+                Result.subject_id, Subject.subject_name,
+                Result.marks, Result.grade, Result.gpa, Result.remarks,
+            )
+            .join(Student, Result.student_id == Student.id)
+            .outerjoin(Class, Student.class_id == Class.id)
+            .join(Subject, Result.subject_id == Subject.id)
+        )
+        if class_id:
+            q = q.filter(Student.class_id == class_id)
+        if subject_id:
+            q = q.filter(Result.subject_id == subject_id)
+        if result_ids is None and self._archived(exam_session_id):
+            return self._archived_rows(exam_session_id, class_id, subject_id)
+        if result_ids is not None:
+            q = q.filter(Result.id.in_(result_ids))
+        else:
+            q = q.filter(Result.exam_session_id == self._session(exam_session_id))
+        return [ResultRow._make(r) for r in q.order_by(Result.id.desc()).all()]
+
+    def get_row(self, result_id: int):
+        rows = self.get_rows(result_ids=[result_id])
+        return rows[0] if rows else None
+
     def get_by_id(self, result_id: int):
         return self.db.query(Result).filter(Result.id == result_id).first()
 
-    def get_by_student(self, student_id: int):
-        return self.db.query(Result).filter(Result.student_id == student_id).all()
+    def get_by_student(self, student_id: int, exam_session_id: int = None):
+        return self.db.query(Result).filter(
+            Result.exam_session_id == self._session(exam_session_id),
+            Result.student_id == student_id,
+        ).all()
+
+    def transcript(self, student_id: int, exam_session_id: int = None):
+        """Return list[TranscriptRow] for a student in one session from one joined projection."""
+        if self._archived(exam_session_id):
+            rows = (
+                self.db.query(ArchivedResult.result_id, ArchivedResult.subject_id,
+                              ArchivedResult.subject_name, ArchivedResult.class_name,
+                              ArchivedResult.marks, ArchivedResult.grade, ArchivedResult.gpa,
+                              ArchivedResult.remarks)
+                .filter(ArchivedResult.exam_session_id == exam_session_id,
+                        ArchivedResult.student_id == student_id)
+                .order_by(ArchivedResult.subject_name)
+                .all()
+            )
+            return [TranscriptRow._make(r) for r in rows]
+        rows = (
+            self.db.query(Result.id, Result.subject_id, Subject.subject_name, Class.class_name,
+                          Result.marks, Result.grade, Result.gpa, Result.remarks)
+            .join(Subject, Result.subject_id == Subject.id)
+            .outerjoin(Class, Subject.class_id == Class.id)
+            .filter(Result.exam_session_id == self._session(exam_session_id),
+                    Result.student_id == student_id)
+            .order_by(Subject.subject_name)
+            .all()
+        )
+        return [TranscriptRow._make(r) for r in rows]
+
+    def get_by_subject(self, subject_id: int, exam_session_id: int = None):
+        return self.db.query(Result).filter(
+            Result.exam_session_id == self._session(exam_session_id),
+            Result.subject_id == subject_id,
+        ).all()
 
-    def get_by_subject(self, subject_id: int):
-        return self.db.query(Result).filter(Result.subject_id == subject_id).all()
+    def get_roster(self, subject_id: int, exam_session_id: int = None):
+        """Return list[RosterRow]: every student of the subject's class with their mark in one session, if any."""
+        class_id = select(Subject.class_id).where(Subject.id == subject_id).scalar_subquery()
+        rows = (
+            self.db.query(Student.id, Student.admission_number, Student.first_name,
+                          Student.last_name, Result.id, Result.marks, Result.grade)
+            .outerjoin(Result, and_(Result.student_id == Student.id,
+                                    Result.subject_id == subject_id,
+                                    Result.exam_session_id == self._session(exam_session_id)))
+            .filter(Student.class_id == class_id)
+            .order_by(Student.first_name, Student.id)
+            .all()
+        )
+        return [RosterRow._make(r) for r in rows]
 
-    def exists(self, student_id: int, subject_id: int):
+    def exists(self, student_id: int, subject_id: int, exam_session_id: int = None):
         return self.db.query(Result).filter(
+            Result.exam_session_id == self._session(exam_session_id),
             Result.student_id == student_id,
             Result.subject_id == subject_id,
         ).first()
 
-    def add_result(self, student_id: int, subject_id: int, marks: float) -> Result:
+    def add_result(self, student_id: int, subject_id: int, marks: float,
+                   exam_session_id: int = None) -> Result:
         if marks < 0 or marks > 100:
             raise ValueError("Marks must be between 0 and 100.")
-        if self.exists(student_id, subject_id):
+        session_id = self._session(exam_session_id)
+        if session_id is None:
+            raise ValueError("No current exam session. Create one under Classes & Subjects first.")
+        if self._archived(exam_session_id):
+            raise ValueError("This exam session is archived and read-only.")
+        if self.exists(student_id, subject_id, session_id):
             raise ValueError("Result for this student and subject already exists. Use update instead.")
-        grade, gpa, remarks = Result.calculate_grade_gpa(marks)
+        grade, gpa, remarks = GradeScaleService(self.db).for_student(student_id).grade(marks)
         result = Result(
             student_id=student_id,
             subject_id=subject_id,
+            exam_session_id=session_id,
             marks=marks,
             grade=grade,
             gpa=gpa,
@@ -46,6 +153,7 @@ class ResultService:
         )
         try:
             self.db.add(result)
+            self._marks_changed("I", result)
             self.db.commit()
             self.db.refresh(result)
             logger.info(f"Result added: student={student_id} subject={subject_id} marks={marks} grade={grade}")
@@ -61,12 +169,13 @@ class ResultService:
         result = self.get_by_id(result_id)
         if not result:
             raise ValueError("Result not found.")
-        grade, gpa, remarks = Result.calculate_grade_gpa(marks)
+        grade, gpa, remarks = GradeScaleService(self.db).for_student(result.student_id).grade(marks)
         result.marks = marks
         result.grade = grade
         result.gpa = gpa
         result.remarks = remarks
         try:
+            self._marks_changed("U", result)
             self.db.commit()
             self.db.refresh(result)
             return result
@@ -81,6 +190,7 @@ class ResultService:
             raise ValueError("Result not found.")
         try:
             self.db.delete(result)
+            self._marks_changed("D", result)
             self.db.commit()
             logger.info(f"Result deleted id={result_id}")
         except Exception as e:
@@ -88,12 +198,116 @@ class ResultService:
             logger.error(f"Error deleting result: {e}")
             raise
 
-    def get_class_results(self, class_id: int):
-        """Get all results for students in a class."""
-        from models.student import Student
+    def save_marks(self, subject_id: int, marks: dict, exam_session_id: int = None):
+        """Write a subject's marks for many students in one transaction.
+
+        *marks* maps student id -> marks, or None to remove that student's
+        result. Existing results are updated, missing ones inserted. Returns
+        (ids of the results written, ids of the results removed).
+        """
+        for value in marks.values():
+            if value is not None and (value < 0 or value > 100):
+                raise ValueError("Marks must be between 0 and 100.")
+        session_id = self._session(exam_session_id)
+        if session_id is None:
+            raise ValueError("No current exam session. Create one under Classes & Subjects first.")
+        if self._archived(exam_session_id):
+            raise ValueError("This exam session is archived and read-only.")
+        if not marks:
+            return [], []
+        existing = {
+            r.student_id: r for r in self.db.query(Result).filter(
+                Result.exam_session_id == session_id,
+                Result.subject_id == subject_id,
+                Result.student_id.in_(list(marks)),
+            )
+        }
+        classes = dict(self.db.query(Student.id, Student.class_id).filter(Student.id.in_(list(marks))))
+        scales = GradeScaleService(self.db).by_class({None, *classes.values()})
+        changed = {"I": [], "U": [], "D": []}
+        for student_id, value in marks.items():
+            result = existing.get(student_id)
+            if value is None:
+                if result is not None:
+                    self.db.delete(result)
+                    changed["D"].append(result)
+                continue
+            grade, gpa, remarks = scales[classes.get(student_id)].grade(value)
+            if result is None:
+                result = Result(student_id=student_id, subject_id=subject_id,
+                                exam_session_id=session_id, marks=value,
+                                grade=grade, gpa=gpa, remarks=remarks)
+                self.db.add(result)
+                changed["I"].append(result)
+            elif result.marks != value:
+                result.marks, result.grade, result.gpa, result.remarks = value, grade, gpa, remarks
+                changed["U"].append(result)
+        try:
+            self.db.flush()
+            log = ResultChangeLog(self.db)
+            for op, results in changed.items():
+                if results:
+                    log.record(op, *results)
+            student_ids = [r.student_id for results in changed.values() for r in results]
+            SummaryService(self.db).refresh(*student_ids, exam_session_id=session_id)
+            RankingService(self.db).mark_dirty(*{classes.get(s) for s in student_ids},
+                                               exam_session_id=session_id)
+            self.db.commit()
+            logger.info(f"Marks saved: subject={subject_id} inserted={len(changed['I'])} "
+                        f"updated={len(changed['U'])} removed={len(changed['D'])}")
+            return ([r.id for r in changed["I"] + changed["U"]],
+                    [r.id for r in changed["D"]])
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving marks: {e}")
+            raise
+
+    def _marks_changed(self, op: str, result: Result):
+        """Log the change and bring the student's summary and class ranking in step, inside the caller's transaction."""
+        self.db.flush()
+        ResultChangeLog(self.db).record(op, result)
+        SummaryService(self.db).refresh(result.student_id, exam_session_id=result.exam_session_id)
+        class_id = self.db.query(Student.class_id).filter(Student.id == result.student_id).scalar()
+        RankingService(self.db).mark_dirty(class_id, exam_session_id=result.exam_session_id)
+
+    def get_class_results(self, class_id: int, exam_session_id: int = None):
+        """Get a session's results for students in a class."""
         return (
             self.db.query(Result)
             .join(Student, Result.student_id == Student.id)
-            .filter(Student.class_id == class_id)
+            .filter(Result.exam_session_id == self._session(exam_session_id),
+                    Student.class_id == class_id)
             .all()
         )
+
+    def changes_since(self, seq: int, limit: int = CHANGE_BATCH):
+        """Return a ChangeBatch of result changes after *seq*, or None if the client must reload.
+
+        Start from ``change_seq()`` taken before a full load, then from each
+        batch's ``cursor``; a delta may come again, so apply them by result
+        id. Deltas cover every session.
+        """
+        return ResultChangeLog(self.db).since(seq, limit)
+
+    def change_seq(self) -> int:
+        """The cursor to poll ``changes_since`` from after a full load (0 if nothing changed yet)."""
+        return ResultChangeLog(self.db).head()
+
+    def _archived_rows(self, exam_session_id, class_id, subject_id):
+        q = self.db.query(
+            ArchivedResult.result_id, ArchivedResult.student_id, ArchivedResult.admission_number,
+            ArchivedResult.first_name, ArchivedResult.last_name, ArchivedResult.class_name,
+            ArchivedResult.subject_id, ArchivedResult.subject_name,
+            ArchivedResult.marks, ArchivedResult.grade, ArchivedResult.gpa, ArchivedResult.remarks,
+        ).filter(ArchivedResult.exam_session_id == exam_session_id)
+        if class_id:
+            q = q.filter(ArchivedResult.class_id == class_id)
+        if subject_id:
+            q = q.filter(ArchivedResult.subject_id == subject_id)
+        return [ResultRow._make(r) for r in q.order_by(ArchivedResult.result_id.desc()).all()]
+
+    def _session(self, exam_session_id):
+        return ExamSessionService(self.db).resolve(exam_session_id)
+
+    def _archived(self, exam_session_id):
+        return ExamSessionService(self.db).is_archived(exam_session_id)
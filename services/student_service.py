@@ -3,12 +3,23 @@ services/student_service.py - Student CRUD service with search and pagination
 """
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import select, or_, and_, func
 from models.student import Student
+from models.class_model import Class
+from models.student_summary import StudentSummary
+from services.read_models import StudentRow
+from services.account_directory import AccountDirectory
+from services.deletion_service import DeletionService
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService
+from services.ranking_service import RankingService
+from services.regrade_service import RegradeService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class StudentService:
     def __init__(self, db: Session):
         self.db = db
@@ -27,7 +38,41 @@ class StudentService:
 
     def search(self, query: str, class_id: int = None, page: int = 1, page_size: int = 20):
         """Search students with optional class filter and pagination."""
-        q = self.db.query(Student)
+        q = self._filtered(self.db.query(Student), query, class_id)
+        total = q.count()
+        students = q.order_by(Student.first_name).offset((page - 1) * page_size).limit(page_size).all()
+        return students, total
+
+    def search_rows(self, query: str, class_id: int = None, page: int = 1, page_size: int = 20):
+        """Like search(), but returns (list[StudentRow], total) from a column projection.
+
+        The aggregate columns are the student's current-session summary.
+        """
+        q = self._filtered(self.db.query(Student.id), query, class_id)
+        total = q.count()
+        rows_q = (
+            self.db.query(
+                Student.id, Student.admission_number, Student.first_name, Student.last_name,
+                Student.gender, Student.date_of_birth, Student.class_id, Class.class_name,
+                func.coalesce(StudentSummary.subjects, 0), StudentSummary.average,
+                StudentSummary.division,
+            )
+            .outerjoin(Class, Student.class_id == Class.id)
+            .outerjoin(StudentSummary, and_(
+                StudentSummary.student_id == Student.id,
+                StudentSummary.exam_session_id == ExamSessionService(self.db).current_id()))
+        )
+        rows = (
+            self._filtered(rows_q, query, class_id)
+            .order_by(Student.first_name)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+        return [StudentRow._make(r) for r in rows], total
+
+    @staticmethod
+    def _filtered(q, query: str, class_id: int = None):
         if query:
             pattern = f"%{query}%"
             q = q.filter(
@@ -39,13 +84,11 @@ class StudentService:
             )
         if class_id:
             q = q.filter(Student.class_id == class_id)
-        total = q.count()
-        students = q.order_by(Student.first_name).offset((page - 1) * page_size).limit(page_size).all()
-        return students, total
+        return q
 
     def create(self, admission_number: str, first_name: str, last_name: str,
                gender: str, date_of_birth=None, class_id: int = None, password_hash: str = None) -> Student:
-        if self.get_by_admission(admission_number):
+        if AccountDirectory(self.db).is_taken(admission_number):
             raise ValueError(f"Student with admission number '{admission_number}' already exists.")
         student = Student(
             admission_number=admission_number.strip(),
@@ -58,6 +101,8 @@ class StudentService:
         )
         try:
             self.db.add(student)
+            self.db.flush()
+            AccountDirectory(self.db).register("STUDENT", student.id, student.admission_number)
             self.db.commit()
             self.db.refresh(student)
             logger.info(f"Student created: {student.full_name} ({student.admission_number})")
@@ -72,16 +117,24 @@ class StudentService:
         student = self.get_by_id(student_id)
         if not student:
             raise ValueError("Student not found.")
-        existing = self.get_by_admission(admission_number)
-        if existing and existing.id != student_id:
+        accounts = AccountDirectory(self.db)
+        if accounts.is_taken(admission_number, "STUDENT", student_id):
             raise ValueError("Admission number already in use.")
         student.admission_number = admission_number.strip()
         student.first_name = first_name.strip()
         student.last_name = last_name.strip()
         student.gender = gender
         student.date_of_birth = date_of_birth
-        student.class_id = class_id
+        previous_class_id, student.class_id = student.class_id, class_id
         try:
+            accounts.update_login("STUDENT", student_id, student.admission_number)
+            if previous_class_id != class_id:
+                # Past sessions keep the positions the student earned in their old class.
+                RankingService(self.db).mark_dirty(previous_class_id, class_id)
+                scales = GradeScaleService(self.db)
+                if scales.for_class(previous_class_id) is not scales.for_class(class_id):
+                    self.db.flush()
+                    RegradeService(self.db).regrade_students(select(Student.id).where(Student.id == student_id))
             self.db.commit()
             self.db.refresh(student)
             return student
@@ -90,15 +143,6 @@ class StudentService:
             logger.error(f"Error updating student: {e}")
             raise
 
-    def delete(self, student_id: int):
-        student = self.get_by_id(student_id)
-        if not student:
-            raise ValueError("Student not found.")
-        try:
-            self.db.delete(student)
-            self.db.commit()
-            logger.info(f"Student deleted id={student_id}")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error deleting student: {e}")
-            raise
+    def delete(self, student_id: int, dry_run: bool = False):
+        """Delete the student with their results and login; see DeletionService."""
+        return DeletionService(self.db).delete_student(student_id, dry_run=dry_run)
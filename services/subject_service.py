@@ -4,10 +4,17 @@ services/subject_service.py - Subject CRUD service
 import logging
 from sqlalchemy.orm import Session
 from models.subject import Subject
+from models.class_model import Class
+from models.user import Teacher
+from services.deletion_service import DeletionService
+from services.read_models import SubjectRow
+from services.reference_data import ReferenceDataService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class SubjectService:
     def __init__(self, db: Session):
         self.db = db
@@ -15,6 +22,18 @@ class SubjectService:
     def get_all(self):
         return self.db.query(Subject).order_by(Subject.subject_name).all()
 
+    def get_all_rows(self, teacher_id: int = None):
+        """Return list[SubjectRow] with class and teacher names, ordered by name."""
+        q = (
+            self.db.query(Subject.id, Subject.subject_name, Subject.class_id, Class.class_name,
+                          Subject.teacher_id, Teacher.full_name)
+            .outerjoin(Class, Subject.class_id == Class.id)
+            .outerjoin(Teacher, Subject.teacher_id == Teacher.id)
+        )
+        if teacher_id:
+            q = q.filter(Subject.teacher_id == teacher_id)
+        return [SubjectRow._make(r) for r in q.order_by(Subject.subject_name).all()]
+
     def get_by_id(self, subject_id: int):
         return self.db.query(Subject).filter(Subject.id == subject_id).first()
 
@@ -33,6 +52,7 @@ class SubjectService:
         try:
             self.db.add(subject)
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(subject)
             logger.info(f"Subject created: {subject.subject_name}")
             return subject
@@ -50,6 +70,7 @@ class SubjectService:
         subject.teacher_id = teacher_id
         try:
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(subject)
             return subject
         except Exception as e:
@@ -57,15 +78,6 @@ class SubjectService:
             logger.error(f"Error updating subject: {e}")
             raise
 
-    def delete(self, subject_id: int):
-        subject = self.get_by_id(subject_id)
-        if not subject:
-            raise ValueError("Subject not found.")
-        try:
-            self.db.delete(subject)
-            self.db.commit()
-            logger.info(f"Subject deleted id={subject_id}")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error deleting subject: {e}")
-            raise
+    def delete(self, subject_id: int, dry_run: bool = False):
+        """Delete the subject with its results; see DeletionService."""
+        return DeletionService(self.db).delete_subject(subject_id, dry_run=dry_run)
@@ -0,0 +1,108 @@
+"""
+services/summary_service.py - Materialized per-student transcript aggregates
+
+One row per student and exam session. ResultService refreshes the affected
+row in the same transaction as every mark write, so dashboards, student
+lists and rankings read one summary row instead of aggregating the raw
+results. Summaries of archived sessions are read from the frozen copies in
+archived_standings.
+"""
+import logging
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.orm import Session
+from models.archive import ArchivedStanding
+from models.result import Result
+from models.student_summary import StudentSummary
+from services.exam_session_service import ExamSessionService
+from services.grade_scale_service import GradeScaleService, banded, passes
+from services.read_models import SummaryRow
+from utils.query_profiler import instrument
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+@instrument
+class SummaryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, student_id: int, exam_session_id: int = None):
+        """Return the student's SummaryRow for a session (default: current), or None if they have no results."""
+        sessions = ExamSessionService(self.db)
+        source = ArchivedStanding if sessions.is_archived(exam_session_id) else StudentSummary
+        row = (
+            self.db.query(source.student_id, source.subjects, source.total,
+                          source.average, source.average_gpa,
+                          source.passed, source.division)
+            .filter(source.student_id == student_id,
+                    source.exam_session_id == sessions.resolve(exam_session_id))
+            .first()
+        )
+        return SummaryRow._make(row) if row else None
+
+    def refresh(self, *student_ids, exam_session_id: int = None):
+        """Recompute the summaries of *student_ids* in one session (default: every session).
+
+        The caller flushes results first and commits.
+        """
+        ids = sorted({s for s in student_ids if s})
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            stale = [StudentSummary.student_id.in_(chunk)]
+            where = [Result.student_id.in_(chunk)]
+            if exam_session_id is not None:
+                stale.append(StudentSummary.exam_session_id == exam_session_id)
+                where.append(Result.exam_session_id == exam_session_id)
+            self.db.execute(delete(StudentSummary.__table__).where(*stale))
+            self._insert_from_results(*where)
+
+    def remove(self, student_id: int):
+        """Drop the student's summaries in every session."""
+        self.db.execute(delete(StudentSummary.__table__)
+                        .where(StudentSummary.student_id == student_id))
+
+    def rebuild(self):
+        """Recompute every summary with one set-based insert."""
+        try:
+            self.db.execute(delete(StudentSummary.__table__))
+            self._insert_from_results()
+            self.db.commit()
+            logger.info(f"Student summaries rebuilt: {self.db.query(StudentSummary).count()} rows")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding student summaries: {e}")
+            raise
+
+    def sync_if_empty(self):
+        """Backfill databases that had results before summaries existed."""
+        if (self.db.query(StudentSummary.student_id).first() is None
+                and self.db.query(Result.id).first() is not None):
+            self.rebuild()
+
+    def _insert_from_results(self, *where):
+        """Insert summaries for the results matching *where*, once per grade scale in use."""
+        for scale, scoped in GradeScaleService(self.db).partition():
+            self._insert_graded(scale, *where, *scoped)
+
+    def _insert_graded(self, scale, *where):
+        totals = (
+            select(Result.student_id,
+                   Result.exam_session_id,
+                   func.count(Result.id).label("subjects"),
+                   func.sum(Result.marks).label("total"),
+                   func.avg(Result.marks).label("average"),
+                   func.avg(Result.gpa).label("average_gpa"),
+                   func.sum(case((passes(scale, Result.marks), 1), else_=0)).label("passed"))
+            .where(*where)
+            .group_by(Result.student_id, Result.exam_session_id)
+            .subquery()
+        )
+        # The scale's bands applied to the average.
+        division = banded(scale, totals.c.average, "remarks")
+        rows = select(totals.c.student_id, totals.c.exam_session_id, totals.c.subjects, totals.c.total,
+                      totals.c.average, totals.c.average_gpa, totals.c.passed, division, func.now())
+        self.db.execute(insert(StudentSummary).from_select(
+            ["student_id", "exam_session_id", "subjects", "total", "average", "average_gpa", "passed",
+             "division", "updated_at"], rows))
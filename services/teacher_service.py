@@ -4,11 +4,17 @@ services/teacher_service.py - Teacher CRUD service
 import logging
 from sqlalchemy.orm import Session
 from models.user import Teacher
+from models.subject import Subject
 from services.auth_service import AuthService
+from services.account_directory import AccountDirectory
+from services.read_models import TeacherRow
+from services.reference_data import ReferenceDataService
+from utils.query_profiler import instrument
 
 logger = logging.getLogger(__name__)
 
 
+@instrument
 class TeacherService:
     def __init__(self, db: Session):
         self.db = db
@@ -16,6 +22,22 @@ class TeacherService:
     def get_all(self):
         return self.db.query(Teacher).order_by(Teacher.full_name).all()
 
+    def get_all_rows(self):
+        """Return list[TeacherRow]; assigned subject names come from one extra query."""
+        subjects = {}
+        for teacher_id, name in (
+            self.db.query(Subject.teacher_id, Subject.subject_name)
+            .filter(Subject.teacher_id.isnot(None))
+            .order_by(Subject.subject_name)
+        ):
+            subjects.setdefault(teacher_id, []).append(name)
+        rows = (
+            self.db.query(Teacher.id, Teacher.full_name, Teacher.email, Teacher.created_at)
+            .order_by(Teacher.full_name)
+            .all()
+        )
+        return [TeacherRow(*r, ", ".join(subjects.get(r.id, []))) for r in rows]
+
     def get_by_id(self, teacher_id: int):
         return self.db.query(Teacher).filter(Teacher.id == teacher_id).first()
 
@@ -24,8 +46,8 @@ class TeacherService:
 
     def create(self, full_name: str, email: str, password: str) -> Teacher:
         email = email.strip().lower()
-        if self.get_by_email(email):
-            raise ValueError("A teacher with this email already exists.")
+        if AccountDirectory(self.db).is_taken(email):
+            raise ValueError("An account with this email already exists.")
         teacher = Teacher(
             full_name=full_name.strip(),
             email=email,
@@ -33,7 +55,10 @@ class TeacherService:
         )
         try:
             self.db.add(teacher)
+            self.db.flush()
+            AccountDirectory(self.db).register("TEACHER", teacher.id, email)
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(teacher)
             logger.info(f"Teacher created: {teacher.full_name}")
             return teacher
@@ -47,15 +72,17 @@ class TeacherService:
         if not teacher:
             raise ValueError("Teacher not found.")
         email = email.strip().lower()
-        existing = self.get_by_email(email)
-        if existing and existing.id != teacher_id:
-            raise ValueError("Email already in use by another teacher.")
+        accounts = AccountDirectory(self.db)
+        if accounts.is_taken(email, "TEACHER", teacher_id):
+            raise ValueError("Email already in use by another account.")
         teacher.full_name = full_name.strip()
         teacher.email = email
         if password:
             teacher.password_hash = AuthService.hash_password(password)
         try:
+            accounts.update_login("TEACHER", teacher_id, email)
             self.db.commit()
+            ReferenceDataService.invalidate()
             self.db.refresh(teacher)
             return teacher
         except Exception as e:
@@ -68,8 +95,10 @@ class TeacherService:
         if not teacher:
             raise ValueError("Teacher not found.")
         try:
+            AccountDirectory(self.db).remove("TEACHER", teacher_id)
             self.db.delete(teacher)
             self.db.commit()
+            ReferenceDataService.invalidate()
             logger.info(f"Teacher deleted id={teacher_id}")
         except Exception as e:
             self.db.rollback()
@@ -0,0 +1,34 @@
+"""
+tests/conftest.py - A fresh in-memory SQLite database per test
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+import models  # noqa: E402,F401  (registers tables)
+from services import result_change_log  # noqa: E402
+from services.grade_scale_service import GradeScaleService  # noqa: E402
+from services.reference_data import ReferenceDataService  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    config.Base.metadata.create_all(engine)
+    # Services that open their own sessions must see the same database.
+    config.SessionLocal.configure(bind=engine)
+    GradeScaleService.invalidate()
+    ReferenceDataService.invalidate()
+    result_change_log._gaps.clear()
+    session = config.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,50 @@
+"""
+tests/test_grade_scales.py - Passing follows the grade scale that grades each class
+"""
+from sqlalchemy import func
+from models.result import Result
+from services import (AnalyticsService, ClassService, ExamSessionService, GradeScaleService, ResultService,
+                      StudentService, SubjectService, SummaryService)
+
+
+def test_pass_mark_comes_from_the_class_scale(db):
+    ExamSessionService(db).ensure_current()
+    GradeScaleService(db).sync_if_empty()
+    lenient = ClassService(db).create("Form 1A", "2026")
+    default = ClassService(db).create("Form 1B", "2026")
+    GradeScaleService(db).create("Lenient", [(60, "A", 4, "Distinction"), (40, "P", 1, "Pass"), (0, "F", 0, "Fail")],
+                                 class_id=lenient.id)
+    marks = {}
+    for cls in (lenient, default):
+        subject = SubjectService(db).create("Maths", class_id=cls.id)
+        student = StudentService(db).create(f"ADM{cls.id}", "Test", "Student", "Female", class_id=cls.id)
+        ResultService(db).add_result(student.id, subject.id, 45)
+        marks[cls.id] = (student, subject)
+
+    student, _ = marks[lenient.id]
+    assert SummaryService(db).get(student.id).passed == 1
+    assert SummaryService(db).get(marks[default.id][0].id).passed == 0
+    assert AnalyticsService(db).pass_fail_rate() == (1, 1)
+
+
+def test_moving_a_student_regrades_with_the_new_class_scale(db):
+    ExamSessionService(db).ensure_current()
+    GradeScaleService(db).sync_if_empty()
+    lenient = ClassService(db).create("Form 1A", "2026")
+    strict = ClassService(db).create("Form 1B", "2026")
+    GradeScaleService(db).create("Lenient", [(60, "A", 4, "Distinction"), (40, "P", 1, "Pass"), (0, "F", 0, "Fail")],
+                                 class_id=lenient.id)
+    GradeScaleService(db).create("Strict", [(70, "A", 4, "Distinction"), (50, "C", 2, "Credit"), (0, "F", 0, "Fail")],
+                                 class_id=strict.id)
+    subject = SubjectService(db).create("Maths", class_id=lenient.id)
+    student = StudentService(db).create("ADM1", "Test", "Student", "Female", class_id=lenient.id)
+    result = ResultService(db).add_result(student.id, subject.id, 45)
+    assert (result.grade, SummaryService(db).get(student.id).passed) == ("P", 1)
+
+    StudentService(db).update(student.id, "ADM1", "Test", "Student", "Female", class_id=strict.id)
+
+    db.refresh(result)
+    passed = db.query(func.count(Result.id)).filter(GradeScaleService(db).passed()).scalar()
+    assert (result.grade, result.gpa) == ("F", 0)
+    assert SummaryService(db).get(student.id).passed == passed == 0
+    assert SummaryService(db).get(student.id).division == "Fail"
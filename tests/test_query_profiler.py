@@ -0,0 +1,20 @@
+"""
+tests/test_query_profiler.py - Statement timing survives failed statements
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+from utils import query_profiler
+
+
+def test_failed_statement_leaves_no_start_time_on_the_connection():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    query_profiler.install(engine)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+        with pytest.raises(IntegrityError):
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        assert conn.info["query_profiler_start"] == []
+    engine.dispose()
@@ -0,0 +1,29 @@
+"""
+tests/test_ranking_service.py - Stored positions stay consistent as classes change
+"""
+from services import ClassService, ExamSessionService, RankingService, ResultService, StudentService, SubjectService
+
+
+def _student(db, admission_number, class_id, subject_id, marks):
+    student = StudentService(db).create(admission_number, "Test", admission_number, "Female", class_id=class_id)
+    ResultService(db).add_result(student.id, subject_id, marks)
+    return student
+
+
+def test_standing_after_moving_student_between_classes(db):
+    ExamSessionService(db).ensure_current()
+    form_a = ClassService(db).create("Form 1A", "2026")
+    form_b = ClassService(db).create("Form 1B", "2026")
+    maths = SubjectService(db).create("Maths", class_id=form_a.id)
+    mover = _student(db, "ADM1", form_a.id, maths.id, 70)
+    _student(db, "ADM2", form_a.id, maths.id, 60)
+    _student(db, "ADM3", form_b.id, maths.id, 80)
+    rankings = RankingService(db)
+    assert rankings.standing(mover.id).class_position == 1
+
+    StudentService(db).update(mover.id, "ADM1", "Test", "ADM1", "Female", class_id=form_b.id)
+
+    # Only the new class is re-ranked here; the old class's rows for the student must not collide.
+    standing = rankings.standing(mover.id)
+    assert standing.class_position == 2
+    assert standing.class_size == 2
@@ -0,0 +1,38 @@
+"""
+tests/test_result_change_log.py - The change feed never skips a change that commits late
+"""
+from services import result_change_log
+from services.result_change_log import ResultChangeLog
+from models.result_change import ResultChange
+
+
+def _change(db, seq, result_id):
+    db.add(ResultChange(seq=seq, result_id=result_id, op="U", exam_session_id=1, student_id=1,
+                        subject_id=1, marks=50, grade="D", gpa=1.0, remarks="Pass"))
+    db.commit()
+
+
+def test_cursor_waits_for_a_seq_that_commits_late(db):
+    log = ResultChangeLog(db)
+    _change(db, 1, 10)
+    _change(db, 3, 30)        # seq 2 was taken by a writer that has not committed yet
+
+    batch = log.since(0)
+    assert [d.result_id for d in batch.deltas] == [10, 30]
+    assert batch.cursor == 1
+    assert log.head() == 1
+
+    _change(db, 2, 20)
+    batch = log.since(batch.cursor)
+    assert [d.result_id for d in batch.deltas] == [20, 30]
+    assert batch.cursor == 3
+
+
+def test_cursor_passes_a_hole_after_the_grace_period(db, monkeypatch):
+    log = ResultChangeLog(db)
+    _change(db, 1, 10)
+    _change(db, 5, 50)        # seqs 2-4 were rolled back
+    assert log.since(1).cursor == 1
+
+    monkeypatch.setattr(result_change_log, "GAP_GRACE_SECONDS", 0)
+    assert log.since(1).cursor == 5
@@ -0,0 +1 @@
+"""tools package"""
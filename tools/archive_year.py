@@ -0,0 +1,52 @@
+"""
+tools/archive_year.py - Move a closed academic year into the archive tables
+
+Same job as "Archive Year" under Classes & Subjects -> Exam Sessions, for
+running from a scheduler after the year's last term closes. With no year
+given, lists the years already archived.
+
+    python tools/archive_year.py 2024
+    python tools/archive_year.py
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models  # noqa: E402,F401  (registers tables)
+from config import SessionLocal  # noqa: E402
+from services.archive_service import ArchiveService  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive a closed academic year.")
+    parser.add_argument("year", nargs="?", help="academic year to archive, e.g. 2024")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        svc = ArchiveService(db)
+        if args.year is None:
+            for row in svc.archived_years():
+                logger.info(f"{row.academic_year}: {row.sessions} session(s), {row.students} student(s), "
+                            f"{row.results} result(s), archived {row.archived_at:%Y-%m-%d}")
+            return 0
+        started = time.perf_counter()
+        try:
+            row = svc.archive_year(args.year)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+    finally:
+        db.close()
+    logger.info(f"Archived {row.academic_year} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+tools/check_query_plans.py - Verify that service queries are served by indexes
+
+Seeds a scratch database with tools/datagen.py, runs every benchmark case
+(benchmarks/run_benchmarks.py) once while capturing each SELECT together
+with the service method that issued it (query_profiler labels), then runs
+EXPLAIN on every distinct statement. Full table scans of the large tables
+are reported and make the script exit non-zero; the small reference tables
+in ``REFERENCE_TABLES`` may be scanned, and so may the methods in
+``WHOLE_TABLE_READS`` whose job is to read every row.
+
+    python tools/check_query_plans.py                       # temp SQLite
+    python tools/check_query_plans.py --url mysql+pymysql://u:p@host/scratch
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+import config  # noqa: E402
+from benchmarks.run_benchmarks import CASES, SERVICES, SIZES, build_context  # noqa: E402
+from tools.datagen import generate  # noqa: E402
+from utils import query_profiler  # noqa: E402
+
+# A few hundred rows at most; a scan is as cheap as an index probe here.
+REFERENCE_TABLES = {"classes", "teachers", "admins", "app_settings", "schema_migrations",
+                    "ranking_dirty_classes", "exam_sessions", "grade_scales", "grade_bands"}
+WHOLE_TABLE_READS = {"ResultService.get_all", "ReportService.export_results_csv"}
+
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+
+def capture(engine):
+    """Record (label, statement, parameters) for every SELECT issued inside a tracked scope."""
+    seen = {}
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        label = query_profiler.current_label()
+        if label and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            seen.setdefault((label, query_profiler.statement_shape(statement)), (statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before)
+    return seen
+
+
+def full_scans(conn, statement, parameters):
+    """Return the tables EXPLAIN says are read without an index."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        tables = []
+        for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            m = _SQLITE_SCAN_RE.match(row[-1])
+            if m:
+                tables.append(m.group(1))
+        return tables
+    if dialect == "mysql":
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings()
+        return [r["table"] for r in rows if r["type"] == "ALL"]
+    raise SystemExit(f"EXPLAIN parsing is not implemented for {dialect}")
+
+
+def run(url, size, work_dir):
+    engine = create_engine(url or f"sqlite:///{os.path.join(work_dir, 'plans.db')}")
+    config.SessionLocal.configure(bind=engine)
+    config.Base.metadata.drop_all(engine)
+    config.Base.metadata.create_all(engine)
+    generate(engine, SIZES[size], password=None)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        ctx = build_context(db, work_dir)
+
+    statements = capture(engine)
+    for svc_cls in SERVICES:
+        for name, case in CASES.get(svc_cls.__name__, {}).items():
+            with Session() as db:
+                ret = getattr(svc_cls(db), name)(*case.args(ctx, db))
+                if case.teardown:
+                    case.teardown(ctx, db, ret)
+
+    problems = []
+    with engine.connect() as conn:
+        for (label, _), (statement, parameters) in sorted(statements.items()):
+            if label in WHOLE_TABLE_READS:
+                continue
+            scanned = [t for t in full_scans(conn, statement, parameters)
+                       if t not in REFERENCE_TABLES]
+            if scanned:
+                problems.append((label, scanned, statement))
+    engine.dispose()
+    return len(statements), problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that service queries use indexes.")
+    parser.add_argument("--url", help="scratch database URL (dropped and re-seeded!); default: temp SQLite")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="serms_plans_") as work_dir:
+        checked, problems = run(args.url, args.size, work_dir)
+    for label, tables, statement in problems:
+        print(f"FULL SCAN [{label}] {', '.join(tables)}: {query_profiler.statement_shape(statement)[:200]}")
+    print(f"{checked} statements checked, {len(problems)} with full scans.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
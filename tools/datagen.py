@@ -0,0 +1,279 @@
+"""
+tools/datagen.py - Synthetic school data generator for load and capacity testing
+
+Writes classes per academic year, subjects per class (each with a teacher and
+its own mark distribution), students with admission numbers and one result
+per student per class subject, in that year's term-1 exam session (the
+latest generated year becomes current if no session is). Everything goes through Core ``insert()``
+executemany batches with explicit ids; passwords are hashed once and the
+hash is shared by every fake account, so bcrypt never runs per row.
+
+    python tools/datagen.py --url sqlite:///synthetic.db --preset capacity
+    python tools/datagen.py --url mysql+pymysql://u:p@host/db --years 2 \\
+        --classes-per-year 40 --students-per-class 45 --subjects-per-class 11
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, text, update  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+import config  # noqa: E402
+import models  # noqa: E402,F401  (registers tables)
+from models.class_model import Class  # noqa: E402
+from models.student import Student  # noqa: E402
+from models.subject import Subject  # noqa: E402
+from models.result import Result  # noqa: E402
+from models.exam_session import ExamSession  # noqa: E402
+from models.user import Teacher  # noqa: E402
+from models.account import Account  # noqa: E402
+from models.ranking import RankingDirtyClass  # noqa: E402
+from services.grade_scale_service import GradeScaleService  # noqa: E402
+from services.reference_data import ReferenceDataService  # noqa: E402
+from services.summary_service import SummaryService  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 20_000
+
+SUBJECT_NAMES = [
+    "Mathematics", "English", "Kiswahili", "Biology", "Chemistry", "Physics",
+    "History", "Geography", "Religious Studies", "Business Studies",
+    "Agriculture", "Computer Studies", "French", "Music", "Art & Design",
+    "Home Science", "German", "Arabic", "Physical Education", "Literature",
+]
+FIRST_NAMES = np.array([
+    "Amina", "Brian", "Cynthia", "David", "Esther", "Felix", "Grace", "Hassan",
+    "Irene", "John", "Kevin", "Lydia", "Mercy", "Noah", "Olive", "Peter",
+    "Queen", "Rashid", "Sarah", "Tom", "Umar", "Violet", "Wesley", "Yvonne",
+])
+LAST_NAMES = np.array([
+    "Otieno", "Wanjiku", "Mwangi", "Achieng", "Kamau", "Njeri", "Mutua",
+    "Chebet", "Kiptoo", "Omondi", "Wambui", "Barasa", "Nyambura", "Korir",
+])
+STREAMS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+# Not a bcrypt hash: accounts generated with --no-login can never sign in.
+DISABLED_PASSWORD = "!synthetic"
+
+
+class Scale(NamedTuple):
+    years: int = 1
+    classes_per_year: int = 8
+    students_per_class: int = 40
+    subjects_per_class: int = 10
+    teachers: int = 0  # 0 = one teacher per four subjects
+
+    @property
+    def classes(self):
+        return self.years * self.classes_per_year
+
+    @property
+    def students(self):
+        return self.classes * self.students_per_class
+
+    @property
+    def subjects(self):
+        return self.classes * self.subjects_per_class
+
+    @property
+    def results(self):
+        return self.students * self.subjects_per_class
+
+
+PRESETS = {
+    "tiny":     Scale(1, 4, 20, 6),
+    "small":    Scale(1, 8, 40, 10),
+    "school":   Scale(1, 50, 400, 8),
+    "capacity": Scale(5, 60, 250, 14),   # 75k students, ~1.05M results
+}
+
+
+def generate(engine, scale: Scale, seed: int = 42, password: str = None, first_year: int = None):
+    """Append a synthetic dataset to *engine*'s schema; return row counts written."""
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    first_year = first_year or now.year - scale.years + 1
+    if password:
+        from services.auth_service import AuthService
+        password_hash = AuthService.hash_password(password)
+    else:
+        password_hash = DISABLED_PASSWORD
+    teachers = scale.teachers or max(1, scale.subjects // 4)
+
+    # Cached snapshots may belong to another database (or predate this one's rows).
+    GradeScaleService.invalidate()
+    ReferenceDataService.invalidate()
+    with Session(engine) as db:
+        GradeScaleService(db).sync_if_empty()
+        grading = GradeScaleService(db).get().default
+        base = {m: (db.query(func.max(m.id)).scalar() or 0)
+                for m in (Teacher, Class, Subject, Student, Result)}
+
+        t0 = base[Teacher]
+        _bulk(db, Teacher, [
+            dict(id=t0 + i, full_name=f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i % len(LAST_NAMES)]}",
+                 email=f"teacher{t0 + i}@synthetic.local", password_hash=password_hash,
+                 role="TEACHER", created_at=now)
+            for i in range(1, teachers + 1)
+        ])
+        _bulk(db, Account, [
+            dict(login=f"teacher{t0 + i}@synthetic.local", role="TEACHER", user_id=t0 + i)
+            for i in range(1, teachers + 1)
+        ])
+
+        # One term-1 session per generated year, reusing any that already exist.
+        session_of = dict(db.query(ExamSession.academic_year, ExamSession.id)
+                          .filter(ExamSession.term == 1))
+        years = [str(first_year + y) for y in range(scale.years)]
+        e0 = db.query(func.max(ExamSession.id)).scalar() or 0
+        new_sessions = [dict(id=e0 + i, name=f"Term 1 {year}", academic_year=year, term=1,
+                             is_current=False, created_at=now)
+                        for i, year in enumerate((y for y in years if y not in session_of), 1)]
+        _bulk(db, ExamSession, new_sessions)
+        session_of.update((row["academic_year"], row["id"]) for row in new_sessions)
+        if db.query(ExamSession.id).filter(ExamSession.is_current.is_(True)).first() is None:
+            db.execute(update(ExamSession).where(ExamSession.id == session_of[years[-1]])
+                       .values(is_current=True))
+
+        class_rows, subject_rows = [], []
+        for c in range(scale.classes):
+            year, idx = divmod(c, scale.classes_per_year)
+            class_rows.append(dict(
+                id=base[Class] + c + 1,
+                class_name=f"Form {1 + idx % 4}{STREAMS[idx // 4 % len(STREAMS)]}",
+                academic_year=str(first_year + year), created_at=now))
+            for s in range(scale.subjects_per_class):
+                sid = base[Subject] + c * scale.subjects_per_class + s + 1
+                subject_rows.append(dict(
+                    id=sid, subject_name=SUBJECT_NAMES[s % len(SUBJECT_NAMES)],
+                    class_id=base[Class] + c + 1,
+                    teacher_id=t0 + 1 + (sid - 1) % teachers, created_at=now))
+        _bulk(db, Class, class_rows)
+        _bulk(db, Subject, subject_rows)
+        # Positions are computed lazily, on first read of each class.
+        _bulk(db, RankingDirtyClass, [dict(class_id=row["id"], exam_session_id=session_of[row["academic_year"]],
+                                           generation=1) for row in class_rows])
+
+        n = scale.students
+        student_ids = base[Student] + 1 + np.arange(n)
+        class_of = base[Class] + 1 + np.arange(n) // scale.students_per_class
+        first = rng.choice(FIRST_NAMES, n)
+        last = rng.choice(LAST_NAMES, n)
+        gender = rng.choice(np.array(["Male", "Female"]), n)
+        birth_year = first_year - 15 + rng.integers(0, 4, n)
+        birth_day = rng.integers(0, 365, n)
+        for start in range(0, n, BATCH_SIZE):
+            stop = min(n, start + BATCH_SIZE)
+            _insert(db, Student, [
+                dict(id=int(student_ids[i]), admission_number=f"ADM{int(student_ids[i]):07d}",
+                     first_name=str(first[i]), last_name=str(last[i]), gender=str(gender[i]),
+                     date_of_birth=date.fromordinal(date(int(birth_year[i]), 1, 1).toordinal() + int(birth_day[i])),
+                     class_id=int(class_of[i]), password_hash=password_hash, created_at=now)
+                for i in range(start, stop)
+            ])
+            _insert(db, Account, [
+                dict(login=f"ADM{int(student_ids[i]):07d}", role="STUDENT", user_id=int(student_ids[i]))
+                for i in range(start, stop)
+            ])
+
+        # Each subject gets its own difficulty: mean 45-70, spread 8-18.
+        k = scale.subjects_per_class
+        means = rng.uniform(45, 70, scale.subjects)
+        spreads = rng.uniform(8, 18, scale.subjects)
+        session_by_class = np.array([session_of[row["academic_year"]] for row in class_rows])
+        result_id = base[Result]
+        written = 0
+        chunk_students = max(1, BATCH_SIZE // k)
+        for start in range(0, n, chunk_students):
+            stop = min(n, start + chunk_students)
+            sids = np.repeat(student_ids[start:stop], k)
+            subj_local = (np.repeat(class_of[start:stop] - base[Class] - 1, k) * k
+                          + np.tile(np.arange(k), stop - start))
+            marks = np.clip(np.round(rng.normal(means[subj_local], spreads[subj_local]), 1), 0, 100)
+            band = grading.bands_of(marks)
+            sessions = session_by_class[subj_local // k]
+            rows = []
+            for sid, subj, sess, m, grade, gpa, remarks in zip(
+                    sids.tolist(), subj_local.tolist(), sessions.tolist(), marks.tolist(),
+                    grading.grades[band].tolist(), grading.gpas[band].tolist(), grading.remarks[band].tolist()):
+                result_id += 1
+                rows.append(dict(id=result_id, student_id=sid, subject_id=base[Subject] + subj + 1,
+                                 exam_session_id=sess, marks=m, grade=grade, gpa=gpa, remarks=remarks,
+                                 created_at=now, updated_at=now))
+            _insert(db, Result, rows)
+            written += len(rows)
+        SummaryService(db).refresh(*student_ids.tolist())
+        db.commit()
+        ReferenceDataService.invalidate()
+        _analyze(db)
+
+    return {"teachers": teachers, "classes": scale.classes, "subjects": scale.subjects,
+            "students": n, "results": written}
+
+
+def _analyze(db):
+    """Refresh planner statistics after the bulk load.
+
+    Every results index leads with the exam session, so without statistics
+    the planner cannot tell that one session may hold the whole table.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        db.execute(text("ANALYZE TABLE exam_sessions, classes, subjects, students, results, student_summaries"))
+    else:
+        db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def _bulk(db, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        _insert(db, model, rows[start:start + BATCH_SIZE])
+
+
+def _insert(db, model, rows):
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic school dataset.")
+    parser.add_argument("--url", default="sqlite:///synthetic.db", help="target database URL")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--years", type=int)
+    parser.add_argument("--classes-per-year", type=int)
+    parser.add_argument("--students-per-class", type=int)
+    parser.add_argument("--subjects-per-class", type=int)
+    parser.add_argument("--teachers", type=int)
+    parser.add_argument("--first-year", type=int, help="first academic year (default: ends this year)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="Password123",
+                        help="shared password for every generated account (hashed once)")
+    parser.add_argument("--no-login", action="store_true", help="generate accounts that cannot sign in")
+    args = parser.parse_args(argv)
+
+    overrides = {f: getattr(args, f) for f in Scale._fields if getattr(args, f) is not None}
+    scale = PRESETS[args.preset]._replace(**overrides)
+
+    engine = create_engine(args.url)
+    config.Base.metadata.create_all(engine)
+    logger.info(f"Generating {scale.results:,} results for {scale.students:,} students "
+                f"({scale}) into {engine.url.render_as_string(hide_password=True)}")
+    started = time.perf_counter()
+    counts = generate(engine, scale, seed=args.seed,
+                      password=None if args.no_login else args.password,
+                      first_year=args.first_year)
+    logger.info(f"Wrote {counts} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
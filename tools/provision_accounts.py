@@ -0,0 +1,75 @@
+"""
+tools/provision_accounts.py - Bulk-create student or teacher logins from a roster CSV
+
+Student rosters need ``admission_number, first_name, last_name, gender`` and
+may add ``date_of_birth`` (YYYY-MM-DD) and ``class_id``; teacher rosters need
+``full_name, email``. Generated passwords are written to the credentials
+file (mode 0600) -- hand them out and delete it.
+
+    python tools/provision_accounts.py students roster.csv --out credentials.csv
+    python tools/provision_accounts.py teachers staff.csv --workers 8
+"""
+import argparse
+import csv
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models  # noqa: E402,F401  (registers tables)
+from config import SessionLocal  # noqa: E402
+from services.auth_service import AuthService  # noqa: E402
+from services.provisioning_service import ProvisioningService, StudentSpec, TeacherSpec  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def read_students(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            dob = (row.get("date_of_birth") or "").strip()
+            class_id = (row.get("class_id") or "").strip()
+            yield StudentSpec(
+                row["admission_number"], row["first_name"], row["last_name"], row["gender"],
+                datetime.strptime(dob, "%Y-%m-%d").date() if dob else None,
+                int(class_id) if class_id else None,
+            )
+
+
+def read_teachers(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield TeacherSpec(row["full_name"], row["email"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-provision accounts from a roster CSV.")
+    parser.add_argument("kind", choices=("students", "teachers"))
+    parser.add_argument("roster", help="input CSV with a header row")
+    parser.add_argument("--out", default="credentials.csv", help="credentials CSV to write")
+    parser.add_argument("--workers", type=int, help="hashing processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        AuthService(db).configure_hashing()
+        svc = ProvisioningService(db)
+        started = time.perf_counter()
+        if args.kind == "students":
+            report = svc.provision_students(list(read_students(args.roster)), args.out, args.workers)
+        else:
+            report = svc.provision_teachers(list(read_teachers(args.roster)), args.out, args.workers)
+    finally:
+        db.close()
+    for login, reason in report.skipped:
+        logger.warning(f"Skipped {login or '<blank>'}: {reason}")
+    logger.info(f"Created {report.created} {args.kind} in {time.perf_counter() - started:.1f}s; "
+                f"credentials written to {report.credentials_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
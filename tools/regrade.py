@@ -0,0 +1,55 @@
+"""
+tools/regrade.py - Regrade stored results after a grade scale changes
+
+Same job as "Regrade Results" under Classes & Subjects -> Grade Scales,
+for running after hours on large databases. Without a scope every live
+result is regraded; --dry-run only reports what would change.
+
+    python tools/regrade.py --dry-run
+    python tools/regrade.py --class-id 12
+    python tools/regrade.py --year 2025 --subject-id 40
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models  # noqa: E402,F401  (registers tables)
+from config import SessionLocal  # noqa: E402
+from services.regrade_service import RegradeService, BATCH_SIZE  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regrade stored results with the grade scales now in use.")
+    parser.add_argument("--class-id", type=int, help="only this class's students")
+    parser.add_argument("--year", help="only the classes of this academic year, e.g. 2025")
+    parser.add_argument("--subject-id", type=int, help="only this subject's results")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        logger.info(f"{done:,} / {total:,} result(s) checked")
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        report = RegradeService(db).regrade(args.class_id, args.year, args.subject_id, dry_run=args.dry_run,
+                                            progress=progress, batch_size=args.batch_size)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        db.close()
+    prefix = "Dry run: " if args.dry_run else ""
+    logger.info(f"{prefix}{report.describe()} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
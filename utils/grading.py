@@ -0,0 +1,88 @@
+"""
+utils/grading.py - A grade scale compiled into a marks -> band lookup table
+
+A scale is a list of bands, each starting at its ``min_marks`` and running
+up to the next band's start, so every mark from 0 to 100 falls in exactly
+one band (79.5 is a B on the default scale, not a gap). Compiling fills one
+slot per 0.1 mark, so grading a mark is an array index: ``grade`` for one
+mark, ``bands_of`` for a NumPy array of them. Band starts must therefore be
+multiples of 0.1, which also lets SQL compare marks against them directly
+(``>= min_marks``) and agree with the table.
+"""
+from typing import NamedTuple
+import numpy as np
+
+STEPS = 10          # lookup slots per mark
+SLOTS = 100 * STEPS + 1
+
+
+class Band(NamedTuple):
+    min_marks: float
+    grade: str
+    gpa: float
+    remarks: str
+
+
+class CompiledScale:
+    """An immutable, thread-safe grade lookup; ``bands`` run from the top band down."""
+
+    def __init__(self, bands, scale_id=None, name="Default", version=1):
+        bands = sorted((Band(float(b[0]), b[1], float(b[2]), b[3]) for b in bands),
+                       key=lambda b: b.min_marks, reverse=True)
+        starts = [b.min_marks for b in bands]
+        if not bands or starts[-1] != 0:
+            raise ValueError("A grade scale needs a band starting at 0 marks.")
+        if len(set(starts)) != len(starts):
+            raise ValueError("Two bands of a grade scale start at the same mark.")
+        for b in bands:
+            if not 0 <= b.min_marks <= 100 or abs(b.min_marks * STEPS - round(b.min_marks * STEPS)) > 1e-6:
+                raise ValueError(f"Band {b.grade} must start at a mark between 0 and 100 in steps of 0.1.")
+            if not b.grade.strip():
+                raise ValueError("Every band needs a grade.")
+        self.bands = tuple(bands)
+        self.scale_id = scale_id
+        self.name = name
+        self.version = version
+        # slot -> band position; later (higher) bands overwrite from their start
+        index = np.zeros(SLOTS, dtype=np.int16)
+        for position in range(len(bands) - 1, -1, -1):
+            index[int(round(bands[position].min_marks * STEPS)):] = position
+        self._index = index
+        self._slots = [tuple(bands[p])[1:] for p in index.tolist()]
+        self.grades = np.array([b.grade for b in bands], dtype=object)
+        self.gpas = np.array([b.gpa for b in bands], dtype=np.float64)
+        self.remarks = np.array([b.remarks for b in bands], dtype=object)
+
+    @property
+    def pass_mark(self):
+        """Where the lowest band with a GPA above zero starts; None if no band passes."""
+        passing = [b.min_marks for b in self.bands if b.gpa > 0]
+        return passing[-1] if passing else None
+
+    def grade(self, marks):
+        """(grade, gpa, remarks) for one mark; marks outside 0-100 get the nearest end band."""
+        return self._slots[_slot(marks)]
+
+    def bands_of(self, marks) -> np.ndarray:
+        """Band positions for an array of marks; index ``grades`` / ``gpas`` / ``remarks`` with them."""
+        slots = np.floor(np.asarray(marks, dtype=np.float64) * STEPS + 1e-6).astype(np.int64)
+        return self._index[np.clip(slots, 0, SLOTS - 1)]
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledScale) and self.bands == other.bands
+
+    def __hash__(self):
+        return hash(self.bands)
+
+    def __repr__(self):
+        return f"<CompiledScale {self.name} v{self.version} {[b.grade for b in self.bands]}>"
+
+
+def _slot(marks):
+    slot = int(marks * STEPS + 1e-6) if marks > 0 else 0
+    return slot if slot < SLOTS else SLOTS - 1
+
+
+def from_config(scale):
+    """Compile a config-style scale of (low, high, grade, gpa, remarks) rows."""
+    return CompiledScale([(low, grade, gpa, remarks) for low, _, grade, gpa, remarks in scale])
@@ -0,0 +1,82 @@
+"""
+utils/prefetch.py - Warm a panel's data on a worker while the pointer hovers its nav item
+
+Dashboards start a job when a sidebar item has been hovered for a moment
+and take its result when the click lands, so the panel renders without
+waiting on the database. Jobs are keyed by section: at most one per key,
+at most MAX_PENDING queued or running, and a job that has not started yet
+is cancelled when the pointer leaves. Results are dropped once this
+process commits a write or MAX_AGE seconds pass, so a click never renders
+data older than a reload would.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import ScopedSession
+from utils.unit_of_work import write_generation
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("future", "generation", "started")
+
+    def __init__(self, future):
+        self.future = future
+        self.generation = write_generation()
+        self.started = time.monotonic()
+
+
+class Prefetcher:
+    MAX_PENDING = 2
+    MAX_AGE = 30  # seconds
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._jobs = {}  # key -> _Job
+
+    def start(self, key, fn):
+        """Run *fn* on the worker unless *key* already has a usable job or too many are pending."""
+        job = self._jobs.get(key)
+        if job is not None and not self._expired(job):
+            return
+        if sum(not j.future.done() for j in self._jobs.values()) >= self.MAX_PENDING:
+            return
+        self._jobs[key] = _Job(self._pool.submit(_run, fn))
+
+    def cancel(self, key):
+        """Drop *key*'s job if it has not started; a running one is left to finish."""
+        job = self._jobs.get(key)
+        if job is not None and job.future.cancel():
+            del self._jobs[key]
+
+    def take(self, key):
+        """The warmed result for *key*, waiting on a running job; None if there is none to use."""
+        job = self._jobs.pop(key, None)
+        if job is None or job.future.cancel() or self._expired(job):
+            return None
+        try:
+            result = job.future.result()
+        except Exception as e:
+            logger.warning(f"Prefetch of {key} failed: {e}")
+            return None
+        # A write may have committed while the job ran.
+        return None if self._expired(job) else result
+
+    def shutdown(self):
+        for job in self._jobs.values():
+            job.future.cancel()
+        self._jobs.clear()
+        self._pool.shutdown(wait=False)
+
+    def _expired(self, job):
+        return (job.generation != write_generation()
+                or time.monotonic() - job.started > self.MAX_AGE)
+
+
+def _run(fn):
+    """Runs on the worker, in that thread's own scoped session."""
+    try:
+        return fn()
+    finally:
+        ScopedSession.remove()
@@ -0,0 +1,213 @@
+"""
+utils/query_profiler.py - SQL statement counting, timing and N+1 detection
+
+Hooks ``before_cursor_execute`` / ``after_cursor_execute`` on the engine and
+attributes every statement to the scopes that are open on the current thread
+(a UI action, a panel refresh, a service method). When a scope closes its
+statistics are folded into per-label totals; scopes that repeat the same
+statement shape ``N1_THRESHOLD`` times or more are logged as likely N+1
+patterns and kept for the admin Diagnostics view.
+"""
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+N1_THRESHOLD = 5          # identical statement shapes per scope
+STATEMENT_BUDGET = 50     # statements per scope before a warning is logged
+HISTORY_SIZE = 200
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = {}                             # label -> LabelTotals
+_findings = deque(maxlen=HISTORY_SIZE)   # recent N1Finding
+_installed = set()
+
+_WS_RE = re.compile(r"\s+")
+_PARAM_LIST_RE = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s)\s*,)+\s*(?:\?|%s|%\(\w+\)s)\s*\)")
+
+
+class _Scope:
+    __slots__ = ("label", "statements", "elapsed_ms", "shapes")
+
+    def __init__(self, label):
+        self.label = label
+        self.statements = 0
+        self.elapsed_ms = 0.0
+        self.shapes = Counter()
+
+
+class LabelTotals:
+    __slots__ = ("label", "calls", "statements", "elapsed_ms", "max_statements", "n1_hits")
+
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.statements = 0
+        self.elapsed_ms = 0.0
+        self.max_statements = 0
+        self.n1_hits = 0
+
+    @property
+    def avg_statements(self):
+        return self.statements / self.calls if self.calls else 0.0
+
+    @property
+    def avg_ms(self):
+        return self.elapsed_ms / self.calls if self.calls else 0.0
+
+
+class N1Finding:
+    __slots__ = ("label", "shape", "count", "at")
+
+    def __init__(self, label, shape, count):
+        self.label = label
+        self.shape = shape
+        self.count = count
+        self.at = time.time()
+
+
+def install(engine):
+    """Attach the cursor-execute listeners to *engine* (idempotent)."""
+    if id(engine) in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+    _installed.add(id(engine))
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeated executions with new params compare equal."""
+    return _PARAM_LIST_RE.sub("(?)", _WS_RE.sub(" ", statement).strip())
+
+
+@contextmanager
+def track(label: str):
+    """Attribute every statement issued inside the block to *label*."""
+    stack = _stack()
+    scope = _Scope(label)
+    stack.append(scope)
+    try:
+        yield scope
+    finally:
+        stack.pop()
+        _record(scope)
+
+
+def profiled(label: str = None):
+    """Decorator form of track(); defaults to the function's qualified name."""
+    def decorator(fn):
+        name = label or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument(cls):
+    """Class decorator: profile every public method as ``ClassName.method``."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attr):
+            continue
+        setattr(cls, name, profiled(f"{cls.__name__}.{name}")(attr))
+    return cls
+
+
+def current_label():
+    """Label of the innermost open scope on this thread, or None."""
+    stack = _stack()
+    return stack[-1].label if stack else None
+
+
+def totals():
+    """Return LabelTotals for every label seen, busiest first."""
+    with _lock:
+        rows = list(_totals.values())
+    return sorted(rows, key=lambda t: t.statements, reverse=True)
+
+
+def findings():
+    """Return recent N+1 findings, newest first."""
+    with _lock:
+        return list(reversed(_findings))
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+        _findings.clear()
+
+
+def log_report(limit: int = 20):
+    """Write the busiest labels to the application log."""
+    for t in totals()[:limit]:
+        logger.info(
+            f"{t.label}: calls={t.calls} statements={t.statements} "
+            f"avg={t.avg_statements:.1f} max={t.max_statements} "
+            f"avg_ms={t.avg_ms:.1f} n+1={t.n1_hits}")
+
+
+# ── Internals ────────────────────────────────────────────────────────────────
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_profiler_start"].pop()
+    stack = _stack()
+    if not stack:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    shape = statement_shape(statement)
+    for scope in stack:
+        scope.statements += 1
+        scope.elapsed_ms += elapsed_ms
+        scope.shapes[shape] += 1
+
+
+def _on_error(context):
+    # A failed statement never reaches _after_execute; drop its start time from the pooled connection.
+    started = context.connection.info.get("query_profiler_start") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _record(scope):
+    repeated = [(shape, n) for shape, n in scope.shapes.items() if n >= N1_THRESHOLD]
+    with _lock:
+        t = _totals.get(scope.label)
+        if t is None:
+            t = _totals[scope.label] = LabelTotals(scope.label)
+        t.calls += 1
+        t.statements += scope.statements
+        t.elapsed_ms += scope.elapsed_ms
+        t.max_statements = max(t.max_statements, scope.statements)
+        if repeated:
+            t.n1_hits += 1
+            for shape, n in repeated:
+                _findings.append(N1Finding(scope.label, shape, n))
+    for shape, n in repeated:
+        logger.warning(f"Possible N+1 in {scope.label}: {n}x {shape[:160]}")
+    if scope.statements > STATEMENT_BUDGET:
+        logger.warning(
+            f"{scope.label} issued {scope.statements} statements "
+            f"in {scope.elapsed_ms:.1f} ms")
@@ -0,0 +1,212 @@
+"""
+utils/table_binding.py - Keep a flat ttk.Treeview in step with a list of rows
+
+Panels used to refresh a table by deleting every item and inserting every
+row again, which costs Tk work per row and throws away the scroll position
+and selection. ``TableBinding`` remembers what it last wrote under each
+iid, diffs the new row list against it and applies only the deletes,
+inserts, value / tag updates and moves. Rows that keep their relative
+order are never moved (longest increasing subsequence), so refreshing a
+5k-row table after one edit touches one item. When more than BULK rows
+are inserted or moved (first load, a sort, clearing a filter) the new rows
+are appended and the order set with one ``set_children`` call instead.
+
+The rows live in a TableModel, so clicking a header listed in *sortable*
+sorts by that row field and ``filter()`` narrows the table, both without
+re-querying.
+"""
+from bisect import bisect_left
+from typing import NamedTuple
+from utils.table_model import TableModel
+
+
+class TableDiff(NamedTuple):
+    inserted: int
+    updated: int
+    deleted: int
+    moved: int
+
+
+class TableBinding:
+    """Diff-based population of *tree* from rows.
+
+    *values* maps a row to its column values and *key* to its iid (the
+    row's ``id`` by default); *tags* optionally maps a row to its tags.
+    With *striped*, "odd" / "even" tags follow the row's position, so an
+    insert or delete restripes the rows below it (tags only). *sortable*
+    maps tree column ids to the row fields their header sorts by.
+    """
+    BULK = 64
+
+    def __init__(self, tree, values, key=None, tags=None, striped=False, sortable=None):
+        self.tree = tree
+        self._values = values
+        self._key = key or (lambda row: row.id)
+        self._tags = tags
+        self._striped = striped
+        self._items = {}    # iid -> (values, tags) as last written
+        self._order = []    # iids in display order
+        self.model = TableModel(self._key)
+        self._sortable = dict(sortable or {})
+        self._headings = {col: tree.heading(col, "text") for col in self._sortable}
+        for col, field in self._sortable.items():
+            tree.heading(col, command=lambda f=field: self.sort_by(f))
+
+    def update(self, rows) -> TableDiff:
+        """Load *rows* and show them under the current sort and filter."""
+        self.model.load(rows)
+        return self._show(self.model.visible())
+
+    def sort_by(self, field) -> TableDiff:
+        """Sort by *field* (again: reverse it); the previous sort breaks ties."""
+        self.model.sort_by(field)
+        self._mark_headings()
+        return self._show(self.model.visible())
+
+    def filter(self, **criteria) -> TableDiff:
+        """Show only rows matching *criteria* (see TableModel.filter)."""
+        self.model.filter(**criteria)
+        return self._show(self.model.visible())
+
+    def patch(self, rows=(), removed=(), index=None) -> TableDiff:
+        """Upsert *rows* (new ones at *index*, default end) and drop *removed* keys."""
+        rows = list(rows)
+        self.model.patch(rows, removed, index)
+        if self.model.active:
+            return self._show(self.model.visible())
+        for key in removed:
+            self._discard(key)
+        for row in reversed(rows) if index is not None else rows:
+            self._put(row, index)
+        return TableDiff(0, 0, 0, 0)
+
+    def put(self, row, index=None):
+        """Insert *row* at *index* (default: end), or update it in place if it is shown."""
+        self.patch([row], index=index)
+
+    def discard(self, key):
+        """Remove the row with *key* if it is shown."""
+        self.patch(removed=[key])
+
+    def _show(self, rows) -> TableDiff:
+        """Make the tree show exactly *rows*, in order."""
+        wanted, order = {}, []
+        for position, row in enumerate(rows):
+            iid = str(self._key(row))
+            wanted[iid] = self._render(row, position)
+            order.append(iid)
+
+        gone = [iid for iid in self._order if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+        kept = [iid for iid in self._order if iid in wanted]
+        stay = _longest_increasing({iid: i for i, iid in enumerate(kept)}, order)
+
+        if (len(kept) - len(stay)) + (len(order) - len(kept)) > self.BULK:
+            return self._show_bulk(wanted, order, len(gone), len(kept) - len(stay))
+
+        inserted = updated = moved = 0
+        previous = None
+        for iid in order:
+            values, tags = wanted[iid]
+            old = self._items.get(iid)
+            if old is None:
+                self.tree.insert("", self._after(previous), iid=iid, values=values, tags=tags)
+                inserted += 1
+            else:
+                if iid not in stay:
+                    self.tree.move(iid, "", self._move_target(iid, previous))
+                    moved += 1
+                if old != (values, tags):
+                    self.tree.item(iid, values=values, tags=tags)
+                    updated += 1
+            previous = iid
+
+        self._items, self._order = wanted, order
+        return TableDiff(inserted, updated, len(gone), moved)
+
+    def _show_bulk(self, wanted, order, deleted, moved):
+        inserted = updated = 0
+        for iid in order:
+            values, tags = wanted[iid]
+            old = self._items.get(iid)
+            if old is None:
+                self.tree.insert("", "end", iid=iid, values=values, tags=tags)
+                inserted += 1
+            elif old != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+                updated += 1
+        self.tree.set_children("", *order)
+        self._items, self._order = wanted, order
+        return TableDiff(inserted, updated, deleted, moved)
+
+    def _mark_headings(self):
+        primary = self.model.sort_keys[0] if self.model.sort_keys else None
+        for col, field in self._sortable.items():
+            text = self._headings[col]
+            if primary and primary[0] == field:
+                text += " \u25bc" if primary[1] else " \u25b2"
+            self.tree.heading(col, text=text)
+
+    def _put(self, row, index=None):
+        iid = str(self._key(row))
+        values, tags = self._render(row, None)
+        if iid in self._items:
+            if self._items[iid] != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+                self._items[iid] = (values, tags)
+            return
+        index = len(self._order) if index is None else index
+        self.tree.insert("", index, iid=iid, values=values, tags=tags)
+        self._items[iid] = (values, tags)
+        self._order.insert(index, iid)
+
+    def _discard(self, key):
+        iid = str(key)
+        if self._items.pop(iid, None) is not None:
+            self.tree.delete(iid)
+            self._order.remove(iid)
+
+    def __contains__(self, key):
+        return str(key) in self._items
+
+    def __len__(self):
+        return len(self._order)
+
+    def _render(self, row, position):
+        values = tuple(self._values(row))
+        tags = tuple(self._tags(row)) if self._tags else ()
+        if self._striped and position is not None:
+            tags += ("odd" if position % 2 else "even",)
+        return values, tags
+
+    def _after(self, previous):
+        return 0 if previous is None else self.tree.index(previous) + 1
+
+    def _move_target(self, iid, previous):
+        # Treeview.move takes the final index, counted once the item is lifted out.
+        if previous is None:
+            return 0
+        target = self.tree.index(previous)
+        return target if self.tree.index(iid) < target else target + 1
+
+
+def _longest_increasing(positions, order):
+    """The iids of *order* that keep their relative order, as a set (patience sorting)."""
+    seq = [iid for iid in order if iid in positions]
+    tails, tail_iids, parents = [], [], {}
+    for iid in seq:
+        p = positions[iid]
+        i = bisect_left(tails, p)
+        parents[iid] = tail_iids[i - 1] if i else None
+        if i == len(tails):
+            tails.append(p)
+            tail_iids.append(iid)
+        else:
+            tails[i] = p
+            tail_iids[i] = iid
+    keep, iid = set(), tail_iids[-1] if tail_iids else None
+    while iid is not None:
+        keep.add(iid)
+        iid = parents[iid]
+    return keep
@@ -0,0 +1,137 @@
+"""
+utils/table_model.py - Columnar copy of a table's rows for client-side sort and filter
+
+A TableModel holds the rows a table loaded and, on first use, one NumPy
+array per field it is asked to sort or filter by: numbers as float64 (None
+-> NaN), anything else as integer codes into the field's sorted distinct
+values. Sorting is one stable ``np.lexsort`` over up to MAX_SORT_KEYS keys
+and filters are compiled into boolean masks, so re-ordering or narrowing
+100k rows takes milliseconds and no query. Patching rows drops the arrays;
+they are rebuilt the next time a sort or filter needs them.
+"""
+from decimal import Decimal
+import numpy as np
+
+
+class TableModel:
+    MAX_SORT_KEYS = 3
+
+    def __init__(self, key=None):
+        self._key = key or (lambda row: row.id)
+        self._rows = []       # in load order
+        self._columns = {}    # field -> float64 values or int codes
+        self._uniques = {}    # text field -> sorted distinct values (codes index these)
+        self.sort_keys = []   # [(field, descending)], primary first
+        self.criteria = {}    # field -> value | set of values | (low, high)
+
+    @property
+    def active(self) -> bool:
+        """True if a sort or filter is applied, i.e. the table is not in load order."""
+        return bool(self.sort_keys or self.criteria)
+
+    def load(self, rows):
+        self._rows = list(rows)
+        self._invalidate()
+
+    def patch(self, rows=(), removed=(), index=None):
+        """Replace *rows* in place by key, add the new ones at *index* (default: end), drop *removed* keys."""
+        fresh = {str(self._key(r)): r for r in rows}
+        gone = {str(k) for k in removed}
+        kept = []
+        for row in self._rows:
+            key = str(self._key(row))
+            if key not in gone:
+                kept.append(fresh.pop(key, row))
+        index = len(kept) if index is None else index
+        self._rows = kept[:index] + list(fresh.values()) + kept[index:]
+        self._invalidate()
+
+    def sort_by(self, field):
+        """Make *field* the primary key, or flip it if it already is; the previous keys break ties."""
+        if self.sort_keys and self.sort_keys[0][0] == field:
+            self.sort_keys[0] = (field, not self.sort_keys[0][1])
+        else:
+            rest = [k for k in self.sort_keys if k[0] != field]
+            self.sort_keys = [(field, False)] + rest[:self.MAX_SORT_KEYS - 1]
+
+    def filter(self, **criteria):
+        """Replace the filter. Each field takes a value, a set of values or a (low, high)
+        range with None for an open end; a None criterion is no filter."""
+        self.criteria = {f: c for f, c in criteria.items() if c is not None}
+
+    def matches(self, row) -> bool:
+        """The filter applied to one row, without building columns."""
+        for field, want in self.criteria.items():
+            value = getattr(row, field)
+            if isinstance(want, tuple):
+                low, high = want
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            elif isinstance(want, (set, frozenset, list)):
+                if value not in want:
+                    return False
+            elif value != want:
+                return False
+        return True
+
+    def visible(self):
+        """The rows that pass the filter, in sort order (load order if unsorted)."""
+        if not self.active:
+            return list(self._rows)
+        index = np.flatnonzero(self.mask()) if self.criteria else np.arange(len(self._rows))
+        if self.sort_keys:
+            # lexsort sorts by the last key first
+            keys = [self._sort_key(f, desc)[index] for f, desc in reversed(self.sort_keys)]
+            index = index[np.lexsort(keys)]
+        rows = self._rows
+        return [rows[i] for i in index.tolist()]
+
+    def mask(self) -> np.ndarray:
+        mask = np.ones(len(self._rows), dtype=bool)
+        for field, want in self.criteria.items():
+            mask &= self._compile(field, want)
+        return mask
+
+    def column(self, field) -> np.ndarray:
+        col = self._columns.get(field)
+        if col is None:
+            values = [getattr(r, field) for r in self._rows]
+            sample = next((v for v in values if v is not None), None)
+            if isinstance(sample, (int, float, Decimal)) and not isinstance(sample, bool):
+                col = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+            else:
+                text = np.array(["" if v is None else str(v) for v in values], dtype=str)
+                self._uniques[field], col = np.unique(text, return_inverse=True)
+            self._columns[field] = col
+        return col
+
+    def _compile(self, field, want):
+        col = self.column(field)
+        if isinstance(want, tuple):
+            if field in self._uniques:
+                raise ValueError(f"{field} is not numeric; it cannot be filtered by range.")
+            low, high = want
+            mask = ~np.isnan(col)
+            if low is not None:
+                mask &= col >= low
+            if high is not None:
+                mask &= col <= high
+            return mask
+        wanted = list(want) if isinstance(want, (set, frozenset, list)) else [want]
+        if field in self._uniques:
+            wanted = self._codes(field, wanted)
+        return np.isin(col, wanted)
+
+    def _codes(self, field, values):
+        uniques = self._uniques[field]
+        values = [str(v) for v in values]
+        at = np.searchsorted(uniques, values)
+        return [i for i, v in zip(at, values) if i < len(uniques) and uniques[i] == v]
+
+    def _sort_key(self, field, descending):
+        col = self.column(field)
+        return -col if descending else col
+
+    def _invalidate(self):
+        self._columns.clear()
+        self._uniques.clear()
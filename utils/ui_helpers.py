@@ -212,6 +212,10 @@ def confirm_delete(item_name: str = "this item") -> bool:
     )
 
 
+def confirm_action(title: str, message: str) -> bool:
+    return messagebox.askyesno(title, message, icon="warning")
+
+
 def show_error(title, message):
     messagebox.showerror(title, message)
 
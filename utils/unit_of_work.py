@@ -0,0 +1,95 @@
+"""
+utils/unit_of_work.py - One database session per Tk event on the UI thread
+
+Dashboards hand ``ScopedSession`` to their services instead of a long-lived
+``SessionLocal()``. The first statement issued while handling a Tk event opens
+a session; once the event has been processed the session is removed, so the
+identity map never outlives a single UI action and a failed commit cannot
+poison later ones.
+
+The release runs from ``after_idle``, so anything that spins a nested event
+loop inside a handler ends the session there and then: message boxes,
+``confirm_*`` dialogs and ``update_idletasks()`` (progress updates). ORM
+objects loaded before such a call are detached afterwards, and reading a
+lazy relationship on them raises ``DetachedInstanceError``. Handlers copy
+what they need into locals or read models (``services.read_models``) before
+showing a dialog; services called afterwards simply open a fresh session.
+
+It also counts committed transactions that wrote anything (from any thread),
+so cached views can tell whether this process changed data since they loaded.
+"""
+import itertools
+import logging
+import threading
+from sqlalchemy import event
+from config import SessionLocal, ScopedSession
+
+logger = logging.getLogger(__name__)
+
+_root = None
+_release_pending = False
+_generations = itertools.count(1)
+_write_generation = 0
+
+
+def install(root):
+    """Bind per-event session release to the Tk root window (call once)."""
+    global _root
+    if _root is None:
+        event.listen(SessionLocal, "after_begin", _on_begin)
+        event.listen(SessionLocal, "after_flush", _on_flush)
+        event.listen(SessionLocal, "do_orm_execute", _on_execute)
+        event.listen(SessionLocal, "after_commit", _on_commit)
+        event.listen(SessionLocal, "after_rollback", _on_rollback)
+    _root = root
+
+
+def write_generation() -> int:
+    """Changes whenever a transaction that wrote rows commits in this process."""
+    return _write_generation
+
+
+def release():
+    """Close the UI thread's current session, discarding its identity map."""
+    global _release_pending
+    _release_pending = False
+    try:
+        ScopedSession.remove()
+    except Exception as e:
+        logger.error(f"Error releasing session: {e}")
+
+
+def _on_begin(session, transaction, connection):
+    global _release_pending
+    if _release_pending or _root is None:
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if not ScopedSession.registry.has() or ScopedSession.registry() is not session:
+        return
+    _release_pending = True
+    try:
+        _root.after_idle(release)
+    except Exception:
+        # Root already destroyed (shutdown); nothing left to schedule on.
+        _release_pending = False
+
+
+def _on_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+def _on_execute(state):
+    # Set-based insert / update / delete statements bypass the flush.
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+def _on_commit(session):
+    global _write_generation
+    if session.info.pop("wrote", False):
+        _write_generation = next(_generations)
+
+
+def _on_rollback(session):
+    session.info.pop("wrote", None)
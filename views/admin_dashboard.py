@@ -11,16 +11,18 @@ from views.classes_subjects_panel import ClassesSubjectsPanel
 from views.results_panel import ResultsPanel
 from views.analytics_panel import AnalyticsPanel
 from views.reports_panel import ReportsPanel
+from views.diagnostics_panel import DiagnosticsPanel
 from services import (
     StudentService, TeacherService, ClassService,
-    SubjectService, ResultService, ReportService, AnalyticsService
+    SubjectService, ResultService, ReportService, AnalyticsService, ExamSessionService,
+    ArchiveService, ReferenceDataService, GradeScaleService, RegradeService,
 )
-from config import SessionLocal
+from config import ScopedSession
 
 
 class AdminDashboard(BaseDashboard):
     def __init__(self, master, user, logout_callback):
-        self._db = SessionLocal()
+        self._db = ScopedSession
         self._init_services()
         self.NAV_ITEMS = [
             ("Dashboard",   self._show_overview),
@@ -30,7 +32,15 @@ class AdminDashboard(BaseDashboard):
             ("Results",     self._show_results),
             ("Analytics",   self._show_analytics),
             ("Reports",     self._show_reports),
+            ("Diagnostics", self._show_diagnostics),
         ]
+        self.PREFETCH = {
+            "Dashboard": self.analytics_svc.total_stats,
+            "Students":  lambda: StudentsPanel.fetch(self.student_svc),
+            "Teachers":  self.teacher_svc.get_all_rows,
+            "Results":   lambda: ResultsPanel.fetch(self.result_svc),
+            "Analytics": lambda: AnalyticsPanel.fetch(self.analytics_svc),
+        }
         super().__init__(master, user, "ADMIN", logout_callback)
         # Auto-load overview
         self._nav_click("Dashboard", self._show_overview)
@@ -44,11 +54,16 @@ class AdminDashboard(BaseDashboard):
         self.result_svc = ResultService(db)
         self.report_svc = ReportService(db)
         self.analytics_svc = AnalyticsService(db)
+        self.exam_session_svc = ExamSessionService(db)
+        self.archive_svc = ArchiveService(db)
+        self.reference_svc = ReferenceDataService(db)
+        self.grade_scale_svc = GradeScaleService(db)
+        self.regrade_svc = RegradeService(db)
 
     def _show_overview(self):
         self.update_section_title("Dashboard Overview")
         f = self.get_content_frame()
-        stats = self.analytics_svc.total_stats()
+        stats = self.prefetched("Dashboard") or self.analytics_svc.total_stats()
         from utils.ui_helpers import make_stat_card, make_divider, bind_hover
 
         # ── Welcome header ───────────────────────────────────────────────────
@@ -116,27 +131,36 @@ class AdminDashboard(BaseDashboard):
 
     def _show_students(self):
         self.update_section_title("Student Management")
-        StudentsPanel(self.get_content_frame(), self.student_svc, self.class_svc)
+        return StudentsPanel(self.get_content_frame(), self.student_svc, self.reference_svc,
+                             data=self.prefetched("Students"))
 
     def _show_teachers(self):
         self.update_section_title("Teacher Management")
-        TeachersPanel(self.get_content_frame(), self.teacher_svc, self.subject_svc)
+        return TeachersPanel(self.get_content_frame(), self.teacher_svc, self.subject_svc,
+                             data=self.prefetched("Teachers"))
 
     def _show_classes(self):
         self.update_section_title("Classes & Subjects")
-        ClassesSubjectsPanel(self.get_content_frame(), self.class_svc,
-                             self.subject_svc, self.teacher_svc)
+        return ClassesSubjectsPanel(self.get_content_frame(), self.class_svc,
+                             self.subject_svc, self.reference_svc, self.exam_session_svc,
+                             self.archive_svc, self.grade_scale_svc, self.regrade_svc)
 
     def _show_results(self):
         self.update_section_title("Results Management")
-        ResultsPanel(self.get_content_frame(), self.result_svc,
-                     self.student_svc, self.subject_svc, self.class_svc)
+        return ResultsPanel(self.get_content_frame(), self.result_svc,
+                     self.student_svc, self.reference_svc,
+                     exam_session_svc=self.exam_session_svc, data=self.prefetched("Results"))
 
     def _show_analytics(self):
         self.update_section_title("Analytics Dashboard")
-        AnalyticsPanel(self.get_content_frame(), self.analytics_svc)
+        return AnalyticsPanel(self.get_content_frame(), self.analytics_svc,
+                              data=self.prefetched("Analytics"))
 
     def _show_reports(self):
         self.update_section_title("Report Generation")
-        ReportsPanel(self.get_content_frame(), self.report_svc,
-                     self.student_svc, self.class_svc)
+        return ReportsPanel(self.get_content_frame(), self.report_svc,
+                     self.student_svc, self.reference_svc, self.exam_session_svc)
+
+    def _show_diagnostics(self):
+        self.update_section_title("Query Diagnostics")
+        return DiagnosticsPanel(self.get_content_frame())
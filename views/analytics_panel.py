@@ -4,6 +4,7 @@ views/analytics_panel.py - Analytics dashboard with embedded matplotlib charts
 import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
+from utils.query_profiler import profiled
 from utils.ui_helpers import make_label
 
 import matplotlib
@@ -14,13 +15,25 @@ import matplotlib.pyplot as plt
 
 
 class AnalyticsPanel(tk.Frame):
-    def __init__(self, parent, analytics_svc):
+    def __init__(self, parent, analytics_svc, data=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.analytics_svc = analytics_svc
         self.pack(fill="both", expand=True)
-        self._build()
-
-    def _build(self):
+        self._build(data)
+
+    @staticmethod
+    def fetch(analytics_svc):
+        """Everything the panel draws; safe to run off the UI thread."""
+        return {
+            "stats": analytics_svc.total_stats(),
+            "class_avg": analytics_svc.class_average(),
+            "subject_avg": analytics_svc.subject_average(),
+            "top_students": analytics_svc.top_students(5),
+            "pass_fail": analytics_svc.pass_fail_rate(),
+            "gpa_dist": analytics_svc.gpa_distribution(),
+        }
+
+    def _build(self, data=None):
         # Header
         header = tk.Frame(self, bg=COLORS["bg_medium"], pady=10)
         header.pack(fill="x", padx=16)
@@ -47,18 +60,22 @@ class AnalyticsPanel(tk.Frame):
         canvas_outer.pack(side="left", fill="both", expand=True, padx=16)
         scrollbar.pack(side="right", fill="y")
 
+        self._refresh(data)
+
+    def refresh(self):
         self._refresh()
 
-    def _refresh(self):
+    @profiled()
+    def _refresh(self, data=None):
         # Clear old
         for w in self.stats_frame.winfo_children():
             w.destroy()
         for w in self.charts_frame.winfo_children():
             w.destroy()
 
-        stats = self.analytics_svc.total_stats()
-        self._build_stat_cards(stats)
-        self._build_charts()
+        data = data or self.fetch(self.analytics_svc)
+        self._build_stat_cards(data["stats"])
+        self._build_charts(data)
 
     def _build_stat_cards(self, stats):
         card_data = [
@@ -75,18 +92,18 @@ class AnalyticsPanel(tk.Frame):
             tk.Label(card, text=title, font=FONTS["body"],
                      bg=color, fg="#e0e0e0").pack()
 
-    def _build_charts(self):
+    def _build_charts(self, data):
         dark_bg = COLORS["bg_medium"]
         text_color = COLORS["text_primary"]
         chart_configs = [
-            (self._plot_class_avg, "Class Average Performance"),
-            (self._plot_subject_avg, "Subject Average Marks"),
-            (self._plot_top_students, "Top 5 Students"),
-            (self._plot_pass_fail, "Pass / Fail Rate"),
-            (self._plot_gpa_dist, "GPA Grade Distribution"),
+            (self._plot_class_avg, "Class Average Performance", data["class_avg"]),
+            (self._plot_subject_avg, "Subject Average Marks", data["subject_avg"]),
+            (self._plot_top_students, "Top 5 Students", data["top_students"]),
+            (self._plot_pass_fail, "Pass / Fail Rate", data["pass_fail"]),
+            (self._plot_gpa_dist, "GPA Grade Distribution", data["gpa_dist"]),
         ]
 
-        for row, (plot_fn, title) in enumerate(chart_configs):
+        for row, (plot_fn, title, values) in enumerate(chart_configs):
             card = tk.Frame(self.charts_frame, bg=COLORS["card"],
                             highlightbackground=COLORS["border"], highlightthickness=1)
             card.pack(fill="x", pady=8, padx=4)
@@ -98,7 +115,7 @@ class AnalyticsPanel(tk.Frame):
                 ax.tick_params(colors=text_color, labelsize=8)
                 for spine in ax.spines.values():
                     spine.set_edgecolor(COLORS["border"])
-                plot_fn(ax, text_color)
+                plot_fn(ax, text_color, values)
                 fig.tight_layout(pad=1.5)
                 canvas = FigureCanvasTkAgg(fig, master=card)
                 canvas.draw()
@@ -107,8 +124,7 @@ class AnalyticsPanel(tk.Frame):
                 tk.Label(card, text=f"No data: {e}", font=FONTS["small"],
                          bg=COLORS["card"], fg=COLORS["text_secondary"]).pack(pady=10)
 
-    def _plot_class_avg(self, ax, tc):
-        data = self.analytics_svc.class_average()
+    def _plot_class_avg(self, ax, tc, data):
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -120,8 +136,7 @@ class AnalyticsPanel(tk.Frame):
             ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
                     f"{val:.1f}", ha="center", va="bottom", color=tc, fontsize=8)
 
-    def _plot_subject_avg(self, ax, tc):
-        data = self.analytics_svc.subject_average()
+    def _plot_subject_avg(self, ax, tc, data):
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -130,8 +145,7 @@ class AnalyticsPanel(tk.Frame):
         ax.set_xlabel("Avg Marks", color=tc)
         ax.set_xlim(0, 100)
 
-    def _plot_top_students(self, ax, tc):
-        data = self.analytics_svc.top_students(5)
+    def _plot_top_students(self, ax, tc, data):
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -144,8 +158,8 @@ class AnalyticsPanel(tk.Frame):
             ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
                     f"{val:.1f}", ha="center", va="bottom", color=tc, fontsize=8)
 
-    def _plot_pass_fail(self, ax, tc):
-        pass_c, fail_c = self.analytics_svc.pass_fail_rate()
+    def _plot_pass_fail(self, ax, tc, data):
+        pass_c, fail_c = data
         if pass_c + fail_c == 0:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
@@ -158,8 +172,7 @@ class AnalyticsPanel(tk.Frame):
             startangle=90,
         )
 
-    def _plot_gpa_dist(self, ax, tc):
-        data = self.analytics_svc.gpa_distribution()
+    def _plot_gpa_dist(self, ax, tc, data):
         if not data:
             ax.text(0.5, 0.5, "No data", ha="center", va="center", color=tc)
             return
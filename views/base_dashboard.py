@@ -1,9 +1,37 @@
 """
 views/base_dashboard.py - Base dashboard layout with polished sidebar navigation
 """
+import time
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk
 from config import COLORS, FONTS, APP_TITLE, NAV_ICONS, ROLE_COLORS
+from services.reference_data import ReferenceDataService
+from utils.prefetch import Prefetcher
+from utils.query_profiler import track
+from utils.unit_of_work import write_generation
+
+
+class _Section:
+    """A built section kept hidden in the dashboard's panel cache."""
+    __slots__ = ("host", "panel", "title", "generation", "loaded_at")
+
+    def __init__(self, host, panel, title):
+        self.host = host
+        self.panel = panel
+        self.title = title
+        self.mark_fresh()
+
+    def mark_fresh(self):
+        self.generation = write_generation()
+        self.loaded_at = time.monotonic()
+
+    def is_stale(self, max_age):
+        check = getattr(self.panel, "is_stale", None)
+        if check is not None:
+            return check()
+        return (self.generation != write_generation()
+                or time.monotonic() - self.loaded_at > max_age)
 
 
 class BaseDashboard(tk.Frame):
@@ -12,22 +40,45 @@ class BaseDashboard(tk.Frame):
     - Left sidebar  : branding, nav items with icon + left-accent indicator,
                       user-avatar panel, logout button
     - Right area    : topbar (title + role badge) + swappable content frame
+
+    A nav callback that returns its panel gets that section cached: leaving
+    hides it, and coming back raises it with its filters and scroll position
+    intact. On return the panel's ``is_stale()`` is asked (default: this
+    process committed a write, or PANEL_MAX_AGE seconds passed since it
+    loaded); a stale panel reloads in place through ``refresh()``, or is
+    rebuilt if it has none. Sections drawn inline (callback returns None)
+    are rebuilt on every visit. At most PANEL_CACHE_SIZE sections are kept.
+
+    Hovering a nav item listed in PREFETCH for PREFETCH_DELAY_MS starts its
+    loader on a worker; the nav callback picks the result up with
+    ``prefetched(label)`` and hands it to the panel.
     """
 
     NAV_ITEMS = []  # Override in subclasses: list of (label, callback)
+    PREFETCH = {}   # Override in subclasses: label -> loader run off the UI thread
+    PANEL_CACHE_SIZE = 5
+    PANEL_MAX_AGE = 120  # seconds
+    PREFETCH_DELAY_MS = 150
 
     def __init__(self, master, user, role, logout_callback):
         super().__init__(master, bg=COLORS["bg_medium"])
         self.user = user
         self.role = role
         self.logout_callback = logout_callback
+        # Each sign-in starts from fresh class / subject / teacher lists.
+        ReferenceDataService.invalidate()
         self._current_section = None
+        self._sections = OrderedDict()  # label -> _Section, least recently shown first
+        self._host = None
+        self._prefetcher = Prefetcher()
+        self._hover_job = None
         self.nav_buttons = {}
         self.nav_accents = {}
         self.pack(fill="both", expand=True)
         self._build_layout()
         self._build_sidebar()
         self._build_topbar()
+        self.bind("<Destroy>", self._on_destroy)
 
     # ── Layout skeleton ──────────────────────────────────────────────────────
 
@@ -95,17 +146,19 @@ class BaseDashboard(tk.Frame):
             )
             btn.pack(side="left", fill="x", expand=True)
 
-            # Hover bindings (skip if item is currently active)
-            def _make_hover(b, a):
+            # Hover bindings (skip if item is currently active); hovering also warms the panel
+            def _make_hover(b, a, lbl):
                 def _enter(e):
                     if a["bg"] == COLORS["sidebar"]:
                         b.configure(bg=COLORS["hover"], fg=COLORS["white"])
+                    self._hover_start(lbl)
                 def _leave(e):
                     if a["bg"] == COLORS["sidebar"]:
                         b.configure(bg=COLORS["sidebar"], fg=COLORS["text_secondary"])
+                    self._hover_end(lbl)
                 b.bind("<Enter>", _enter)
                 b.bind("<Leave>", _leave)
-            _make_hover(btn, accent)
+            _make_hover(btn, accent, label)
 
             self.nav_buttons[label] = btn
             self.nav_accents[label] = accent
@@ -174,6 +227,7 @@ class BaseDashboard(tk.Frame):
     # ── Nav click ─────────────────────────────────────────────────────────────
 
     def _nav_click(self, label, callback):
+        self._hover_cancel()
         # Deactivate all
         for lbl, btn in self.nav_buttons.items():
             btn.configure(bg=COLORS["sidebar"], fg=COLORS["text_secondary"])
@@ -182,10 +236,76 @@ class BaseDashboard(tk.Frame):
         self.nav_buttons[label].configure(bg=COLORS["hover"], fg=COLORS["white"])
         self.nav_accents[label].configure(bg=COLORS["primary_light"])
         self._current_section = label
-        # Swap content
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        callback()
+        # Swap content: hide a cached section, drop an inline one
+        if self._host is not None:
+            if any(s.host is self._host for s in self._sections.values()):
+                self._host.pack_forget()
+            else:
+                self._host.destroy()
+        with track(f"{self.role}: {label}"):
+            section = self._sections.get(label)
+            if section is not None and self._raise(section):
+                self._sections.move_to_end(label)
+            else:
+                self._build_section(label, callback)
+
+    def _raise(self, section):
+        """Show a cached section, reloading it if stale; False if it must be rebuilt."""
+        if section.is_stale(self.PANEL_MAX_AGE):
+            if not hasattr(section.panel, "refresh"):
+                return False
+            section.panel.refresh()
+            section.mark_fresh()
+        section.host.pack(fill="both", expand=True)
+        self._host = section.host
+        self.update_section_title(section.title)
+        return True
+
+    def _build_section(self, label, callback):
+        stale = self._sections.pop(label, None)
+        if stale is not None:
+            stale.host.destroy()
+        self._host = tk.Frame(self.content_frame, bg=COLORS["bg_medium"])
+        self._host.pack(fill="both", expand=True)
+        panel = callback()
+        if panel is None:
+            return
+        self._sections[label] = _Section(self._host, panel, self.section_title_lbl.cget("text"))
+        while len(self._sections) > self.PANEL_CACHE_SIZE:
+            _, evicted = self._sections.popitem(last=False)
+            evicted.host.destroy()
+
+    # ── Prefetch ──────────────────────────────────────────────────────────────
+
+    def _hover_start(self, label):
+        # Nothing to warm for the open section or one that is cached.
+        if label not in self.PREFETCH or label == self._current_section or label in self._sections:
+            return
+        self._hover_cancel()
+        self._hover_job = self.after(self.PREFETCH_DELAY_MS,
+                                     lambda: self._start_prefetch(label))
+
+    def _start_prefetch(self, label):
+        self._hover_job = None
+        self._prefetcher.start(label, self.PREFETCH[label])
+
+    def _hover_end(self, label):
+        self._hover_cancel()
+        self._prefetcher.cancel(label)
+
+    def _hover_cancel(self):
+        if self._hover_job is not None:
+            self.after_cancel(self._hover_job)
+            self._hover_job = None
+
+    def prefetched(self, label):
+        """The data warmed for *label* by hovering its nav item, or None (load it inline)."""
+        return self._prefetcher.take(label)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._hover_cancel()
+            self._prefetcher.shutdown()
 
     # ── Topbar ────────────────────────────────────────────────────────────────
 
@@ -226,4 +346,5 @@ class BaseDashboard(tk.Frame):
         self.section_title_lbl.configure(text=title)
 
     def get_content_frame(self):
-        return self.content_frame
+        """The frame the section being built draws into."""
+        return self._host
@@ -1,21 +1,28 @@
 """
-views/classes_subjects_panel.py - Classes and Subjects management (tabbed)
+views/classes_subjects_panel.py - Classes, Subjects, Exam Sessions and Grade Scales management (tabbed)
 """
 import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
+from utils.query_profiler import profiled
+from utils.table_binding import TableBinding
 from utils.ui_helpers import (
     scrollable_treeview, make_entry, make_label,
-    confirm_delete, show_error, show_success, show_info
+    confirm_delete, confirm_action, show_error, show_success, show_info
 )
 
 
 class ClassesSubjectsPanel(tk.Frame):
-    def __init__(self, parent, class_svc, subject_svc, teacher_svc):
+    def __init__(self, parent, class_svc, subject_svc, reference_svc, exam_session_svc, archive_svc,
+                 grade_scale_svc, regrade_svc):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.class_svc = class_svc
         self.subject_svc = subject_svc
-        self.teacher_svc = teacher_svc
+        self.reference_svc = reference_svc
+        self.exam_session_svc = exam_session_svc
+        self.archive_svc = archive_svc
+        self.grade_scale_svc = grade_scale_svc
+        self.regrade_svc = regrade_svc
         self.pack(fill="both", expand=True)
         self._build()
 
@@ -26,12 +33,26 @@ class ClassesSubjectsPanel(tk.Frame):
         # Classes tab
         classes_tab = tk.Frame(nb, bg=COLORS["bg_medium"])
         nb.add(classes_tab, text="  Classes  ")
-        ClassesTab(classes_tab, self.class_svc)
+        self._tabs = [ClassesTab(classes_tab, self.class_svc)]
 
         # Subjects tab
         subjects_tab = tk.Frame(nb, bg=COLORS["bg_medium"])
         nb.add(subjects_tab, text="  Subjects  ")
-        SubjectsTab(subjects_tab, self.subject_svc, self.class_svc, self.teacher_svc)
+        self._tabs.append(SubjectsTab(subjects_tab, self.subject_svc, self.reference_svc))
+
+        # Exam sessions tab
+        sessions_tab = tk.Frame(nb, bg=COLORS["bg_medium"])
+        nb.add(sessions_tab, text="  Exam Sessions  ")
+        self._tabs.append(ExamSessionsTab(sessions_tab, self.exam_session_svc, self.archive_svc))
+
+        # Grade scales tab
+        scales_tab = tk.Frame(nb, bg=COLORS["bg_medium"])
+        nb.add(scales_tab, text="  Grade Scales  ")
+        self._tabs.append(GradeScalesTab(scales_tab, self.grade_scale_svc, self.regrade_svc, self.reference_svc))
+
+    def refresh(self):
+        for tab in self._tabs:
+            tab._load()
 
 
 class ClassesTab(tk.Frame):
@@ -91,15 +112,16 @@ class ClassesTab(tk.Frame):
         self.tree.tag_configure("odd", background=COLORS["table_odd"])
         self.tree.tag_configure("even", background=COLORS["table_even"])
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
-
+        self._rows = TableBinding(self.tree, lambda c: (
+            c.id, c.class_name, c.academic_year, c.student_count, c.subject_count,
+        ), striped=True, sortable={
+            "id": "id", "name": "class_name", "year": "academic_year",
+            "students": "student_count", "subjects": "subject_count",
+        })
+
+    @profiled()
     def _load(self):
-        self.tree.delete(*self.tree.get_children())
-        for i, c in enumerate(self.class_svc.get_all()):
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(c.id), tags=(tag,), values=(
-                c.id, c.class_name, c.academic_year,
-                len(c.students), len(c.subjects),
-            ))
+        self._rows.update(self.class_svc.get_all_rows())
 
     def _on_select(self, _event):
         sel = self.tree.selection()
@@ -139,7 +161,10 @@ class ClassesTab(tk.Frame):
             show_info("Select", "Please select a class.")
             return
         c = self.class_svc.get_by_id(self._selected_id)
-        if c and confirm_delete(c.class_name):
+        if not c:
+            return
+        plan = self.class_svc.delete(self._selected_id, dry_run=True)
+        if confirm_delete(f"{c.class_name} ({plan.describe()})"):
             try:
                 self.class_svc.delete(self._selected_id)
                 self._clear()
@@ -149,11 +174,10 @@ class ClassesTab(tk.Frame):
 
 
 class SubjectsTab(tk.Frame):
-    def __init__(self, parent, subject_svc, class_svc, teacher_svc):
+    def __init__(self, parent, subject_svc, reference_svc):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.subject_svc = subject_svc
-        self.class_svc = class_svc
-        self.teacher_svc = teacher_svc
+        self.reference_svc = reference_svc
         self._selected_id = None
         self.pack(fill="both", expand=True)
         self._build()
@@ -170,10 +194,9 @@ class SubjectsTab(tk.Frame):
         self.name_var = tk.StringVar()
         make_entry(form_card, textvariable=self.name_var, width=22).grid(row=1, column=1, padx=(0, 16))
 
-        classes = self.class_svc.get_all()
-        self._class_map = {"—": None, **{c.class_name: c.id for c in classes}}
-        teachers = self.teacher_svc.get_all()
-        self._teacher_map = {"—": None, **{t.full_name: t.id for t in teachers}}
+        ref = self.reference_svc.get()
+        self._class_map = {"—": None, **ref.classes}
+        self._teacher_map = {"—": None, **ref.teachers}
 
         tk.Label(form_card, text="Class", font=FONTS["body_bold"],
                  bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(row=1, column=2, sticky="w", padx=(0, 4))
@@ -214,16 +237,15 @@ class SubjectsTab(tk.Frame):
         self.tree.tag_configure("odd", background=COLORS["table_odd"])
         self.tree.tag_configure("even", background=COLORS["table_even"])
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._rows = TableBinding(self.tree, lambda s: (
+            s.id, s.subject_name, s.class_name or "—", s.teacher_name or "—",
+        ), striped=True, sortable={
+            "id": "id", "name": "subject_name", "class_": "class_name", "teacher": "teacher_name",
+        })
 
+    @profiled()
     def _load(self):
-        self.tree.delete(*self.tree.get_children())
-        for i, s in enumerate(self.subject_svc.get_all()):
-            class_name = s.class_.class_name if s.class_ else "—"
-            teacher_name = s.teacher.full_name if s.teacher else "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
-                s.id, s.subject_name, class_name, teacher_name,
-            ))
+        self._rows.update(self.subject_svc.get_all_rows())
 
     def _on_select(self, _event):
         sel = self.tree.selection()
@@ -272,10 +294,357 @@ class SubjectsTab(tk.Frame):
             show_info("Select", "Please select a subject.")
             return
         s = self.subject_svc.get_by_id(self._selected_id)
-        if s and confirm_delete(s.subject_name):
+        if not s:
+            return
+        plan = self.subject_svc.delete(self._selected_id, dry_run=True)
+        if confirm_delete(f"{s.subject_name} ({plan.describe()})"):
             try:
                 self.subject_svc.delete(self._selected_id)
                 self._clear()
                 self._load()
             except Exception as e:
                 show_error("Error", str(e))
+
+
+class ExamSessionsTab(tk.Frame):
+    """Terms that marks are entered against; the current one is used for entry and reports."""
+
+    def __init__(self, parent, exam_session_svc, archive_svc):
+        super().__init__(parent, bg=COLORS["bg_medium"])
+        self.exam_session_svc = exam_session_svc
+        self.archive_svc = archive_svc
+        self.pack(fill="both", expand=True)
+        self._build()
+        self._load()
+
+    def _build(self):
+        form_card = tk.Frame(self, bg=COLORS["card"], padx=16, pady=14)
+        form_card.pack(fill="x", pady=(8, 0))
+        make_label(form_card, "Open Exam Session", "body_bold").grid(
+            row=0, column=0, columnspan=8, sticky="w", pady=(0, 8))
+
+        self.name_var = tk.StringVar()
+        self.year_var = tk.StringVar()
+        self.term_var = tk.StringVar(value="1")
+        self.current_var = tk.BooleanVar(value=True)
+        for col, (label, var, width) in enumerate([("Name", self.name_var, 20),
+                                                   ("Academic Year", self.year_var, 12),
+                                                   ("Term", self.term_var, 6)]):
+            tk.Label(form_card, text=label, font=FONTS["body_bold"],
+                     bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(
+                row=1, column=col * 2, sticky="w", padx=(0, 4))
+            make_entry(form_card, textvariable=var, width=width).grid(
+                row=1, column=col * 2 + 1, padx=(0, 16))
+        tk.Checkbutton(form_card, text="Make current", variable=self.current_var,
+                       font=FONTS["body"], bg=COLORS["card"], fg=COLORS["text_primary"],
+                       selectcolor=COLORS["bg_medium"], activebackground=COLORS["card"]).grid(
+            row=1, column=6, padx=(0, 12))
+        tk.Button(form_card, text="Create", font=FONTS["body_bold"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=14, pady=4,
+                  command=self._create).grid(row=1, column=7, padx=4)
+
+        toolbar = tk.Frame(self, bg=COLORS["bg_medium"], pady=6)
+        toolbar.pack(fill="x")
+        tk.Button(toolbar, text="Set as Current", font=FONTS["body"],
+                  bg=COLORS["success"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._set_current).pack(side="right")
+        tk.Button(toolbar, text="Archive Year", font=FONTS["body"],
+                  bg=COLORS["danger"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._archive_year).pack(side="right", padx=6)
+
+        cols = ("id", "name", "year", "term", "current", "archived")
+        headings = ("ID", "Session", "Academic Year", "Term", "Current", "Archived")
+        frame, self.tree = scrollable_treeview(self, cols, headings, height=18)
+        frame.pack(fill="both", expand=True, pady=6)
+        widths = [40, 200, 110, 60, 80, 140]
+        for col, w in zip(cols, widths):
+            self.tree.column(col, width=w, minwidth=w)
+        self.tree.tag_configure("current", foreground=COLORS["success"])
+        self.tree.tag_configure("archived", foreground=COLORS["text_secondary"])
+        self._rows = TableBinding(self.tree, self._row_values, tags=self._row_tags, sortable={
+            "id": "id", "name": "name", "year": "academic_year", "term": "term",
+            "current": "is_current", "archived": "archived_at",
+        })
+
+    @profiled()
+    def _load(self):
+        self._rows.update(self.exam_session_svc.get_all())
+
+    @staticmethod
+    def _row_values(s):
+        return (s.id, s.name, s.academic_year, s.term, "\u2713" if s.is_current else "",
+                s.archived_at.strftime("%Y-%m-%d") if s.archived_at else "")
+
+    @staticmethod
+    def _row_tags(s):
+        return ("current",) if s.is_current else ("archived",) if s.archived_at else ()
+
+    def _create(self):
+        try:
+            term = int(self.term_var.get().strip())
+        except ValueError:
+            show_error("Validation", "Term must be a number.")
+            return
+        try:
+            self.exam_session_svc.create(self.name_var.get(), self.year_var.get(), term,
+                                         make_current=self.current_var.get())
+            show_success("Added", "Exam session created.")
+            self.name_var.set("")
+            self.year_var.set("")
+            self._load()
+        except Exception as e:
+            show_error("Error", str(e))
+
+    def _set_current(self):
+        sel = self.tree.selection()
+        if not sel:
+            show_info("Select", "Please select an exam session.")
+            return
+        try:
+            session = self.exam_session_svc.set_current(int(sel[0]))
+            show_success("Updated", f"Marks are now entered for {session.name}.")
+            self._load()
+        except Exception as e:
+            show_error("Error", str(e))
+
+    def _archive_year(self):
+        sel = self.tree.selection()
+        if not sel:
+            show_info("Select", "Please select an exam session of the year to archive.")
+            return
+        year = self.tree.item(sel[0], "values")[2]
+        if not confirm_action(
+                "Archive Year",
+                f"Move every exam session of {year} to the archive?\n\n"
+                "Its marks become read-only, and its students, subjects and classes "
+                "without marks in other years are removed from the live lists."):
+            return
+        try:
+            archived = self.archive_svc.archive_year(year)
+            show_success("Archived", f"{archived.academic_year}: {archived.results} result(s) of "
+                                     f"{archived.students} student(s) moved to the archive.")
+            self._load()
+        except Exception as e:
+            show_error("Error", str(e))
+
+
+class GradeScalesTab(tk.Frame):
+    """Grade boundaries per class or academic year; classes without one use the default scale.
+
+    Bands are typed as ``start grade gpa remarks`` separated by semicolons,
+    e.g. ``80 A 4.0 Distinction; 70 B 3.0 Credit; 0 F 0.0 Fail``. Creating,
+    revising or retiring a scale regrades the stored results of its class or
+    year (the default scale: every result) straight away, since pass rates
+    follow the new bands at once; "Regrade Results" finishes a run that failed.
+    """
+
+    def __init__(self, parent, grade_scale_svc, regrade_svc, reference_svc):
+        super().__init__(parent, bg=COLORS["bg_medium"])
+        self.grade_scale_svc = grade_scale_svc
+        self.regrade_svc = regrade_svc
+        self.reference_svc = reference_svc
+        self.pack(fill="both", expand=True)
+        self._build()
+        self._load()
+
+    def _build(self):
+        form_card = tk.Frame(self, bg=COLORS["card"], padx=16, pady=14)
+        form_card.pack(fill="x", pady=(8, 0))
+        make_label(form_card, "Add / Revise Grade Scale", "body_bold").grid(
+            row=0, column=0, columnspan=8, sticky="w", pady=(0, 8))
+
+        self._class_map = {"—": None, **self.reference_svc.get().classes}
+        self.name_var = tk.StringVar()
+        self.class_var = tk.StringVar(value="—")
+        self.year_var = tk.StringVar()
+        self.bands_var = tk.StringVar()
+
+        tk.Label(form_card, text="Name", font=FONTS["body_bold"],
+                 bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(row=1, column=0, sticky="w", padx=(0, 4))
+        make_entry(form_card, textvariable=self.name_var, width=18).grid(row=1, column=1, padx=(0, 16))
+        tk.Label(form_card, text="Class", font=FONTS["body_bold"],
+                 bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(row=1, column=2, sticky="w", padx=(0, 4))
+        ttk.Combobox(form_card, textvariable=self.class_var,
+                     values=list(self._class_map.keys()), width=16, state="readonly").grid(
+            row=1, column=3, padx=(0, 16))
+        tk.Label(form_card, text="or Academic Year", font=FONTS["body_bold"],
+                 bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(row=1, column=4, sticky="w", padx=(0, 4))
+        make_entry(form_card, textvariable=self.year_var, width=10).grid(row=1, column=5, padx=(0, 16))
+        tk.Label(form_card, text="Bands", font=FONTS["body_bold"],
+                 bg=COLORS["card"], fg=COLORS["text_secondary"]).grid(row=2, column=0, sticky="w",
+                                                                      padx=(0, 4), pady=(8, 0))
+        make_entry(form_card, textvariable=self.bands_var, width=90).grid(
+            row=2, column=1, columnspan=5, sticky="we", padx=(0, 16), pady=(8, 0))
+
+        tk.Button(form_card, text="Create", font=FONTS["body_bold"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=14, pady=4,
+                  command=self._create).grid(row=1, column=6, padx=4)
+        tk.Button(form_card, text="Revise", font=FONTS["body_bold"],
+                  bg=COLORS["success"], fg="white", relief="flat",
+                  cursor="hand2", padx=14, pady=4,
+                  command=self._revise).grid(row=2, column=6, padx=4, pady=(8, 0))
+
+        toolbar = tk.Frame(self, bg=COLORS["bg_medium"], pady=6)
+        toolbar.pack(fill="x")
+        tk.Button(toolbar, text="Retire Selected", font=FONTS["body"],
+                  bg=COLORS["danger"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._retire).pack(side="right")
+        tk.Button(toolbar, text="Regrade Results", font=FONTS["body"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._regrade).pack(side="right", padx=6)
+        self.status_var = tk.StringVar()
+        tk.Label(toolbar, textvariable=self.status_var, font=FONTS["body"],
+                 bg=COLORS["bg_medium"], fg=COLORS["text_secondary"]).pack(side="left")
+
+        cols = ("id", "name", "version", "applies", "bands", "created")
+        headings = ("ID", "Scale", "Version", "Applies To", "Bands", "Created")
+        frame, self.tree = scrollable_treeview(self, cols, headings, height=18)
+        frame.pack(fill="both", expand=True, pady=6)
+        widths = [40, 160, 70, 160, 360, 110]
+        for col, w in zip(cols, widths):
+            self.tree.column(col, width=w, minwidth=w)
+        self.tree.tag_configure("odd", background=COLORS["table_odd"])
+        self.tree.tag_configure("even", background=COLORS["table_even"])
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._rows = TableBinding(self.tree, lambda s: (
+            s.id, s.name, s.version, s.applies_to,
+            "  ".join(f"{b.grade} \u2265 {b.min_marks:g}" for b in s.bands),
+            s.created_at.strftime("%Y-%m-%d") if s.created_at else "",
+        ), striped=True, sortable={
+            "id": "id", "name": "name", "version": "version", "applies": "applies_to",
+            "created": "created_at",
+        })
+
+    @profiled()
+    def _load(self):
+        self._scales = {s.id: s for s in self.grade_scale_svc.scales()}
+        self._rows.update(list(self._scales.values()))
+
+    def _on_select(self, _event):
+        sel = self.tree.selection()
+        scale = self._scales.get(int(sel[0])) if sel else None
+        if scale:
+            self.name_var.set(scale.name)
+            self.class_var.set(next((lbl for lbl, cid in self._class_map.items() if cid == scale.class_id), "—"))
+            self.year_var.set(scale.academic_year or "")
+            self.bands_var.set("; ".join(f"{b.min_marks:g} {b.grade} {b.gpa:g} {b.remarks}" for b in scale.bands))
+
+    def _bands(self):
+        bands = []
+        for part in filter(None, (p.strip() for p in self.bands_var.get().split(";"))):
+            fields = part.split(maxsplit=3)
+            try:
+                bands.append((float(fields[0]), fields[1], float(fields[2]),
+                              fields[3] if len(fields) > 3 else ""))
+            except (ValueError, IndexError):
+                raise ValueError(f"Cannot read band '{part}': expected start, grade, GPA and remarks.")
+        return bands
+
+    def _create(self):
+        class_label = self.class_var.get()
+        class_id, year = self._class_map.get(class_label), self.year_var.get().strip()
+        applies = class_label if class_id is not None else year or "every class"
+        try:
+            bands = self._bands()
+        except ValueError as e:
+            show_error("Error", str(e))
+            return
+
+        def create():
+            self.grade_scale_svc.create(self.name_var.get(), bands, class_id=class_id, academic_year=year)
+            return "Grade scale created."
+
+        self._change("Create Grade Scale", f"Grade {applies} with {self.name_var.get().strip()}?",
+                     dict(class_id=class_id, academic_year=year or None), create)
+
+    def _revise(self):
+        sel = self.tree.selection()
+        if not sel:
+            show_info("Select", "Please select the grade scale to revise.")
+            return
+        scale = self._scales[int(sel[0])]
+        try:
+            bands = self._bands()
+        except ValueError as e:
+            show_error("Error", str(e))
+            return
+
+        def revise():
+            revised = self.grade_scale_svc.revise(scale.id, bands, name=self.name_var.get())
+            return f"{revised.name} is now version {revised.version}."
+
+        self._change("Revise Grade Scale", f"Replace the bands of {scale.name} for {scale.applies_to}?",
+                     dict(class_id=scale.class_id, academic_year=scale.academic_year), revise)
+
+    def _retire(self):
+        sel = self.tree.selection()
+        if not sel:
+            show_info("Select", "Please select a grade scale.")
+            return
+        scale = self._scales[int(sel[0])]
+
+        def retire():
+            self.grade_scale_svc.retire(scale.id)
+            return f"{scale.name} retired."
+
+        self._change("Retire Grade Scale",
+                     f"Stop using {scale.name} for {scale.applies_to}?\n\n"
+                     "Its classes fall back to the year or default scale.",
+                     dict(class_id=scale.class_id, academic_year=scale.academic_year), retire)
+
+    def _change(self, title, question, scope, change):
+        """Confirm, make *change* (returning a message), then regrade *scope* with the new bands.
+
+        Pass rates follow a scale as soon as it changes, so the stored grades,
+        GPAs and summaries are brought along in the same action.
+        """
+        if not confirm_action(title, f"{question}\n\nStored results are regraded with the new bands."):
+            return
+        try:
+            message = change()
+        except Exception as e:
+            show_error("Error", str(e))
+            return
+        self._load()
+        year = scope.get("academic_year")
+        if year and year not in self.reference_svc.get().class_years.values():
+            show_success(title, f"{message}\nNo classes in {year} yet.")
+            return
+        while True:
+            try:
+                report = self.regrade_svc.regrade(**scope, progress=self._show_progress)
+                break
+            except Exception as e:
+                # A retired scale leaves the list, so offer the retry here.
+                if not confirm_action(title, f"{message}\n\nRegrading failed: {e}\n\nTry again?"):
+                    return
+            finally:
+                self.status_var.set("")
+        show_success(title, f"{message}\n{report.describe()}.")
+
+    def _regrade(self):
+        sel = self.tree.selection()
+        if not sel:
+            show_info("Select", "Please select the grade scale whose results to regrade.")
+            return
+        scale = self._scales[int(sel[0])]
+        scope = dict(class_id=scale.class_id, academic_year=scale.academic_year)
+        try:
+            plan = self.regrade_svc.regrade(**scope, dry_run=True)
+            if not plan.changed and not plan.summaries:
+                show_info("Regrade", f"Nothing to change: {plan.describe()}.")
+                return
+            if not confirm_action("Regrade Results", f"{scale.applies_to}: {plan.describe()}.\n\nApply?"):
+                return
+            report = self.regrade_svc.regrade(**scope, progress=self._show_progress)
+            show_success("Regraded", f"{report.describe()}.")
+        except Exception as e:
+            show_error("Error", str(e))
+        finally:
+            self.status_var.set("")
+
+    def _show_progress(self, done, total):
+        self.status_var.set(f"Regrading… {done:,} / {total:,} result(s)")
+        self.update_idletasks()
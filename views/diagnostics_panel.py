@@ -0,0 +1,75 @@
+"""
+views/diagnostics_panel.py - SQL statement counts and N+1 findings (Admin only)
+"""
+import tkinter as tk
+from datetime import datetime
+from config import COLORS, FONTS
+from utils import query_profiler
+from utils.ui_helpers import scrollable_treeview, make_label
+
+
+class DiagnosticsPanel(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, bg=COLORS["bg_medium"])
+        self.pack(fill="both", expand=True)
+        self._build()
+        self._load()
+
+    def _build(self):
+        toolbar = tk.Frame(self, bg=COLORS["bg_medium"], pady=10)
+        toolbar.pack(fill="x", padx=16)
+        make_label(toolbar, "Query Diagnostics", "subheading").pack(side="left")
+        tk.Button(toolbar, text="Reset", font=FONTS["body"],
+                  bg=COLORS["danger"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._reset).pack(side="right", padx=4)
+        tk.Button(toolbar, text="Refresh", font=FONTS["body"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._load).pack(side="right", padx=4)
+
+        make_label(self, "Statements per UI action and service method", "body_bold").pack(
+            anchor="w", padx=16)
+        cols = ("label", "calls", "statements", "avg", "max", "avg_ms", "n1")
+        headings = ("Action / Method", "Calls", "Statements", "Avg / Call",
+                    "Max / Call", "Avg ms", "N+1 Hits")
+        frame, self.tree = scrollable_treeview(self, cols, headings, height=12)
+        frame.pack(fill="both", expand=True, padx=16, pady=(4, 10))
+        widths = [280, 60, 90, 90, 90, 80, 80]
+        for col, w in zip(cols, widths):
+            self.tree.column(col, width=w, minwidth=w)
+        self.tree.column("label", anchor="w")
+        self.tree.tag_configure("n1", foreground=COLORS["warning"])
+
+        make_label(self, "Repeated statement shapes (likely N+1)", "body_bold").pack(
+            anchor="w", padx=16)
+        cols = ("at", "label", "count", "shape")
+        headings = ("Time", "Action / Method", "Repeats", "Statement")
+        frame, self.ftree = scrollable_treeview(self, cols, headings, height=8)
+        frame.pack(fill="both", expand=True, padx=16, pady=(4, 10))
+        widths = [80, 220, 70, 520]
+        for col, w in zip(cols, widths):
+            self.ftree.column(col, width=w, minwidth=w)
+        self.ftree.column("shape", anchor="w")
+
+    def _load(self):
+        self.tree.delete(*self.tree.get_children())
+        for t in query_profiler.totals():
+            self.tree.insert("", "end", tags=("n1",) if t.n1_hits else (), values=(
+                t.label, t.calls, t.statements, f"{t.avg_statements:.1f}",
+                t.max_statements, f"{t.avg_ms:.1f}", t.n1_hits,
+            ))
+        self.ftree.delete(*self.ftree.get_children())
+        for f in query_profiler.findings():
+            self.ftree.insert("", "end", values=(
+                datetime.fromtimestamp(f.at).strftime("%H:%M:%S"),
+                f.label, f.count, f.shape,
+            ))
+
+    def is_stale(self):
+        return True  # in-memory counters; reloading is free
+
+    def refresh(self):
+        self._load()
+
+    def _reset(self):
+        query_profiler.reset()
+        self._load()
@@ -5,21 +5,34 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog
 from config import COLORS, FONTS
+from utils.query_profiler import profiled
+from utils.table_binding import TableBinding
 from utils.ui_helpers import make_label, show_error, show_success, show_info
 
 
 class ReportsPanel(tk.Frame):
-    def __init__(self, parent, report_svc, student_svc, class_svc):
+    def __init__(self, parent, report_svc, student_svc, reference_svc, exam_session_svc):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.report_svc = report_svc
         self.student_svc = student_svc
-        self.class_svc = class_svc
+        self.reference_svc = reference_svc
+        self.exam_session_svc = exam_session_svc
         self.pack(fill="both", expand=True)
         self._build()
 
     def _build(self):
-        make_label(self, "Report Generation", "subheading").pack(
-            anchor="w", padx=20, pady=(14, 6))
+        title_row = tk.Frame(self, bg=COLORS["bg_medium"])
+        title_row.pack(fill="x", padx=20, pady=(14, 6))
+        make_label(title_row, "Report Generation", "subheading").pack(side="left")
+
+        # Report cards, class reports and merit lists are per exam session; past terms stay available.
+        sessions = self.exam_session_svc.get_all()
+        self._session_map = {s.name: s.id for s in sessions}
+        current = next((s.name for s in sessions if s.is_current), "")
+        self.session_var = tk.StringVar(value=current)
+        ttk.Combobox(title_row, textvariable=self.session_var,
+                     values=list(self._session_map.keys()), width=20, state="readonly").pack(side="right")
+        make_label(title_row, "Exam Session:", "body").pack(side="right", padx=(0, 4))
 
         # Cards row
         cards = tk.Frame(self, bg=COLORS["bg_medium"])
@@ -79,6 +92,10 @@ class ReportsPanel(tk.Frame):
             self.stree.column(col, width=w, minwidth=w)
         self.stree.tag_configure("odd", background=COLORS["table_odd"])
         self.stree.tag_configure("even", background=COLORS["table_even"])
+        self._student_rows = TableBinding(self.stree, lambda s: (
+            s.id, s.admission_number, s.full_name, s.class_name or "—"), striped=True, sortable={
+            "id": "id", "adm": "admission_number", "name": "full_name", "class_": "class_name",
+        })
 
         tk.Button(sel_frame, text="Generate Report Card PDF",
                   font=FONTS["body_bold"], bg=COLORS["primary"],
@@ -91,8 +108,7 @@ class ReportsPanel(tk.Frame):
         cls_frame = tk.Frame(self, bg=COLORS["card"], padx=20, pady=16)
         cls_frame.pack(fill="x", padx=16, pady=8)
         make_label(cls_frame, "Class Report PDF — Select Class", "body_bold").pack(anchor="w", pady=(0, 8))
-        classes = self.class_svc.get_all()
-        self._class_map = {f"{c.class_name} ({c.academic_year})": c.id for c in classes}
+        self._class_map = self.reference_svc.get().class_labels
         self.cls_var = tk.StringVar(value=list(self._class_map.keys())[0] if self._class_map else "")
         ttk.Combobox(cls_frame, textvariable=self.cls_var,
                      values=list(self._class_map.keys()), width=30, state="readonly").pack(side="left", padx=(0, 12))
@@ -100,6 +116,10 @@ class ReportsPanel(tk.Frame):
                   font=FONTS["body_bold"], bg=COLORS["primary"],
                   fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
                   command=self._gen_class_report).pack(side="left")
+        tk.Button(cls_frame, text="Export Merit List (CSV)",
+                  font=FONTS["body_bold"], bg=COLORS["secondary"],
+                  fg="white", relief="flat", cursor="hand2", padx=16, pady=6,
+                  command=self._export_merit_list).pack(side="left", padx=(8, 0))
 
     def _report_card(self, parent, title, desc, cmd):
         card = tk.Frame(parent, bg=COLORS["card"], padx=16, pady=18,
@@ -114,15 +134,11 @@ class ReportsPanel(tk.Frame):
                   cursor="hand2", padx=12, pady=4, command=cmd).pack(anchor="w")
         return card
 
+    @profiled()
     def _search_students(self):
         query = self.student_search_var.get().strip()
-        students, _ = self.student_svc.search(query, page=1, page_size=50)
-        self.stree.delete(*self.stree.get_children())
-        for i, s in enumerate(students):
-            class_name = s.class_.class_name if s.class_ else "—"
-            tag = "odd" if i % 2 else "even"
-            self.stree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
-                s.id, s.admission_number, s.full_name, class_name))
+        students, _ = self.student_svc.search_rows(query, page=1, page_size=50)
+        self._student_rows.update(students)
 
     def _gen_student_report(self):
         sel = self.stree.selection()
@@ -139,7 +155,7 @@ class ReportsPanel(tk.Frame):
         if not filepath:
             return
         try:
-            self.report_svc.generate_student_report_card(student_id, filepath)
+            self.report_svc.generate_student_report_card(student_id, filepath, self._session_id())
             show_success("Generated", f"Report card saved to:\n{filepath}")
         except Exception as e:
             show_error("Error", str(e))
@@ -158,11 +174,34 @@ class ReportsPanel(tk.Frame):
         if not filepath:
             return
         try:
-            self.report_svc.generate_class_report_pdf(class_id, filepath)
+            self.report_svc.generate_class_report_pdf(class_id, filepath, self._session_id())
             show_success("Generated", f"Class report saved to:\n{filepath}")
         except Exception as e:
             show_error("Error", str(e))
 
+    def _export_merit_list(self):
+        class_label = self.cls_var.get()
+        class_id = self._class_map.get(class_label)
+        if not class_id:
+            show_info("Select", "Please select a class.")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv")],
+            initialfile=f"merit_list_{class_label.replace(' ', '_')}.csv",
+        )
+        if not filepath:
+            return
+        try:
+            self.report_svc.export_merit_list_csv(filepath, class_id=class_id,
+                                                  exam_session_id=self._session_id())
+            show_success("Exported", f"Merit list saved to:\n{filepath}")
+        except Exception as e:
+            show_error("Error", str(e))
+
+    def _session_id(self):
+        return self._session_map.get(self.session_var.get())
+
     def _export_csv(self):
         filepath = filedialog.asksaveasfilename(
             defaultextension=".csv",
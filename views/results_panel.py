@@ -1,27 +1,53 @@
 """
 views/results_panel.py - Results entry and display with real-time refresh
+
+Marks entered by other users appear without reloading: every few seconds a
+worker thread asks the result change feed for what changed since the last
+seq the table has applied, and only those rows are patched into the tree.
+The session's results are loaded once; sorting and the class / subject /
+grade / marks filters work on that copy in memory. "Grid Entry" opens a
+class roster for one subject whose marks are typed in like a spreadsheet
+and saved in one transaction.
 """
+import logging
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
-from config import COLORS, FONTS
+from config import COLORS, FONTS, ScopedSession
+from utils.query_profiler import profiled
+from utils.table_binding import TableBinding
 from utils.ui_helpers import (
     scrollable_treeview, make_entry, make_label,
-    show_error, show_success, show_info, confirm_delete
+    show_error, show_success, show_info, confirm_delete, confirm_action
 )
 
+logger = logging.getLogger(__name__)
+
+# One poll at a time across all open results tables; queries are O(changes).
+_poller = ThreadPoolExecutor(max_workers=1, thread_name_prefix="results-poll")
+
 
 class ResultsPanel(tk.Frame):
-    def __init__(self, parent, result_svc, student_svc, subject_svc, class_svc,
-                 teacher=None):
+    POLL_MS = 3000
+
+    def __init__(self, parent, result_svc, student_svc, reference_svc,
+                 teacher=None, exam_session_svc=None, data=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.result_svc = result_svc
         self.student_svc = student_svc
-        self.subject_svc = subject_svc
-        self.class_svc = class_svc
+        self.reference_svc = reference_svc
         self.teacher = teacher  # If set, restrict to teacher's subjects
+        self.exam_session_svc = exam_session_svc
+        self._session_id = exam_session_svc.current_id() if exam_session_svc else None
+        self._change_seq = 0
+        self._load_generation = 0
+        self._poll_job = None
+        self._poll_future = None
         self.pack(fill="both", expand=True)
         self._build()
-        self._load()
+        self._load(data)
+        self.bind("<Destroy>", self._on_destroy)
+        self._schedule_poll()
 
     # ── Build ─────────────────────────────────────────────────────────────────
 
@@ -31,7 +57,10 @@ class ResultsPanel(tk.Frame):
                              highlightbackground=COLORS["border"], highlightthickness=1)
         form_card.pack(fill="x", padx=16, pady=(12, 6))
 
-        make_label(form_card, "Enter / Update Marks", "subheading").grid(
+        # Marks are always entered for the current exam session.
+        session = self.exam_session_svc.current() if self.exam_session_svc else None
+        title = f"Enter / Update Marks — {session.name}" if session else "Enter / Update Marks"
+        make_label(form_card, title, "subheading").grid(
             row=0, column=0, columnspan=6, sticky="w", pady=(0, 12))
 
         labels = ["Student Adm No", "Subject", "Marks (0–100)"]
@@ -49,8 +78,8 @@ class ResultsPanel(tk.Frame):
         adm_entry.grid(row=1, column=1, padx=(0, 8), pady=6)
 
         # Subjects
-        subjects = self._get_available_subjects()
-        self._subject_map = {s.subject_name: s.id for s in subjects}
+        ref = self.reference_svc.get()
+        self._subject_map = ref.subjects_taught_by(self.teacher.id) if self.teacher else ref.subjects
         self.subject_cb = ttk.Combobox(
             form_card, textvariable=self.subject_var,
             values=list(self._subject_map.keys()), width=22, state="readonly")
@@ -71,29 +100,48 @@ class ResultsPanel(tk.Frame):
                   bg=COLORS["secondary"], fg="white", relief="flat",
                   cursor="hand2", padx=14, pady=5,
                   command=self._update_marks).pack(side="left", padx=2)
+        tk.Button(btn_frame, text="Grid Entry", font=FONTS["body_bold"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=14, pady=5,
+                  command=self._open_grid).pack(side="left", padx=2)
 
         # Toolbar / filter
         toolbar = tk.Frame(self, bg=COLORS["bg_medium"], pady=6)
         toolbar.pack(fill="x", padx=16)
         make_label(toolbar, "Results Table", "subheading").pack(side="left")
 
-        # Class filter for admin
-        make_label(toolbar, "Filter Class:", "body").pack(side="left", padx=(20, 4))
-        self.filter_class_var = tk.StringVar(value="All")
-        classes = self.class_svc.get_all()
-        self._class_map_filter = {c.class_name: c.id for c in classes}
-        filter_values = ["All"] + list(self._class_map_filter.keys())
-        ttk.Combobox(toolbar, textvariable=self.filter_class_var,
-                     values=filter_values, width=18, state="readonly").pack(side="left")
-        tk.Button(toolbar, text="Apply", font=FONTS["body"],
-                  bg=COLORS["primary"], fg="white", relief="flat",
-                  cursor="hand2", padx=10, command=self._load).pack(side="left", padx=6)
-
         tk.Button(toolbar, text="Delete Selected", font=FONTS["body"],
                   bg=COLORS["danger"], fg="white", relief="flat",
                   cursor="hand2", padx=10,
                   command=self._delete_result).pack(side="right")
 
+        # Filters narrow the loaded rows in memory; no query
+        filters = tk.Frame(self, bg=COLORS["bg_medium"])
+        filters.pack(fill="x", padx=16, pady=(0, 6))
+        self.filter_class_var = tk.StringVar(value="All")
+        self.filter_subject_var = tk.StringVar(value="All")
+        self.filter_grade_var = tk.StringVar(value="All")
+        self.filter_min_var = tk.StringVar()
+        self.filter_max_var = tk.StringVar()
+        for label, var, values in [
+            ("Class:", self.filter_class_var, ["All"] + list(ref.classes)),
+            ("Subject:", self.filter_subject_var, ["All"] + sorted(ref.subjects)),
+            ("Grade:", self.filter_grade_var, ["All"] + list(ref.grades)),
+        ]:
+            make_label(filters, label, "body").pack(side="left", padx=(0, 4))
+            ttk.Combobox(filters, textvariable=var, values=values,
+                         width=16, state="readonly").pack(side="left", padx=(0, 12))
+        make_label(filters, "Marks:", "body").pack(side="left", padx=(0, 4))
+        make_entry(filters, textvariable=self.filter_min_var, width=5).pack(side="left")
+        make_label(filters, "\u2013", "body").pack(side="left", padx=2)
+        make_entry(filters, textvariable=self.filter_max_var, width=5).pack(side="left")
+        tk.Button(filters, text="Apply", font=FONTS["body"],
+                  bg=COLORS["primary"], fg="white", relief="flat",
+                  cursor="hand2", padx=10, command=self._apply_filter).pack(side="left", padx=(12, 4))
+        tk.Button(filters, text="Clear", font=FONTS["body"],
+                  bg=COLORS["bg_light"], fg=COLORS["text_primary"], relief="flat",
+                  cursor="hand2", padx=10, command=self._clear_filter).pack(side="left")
+
         # Table
         cols = ("id", "adm", "student", "class_", "subject", "marks", "grade", "gpa", "remarks")
         headings = ("ID", "Adm No", "Student", "Class", "Subject", "Marks", "Grade", "GPA", "Remarks")
@@ -111,40 +159,136 @@ class ResultsPanel(tk.Frame):
         self.tree.tag_configure("F", foreground=COLORS["danger"])
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
         self._selected_result_id = None
-
-    def _get_available_subjects(self):
-        if self.teacher:
-            return self.subject_svc.get_by_teacher(self.teacher.id)
-        return self.subject_svc.get_all()
+        self._rows = TableBinding(self.tree, self._row_values, tags=lambda r: (r.grade,), sortable={
+            "id": "id", "adm": "admission_number", "student": "student_name", "class_": "class_name",
+            "subject": "subject_name", "marks": "marks", "grade": "grade", "gpa": "gpa", "remarks": "remarks",
+        })
 
     # ── Data ─────────────────────────────────────────────────────────────────
 
-    def _load(self):
-        class_name = self.filter_class_var.get() if hasattr(self, "filter_class_var") else "All"
-        if class_name != "All":
-            class_id = self._class_map_filter.get(class_name)
-            results = self.result_svc.get_class_results(class_id)
+    @staticmethod
+    def fetch(result_svc):
+        """(change seq, rows) for the table; safe to run off the UI thread."""
+        # Read the cursor first: changes racing the load are re-applied, not lost.
+        return result_svc.change_seq(), result_svc.get_rows()
+
+    @profiled()
+    def _load(self, data=None):
+        if data is None:
+            data = self.fetch(self.result_svc)
+        self._change_seq, rows = data
+        self._load_generation += 1
+        self._populate(rows)
+
+    def _populate(self, rows):
+        self._rows.update(rows)
+
+    def _apply_filter(self):
+        try:
+            marks = (self._bound(self.filter_min_var), self._bound(self.filter_max_var))
+        except ValueError:
+            show_error("Validation", "Marks bounds must be numbers.")
+            return
+        self._rows.filter(
+            class_name=self._choice(self.filter_class_var),
+            subject_name=self._choice(self.filter_subject_var),
+            grade=self._choice(self.filter_grade_var),
+            marks=marks if marks != (None, None) else None,
+        )
+
+    def _clear_filter(self):
+        for var in (self.filter_class_var, self.filter_subject_var, self.filter_grade_var):
+            var.set("All")
+        self.filter_min_var.set("")
+        self.filter_max_var.set("")
+        self._rows.filter()
+
+    @staticmethod
+    def _choice(var):
+        value = var.get()
+        return None if value == "All" else value
+
+    @staticmethod
+    def _bound(var):
+        text = var.get().strip()
+        return float(text) if text else None
+
+    # ── Live refresh ─────────────────────────────────────────────────────────
+
+    def _schedule_poll(self):
+        self._poll_job = self.after(self.POLL_MS, self._start_poll)
+
+    def is_stale(self):
+        return self.result_svc.change_seq() != self._change_seq
+
+    def refresh(self):
+        """Catch up now instead of at the next tick (the dashboard raised the panel)."""
+        if self._poll_future is None:
+            if self._poll_job is not None:
+                self.after_cancel(self._poll_job)
+            self._begin_poll()
+
+    def _start_poll(self):
+        self._poll_job = None
+        if not self.winfo_ismapped():
+            self._schedule_poll()  # hidden in the dashboard's panel cache
+            return
+        self._begin_poll()
+
+    def _begin_poll(self):
+        self._poll_future = _poller.submit(self._poll_worker, self._change_seq, self._load_generation)
+        self._poll_job = self.after(50, self._finish_poll)
+
+    def _poll_worker(self, seq, generation):
+        """Runs on the poller thread, in that thread's own scoped session."""
+        try:
+            batch = self.result_svc.changes_since(seq)
+            if batch is None:
+                return generation, None, None, []
+            shown = [d.result_id for d in batch.deltas
+                     if not d.deleted and d.exam_session_id == self._session_id]
+            rows = self.result_svc.get_rows(result_ids=shown) if shown else []
+            return generation, batch.cursor, batch.deltas, rows
+        finally:
+            ScopedSession.remove()
+
+    def _finish_poll(self):
+        future = self._poll_future
+        if not future.done():
+            self._poll_job = self.after(50, self._finish_poll)
+            return
+        self._poll_future = None
+        try:
+            generation, seq, deltas, rows = future.result()
+        except Exception as e:
+            logger.error(f"Results refresh failed: {e}")
         else:
-            results = self.result_svc.get_all()
-        self._populate(results)
+            if generation != self._load_generation:
+                pass  # the table was reloaded meanwhile; its cursor is newer
+            elif deltas is None:
+                self._load()  # the change log no longer reaches back to our cursor
+            else:
+                self._apply_changes(deltas, rows)
+                self._change_seq = seq
+        self._schedule_poll()
 
-    def _populate(self, results):
-        self.tree.delete(*self.tree.get_children())
-        for r in results:
-            student = r.student
-            class_name = student.class_.class_name if student and student.class_ else "—"
-            subject_name = r.subject.subject_name if r.subject else "—"
-            self.tree.insert("", "end", iid=str(r.id), tags=(r.grade,), values=(
-                r.id,
-                student.admission_number if student else "—",
-                student.full_name if student else "—",
-                class_name,
-                subject_name,
-                f"{r.marks:.1f}",
-                r.grade,
-                f"{r.gpa:.1f}",
-                r.remarks,
-            ))
+    def _apply_changes(self, deltas, rows):
+        """Patch changed rows in place by iid; selection and scroll position are kept."""
+        fresh = {r.id: r for r in rows}
+        self._rows.patch([fresh[d.result_id] for d in deltas if d.result_id in fresh],
+                         removed=[d.result_id for d in deltas if d.result_id not in fresh], index=0)
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    @staticmethod
+    def _row_values(r):
+        return (
+            r.id, r.admission_number, r.student_name, r.class_name or "—",
+            r.subject_name, f"{r.marks:.1f}", r.grade, f"{r.gpa:.1f}", r.remarks,
+        )
 
     def _on_select(self, _event):
         sel = self.tree.selection()
@@ -179,14 +323,10 @@ class ResultsPanel(tk.Frame):
                 return
             subject_id = self._subject_map.get(subject_name)
             result = self.result_svc.add_result(student.id, subject_id, marks)
-            show_success("Saved", f"Marks saved: {result.marks} — Grade {result.grade}")
-            # Real-time append to tree
-            class_name = student.class_.class_name if student.class_ else "—"
-            self.tree.insert("", 0, iid=str(result.id), tags=(result.grade,), values=(
-                result.id, student.admission_number, student.full_name,
-                class_name, subject_name, f"{result.marks:.1f}",
-                result.grade, f"{result.gpa:.1f}", result.remarks,
-            ))
+            # Real-time append to tree; read the row before the dialog ends the session.
+            row = self.result_svc.get_row(result.id)
+            self._rows.put(row, index=0)
+            show_success("Saved", f"Marks saved: {row.marks} — Grade {row.grade}")
         except ValueError as e:
             show_error("Error", str(e))
         except Exception as e:
@@ -199,19 +339,24 @@ class ResultsPanel(tk.Frame):
         try:
             marks = float(self.marks_var.get().strip())
             result = self.result_svc.update_result(self._selected_result_id, marks)
-            show_success("Updated", f"Marks updated: {result.marks} — Grade {result.grade}")
             # Update row in-place
-            student = result.student
-            subject_name = result.subject.subject_name if result.subject else "—"
-            class_name = student.class_.class_name if student and student.class_ else "—"
-            self.tree.item(str(result.id), tags=(result.grade,), values=(
-                result.id, student.admission_number, student.full_name,
-                class_name, subject_name, f"{result.marks:.1f}",
-                result.grade, f"{result.gpa:.1f}", result.remarks,
-            ))
+            row = self.result_svc.get_row(result.id)
+            self._rows.put(row)
+            show_success("Updated", f"Marks updated: {row.marks} — Grade {row.grade}")
         except Exception as e:
             show_error("Error", str(e))
 
+    def _open_grid(self):
+        if not self._subject_map:
+            show_info("Subjects", "There are no subjects to enter marks for.")
+            return
+        MarksGridDialog(self, self.result_svc, self._subject_map,
+                        subject=self.subject_var.get(), on_save=self._grid_saved)
+
+    def _grid_saved(self, written, removed):
+        rows = self.result_svc.get_rows(result_ids=written) if written else []
+        self._rows.patch(rows, removed=removed, index=0)
+
     def _delete_result(self):
         if not self._selected_result_id:
             show_info("Select", "Please select a result to delete.")
@@ -219,8 +364,205 @@ class ResultsPanel(tk.Frame):
         if confirm_delete("this result"):
             try:
                 self.result_svc.delete_result(self._selected_result_id)
-                self.tree.delete(str(self._selected_result_id))
+                self._rows.discard(self._selected_result_id)
                 self._selected_result_id = None
                 show_success("Deleted", "Result deleted.")
             except Exception as e:
                 show_error("Error", str(e))
+
+
+class MarksGridDialog(tk.Toplevel):
+    """One subject's class roster with an editable marks column.
+
+    Enter, Tab or Down keeps the typed mark and moves to the next student,
+    Up and Shift-Tab to the previous one, Escape drops the edit. Changed
+    rows are marked until "Save" writes them all with one
+    ``ResultService.save_marks`` call; a cleared cell removes the mark.
+    """
+
+    def __init__(self, parent, result_svc, subject_map, subject=None, on_save=None):
+        super().__init__(parent)
+        self.result_svc = result_svc
+        self._subject_map = subject_map
+        self.on_save = on_save
+        self._saved = {}     # student id -> marks as loaded (None: no result)
+        self._dirty = {}     # student id -> marks to write
+        self._order = []     # student ids, top to bottom
+        self._editing = None
+        self.title("Marks Entry")
+        self.configure(bg=COLORS["bg_medium"])
+        self.protocol("WM_DELETE_WINDOW", self._close)
+        self.grab_set()
+        self._build()
+        self.subject_var.set(subject if subject in subject_map else next(iter(subject_map)))
+        self._shown_subject = None
+        self._load_subject()
+
+    def _build(self):
+        top = tk.Frame(self, bg=COLORS["bg_medium"], padx=16, pady=12)
+        top.pack(fill="x")
+        make_label(top, "Subject:", "body").pack(side="left", padx=(0, 4))
+        self.subject_var = tk.StringVar()
+        cb = ttk.Combobox(top, textvariable=self.subject_var,
+                          values=list(self._subject_map.keys()), width=24, state="readonly")
+        cb.pack(side="left")
+        cb.bind("<<ComboboxSelected>>", lambda e: self._load_subject())
+        self.status_lbl = tk.Label(top, text="", font=FONTS["small"],
+                                   bg=COLORS["bg_medium"], fg=COLORS["text_secondary"])
+        self.status_lbl.pack(side="left", padx=16)
+
+        cols = ("adm", "student", "marks", "grade")
+        headings = ("Adm No", "Student", "Marks", "Grade")
+        frame, self.tree = scrollable_treeview(self, cols, headings, height=20)
+        frame.pack(fill="both", expand=True, padx=16)
+        for col, w in zip(cols, [100, 200, 80, 70]):
+            self.tree.column(col, width=w, minwidth=w)
+        self.tree.tag_configure("dirty", background=COLORS["hover"], foreground=COLORS["warning"])
+        self.tree.bind("<Return>", lambda e: self._edit(self.tree.focus()))
+        self.tree.bind("<Double-1>", lambda e: self._edit(self.tree.identify_row(e.y)))
+
+        self.editor = tk.Entry(self.tree, font=FONTS["body"], justify="center",
+                               bg=COLORS["bg_light"], fg=COLORS["text_primary"],
+                               insertbackground=COLORS["text_primary"], relief="flat")
+        self.editor.bind("<Return>", lambda e: self._step(1))
+        self.editor.bind("<Down>", lambda e: self._step(1))
+        self.editor.bind("<Tab>", lambda e: self._step(1))
+        self.editor.bind("<Up>", lambda e: self._step(-1))
+        self.editor.bind("<Shift-Tab>", lambda e: self._step(-1))
+        self.editor.bind("<ISO_Left_Tab>", lambda e: self._step(-1))
+        self.editor.bind("<Escape>", lambda e: self._stop_edit())
+
+        btn_row = tk.Frame(self, bg=COLORS["bg_medium"], padx=16, pady=10)
+        btn_row.pack(fill="x")
+        tk.Button(btn_row, text="Save", font=FONTS["body_bold"],
+                  bg=COLORS["success"], fg="white", relief="flat",
+                  cursor="hand2", padx=20, pady=6,
+                  command=self._save).pack(side="right", padx=6)
+        tk.Button(btn_row, text="Close", font=FONTS["body"],
+                  bg=COLORS["bg_light"], fg=COLORS["text_primary"],
+                  relief="flat", cursor="hand2", padx=20, pady=6,
+                  command=self._close).pack(side="right")
+
+    # ── Data ─────────────────────────────────────────────────────────────────
+
+    @profiled()
+    def _load_subject(self):
+        subject = self.subject_var.get()
+        if subject != self._shown_subject and self._dirty and not confirm_action(
+                "Unsaved Marks", f"Discard {len(self._dirty)} unsaved mark(s)?"):
+            self.subject_var.set(self._shown_subject)
+            return
+        self._stop_edit()
+        self._shown_subject = subject
+        roster = self.result_svc.get_roster(self._subject_map[subject])
+        self.tree.delete(*self.tree.get_children())
+        self._saved = {r.student_id: r.marks for r in roster}
+        self._dirty = {}
+        self._order = [str(r.student_id) for r in roster]
+        for r in roster:
+            self.tree.insert("", "end", iid=str(r.student_id), values=(
+                r.admission_number, r.full_name, _mark_text(r.marks), r.grade or "—"))
+        if self._order:
+            self.tree.focus(self._order[0])
+            self.tree.selection_set(self._order[0])
+            self._edit(self._order[0])
+        self._update_status()
+
+    def _save(self):
+        if not self._keep_edit():
+            return
+        if not self._dirty:
+            show_info("Nothing to Save", "No marks have changed.")
+            return
+        try:
+            written, removed = self.result_svc.save_marks(
+                self._subject_map[self._shown_subject], self._dirty)
+        except Exception as e:
+            show_error("Error", str(e))
+            return
+        if self.on_save:
+            self.on_save(written, removed)
+        count = len(self._dirty)
+        self._dirty = {}
+        self._load_subject()
+        show_success("Saved", f"{count} mark(s) saved for {self._shown_subject}.")
+
+    def _close(self):
+        if self._editing:
+            self._keep_edit()
+        if self._dirty and not confirm_action(
+                "Unsaved Marks", f"Close and discard {len(self._dirty)} unsaved mark(s)?"):
+            return
+        self.destroy()
+
+    # ── Cell editing ─────────────────────────────────────────────────────────
+
+    def _edit(self, iid):
+        if not iid:
+            return
+        self.tree.see(iid)
+        self.tree.update_idletasks()
+        box = self.tree.bbox(iid, "marks")
+        if not box:
+            return
+        x, y, w, h = box
+        self._editing = iid
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        self.editor.delete(0, "end")
+        self.editor.insert(0, self.tree.set(iid, "marks").replace("—", ""))
+        self.editor.place(x=x, y=y, width=w, height=h)
+        self.editor.select_range(0, "end")
+        self.editor.focus_set()
+
+    def _step(self, delta):
+        iid = self._editing
+        if self._keep_edit():
+            at = self._order.index(iid) + delta
+            if 0 <= at < len(self._order):
+                self._edit(self._order[at])
+            else:
+                self._edit(iid)
+        return "break"
+
+    def _keep_edit(self) -> bool:
+        """Take the editor's text as the current student's mark; False if it is not a valid mark."""
+        iid = self._editing
+        if iid is None:
+            return True
+        text = self.editor.get().strip()
+        try:
+            marks = float(text) if text else None
+            if marks is not None and not 0 <= marks <= 100:
+                raise ValueError
+        except ValueError:
+            self.editor.configure(bg=COLORS["danger"])
+            self.bell()
+            return False
+        self.editor.configure(bg=COLORS["bg_light"])
+        student_id = int(iid)
+        if marks == self._saved[student_id]:
+            self._dirty.pop(student_id, None)
+        else:
+            self._dirty[student_id] = marks
+        dirty = student_id in self._dirty
+        self.tree.set(iid, "marks", _mark_text(marks))
+        if dirty:
+            self.tree.set(iid, "grade", "edited")
+        self.tree.item(iid, tags=("dirty",) if dirty else ())
+        self._update_status()
+        return True
+
+    def _stop_edit(self):
+        self._editing = None
+        self.editor.place_forget()
+        self.editor.configure(bg=COLORS["bg_light"])
+        self.tree.focus_set()
+
+    def _update_status(self):
+        self.status_lbl.configure(
+            text=f"{len(self._order)} student(s)  |  {len(self._dirty)} unsaved change(s)")
+
+
+def _mark_text(marks):
+    return "—" if marks is None else f"{marks:g}"
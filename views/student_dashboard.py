@@ -5,13 +5,13 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
 from views.base_dashboard import BaseDashboard
-from services import ResultService, SubjectService, ClassService
-from config import SessionLocal
+from services import ResultService, SubjectService, ClassService, SummaryService, ExamSessionService
+from config import ScopedSession
 
 
 class StudentDashboard(BaseDashboard):
     def __init__(self, master, user, logout_callback):
-        self._db = SessionLocal()
+        self._db = ScopedSession
         self._init_services(user)
         self.NAV_ITEMS = [
             ("My Results", self._show_results),
@@ -25,13 +25,16 @@ class StudentDashboard(BaseDashboard):
         self.result_svc = ResultService(db)
         self.subject_svc = SubjectService(db)
         self.class_svc = ClassService(db)
+        self.summary_svc = SummaryService(db)
+        self.exam_session_svc = ExamSessionService(db)
+        self._session_id = None  # None = the current exam session
 
     def _show_results(self):
         self.update_section_title("My Results")
         f = self.get_content_frame()
         from utils.ui_helpers import make_stat_card, make_divider
 
-        results = self.result_svc.get_by_student(self.user.id)
+        summary = self.summary_svc.get(self.user.id, self._session_id)
 
         # ── Welcome header ───────────────────────────────────────────────────
         header = tk.Frame(f, bg=COLORS["bg_medium"], pady=20)
@@ -43,9 +46,21 @@ class StudentDashboard(BaseDashboard):
                  font=FONTS["body"], bg=COLORS["bg_medium"],
                  fg=COLORS["text_secondary"]).pack(anchor="w", pady=(4, 0))
 
+        # Past terms stay viewable; the current one is shown first.
+        sessions = self.exam_session_svc.get_all()
+        session_map = {s.name: s.id for s in sessions}
+        shown = next((s.name for s in sessions
+                      if s.id == self._session_id or (self._session_id is None and s.is_current)), "")
+        session_var = tk.StringVar(value=shown)
+        picker = ttk.Combobox(header, textvariable=session_var, values=list(session_map.keys()),
+                              width=20, state="readonly")
+        picker.pack(anchor="w", pady=(8, 0))
+        picker.bind("<<ComboboxSelected>>",
+                    lambda _e: self._select_session(session_map.get(session_var.get())))
+
         make_divider(f, padx=24, pady=(0, 4))
 
-        if not results:
+        if not summary:
             empty = tk.Frame(f, bg=COLORS["bg_medium"])
             empty.pack(fill="both", expand=True)
             tk.Label(empty, text="\U0001f4cb",
@@ -59,17 +74,15 @@ class StudentDashboard(BaseDashboard):
                      fg=COLORS["text_secondary"]).pack(pady=(4, 0))
             return
 
-        total_marks = sum(r.marks for r in results)
-        avg_marks = total_marks / len(results) if results else 0
-        passed = sum(1 for r in results if r.marks >= 50)
-
         # ── Stat cards ───────────────────────────────────────────────────────
         cards_row = tk.Frame(f, bg=COLORS["bg_medium"])
         cards_row.pack(fill="x", padx=24, pady=16)
         stat_items = [
-            ("\U0001f4da", len(results),          "Total Subjects",  COLORS["primary"]),
-            ("\u2b50",     f"{avg_marks:.1f}%",   "Average Score",   COLORS["secondary"]),
-            ("\u2705",     f"{passed}/{len(results)}", "Passed",     COLORS["success"]),
+            ("\U0001f4da", summary.subjects,                   "Total Subjects",  COLORS["primary"]),
+            ("\u2b50",     f"{summary.average:.1f}%",          "Average Score",   COLORS["secondary"]),
+            ("\u2705",     f"{summary.passed}/{summary.subjects}", "Passed",      COLORS["success"]),
+            ("\U0001f3c5", summary.division,                   f"Mean GPA {summary.average_gpa:.2f}",
+             COLORS["accent"]),
         ]
         for i, (icon, val, label, color) in enumerate(stat_items):
             card = make_stat_card(cards_row, icon, val, label, color)
@@ -100,30 +113,13 @@ class StudentDashboard(BaseDashboard):
         scrollbar.pack(side="right", fill="y")
         tree.configure(yscrollcommand=scrollbar.set)
 
-        # Grade scale
-        grade_scale = [
-            (80, 100, "A", "Distinction"),
-            (70, 79, "B", "Credit"),
-            (60, 69, "C", "Merit"),
-            (50, 59, "D", "Pass"),
-            (0, 49, "F", "Fail"),
-        ]
+        for r in self.result_svc.transcript(self.user.id, self._session_id):
+            tree.insert("", "end", values=(
+                r.subject_name, r.class_name or "N/A", f"{r.marks}", r.grade, r.remarks))
 
-        for r in results:
-            subject = r.subject.subject_name if r.subject else "N/A"
-            class_name = r.subject.class_.class_name if r.subject and r.subject.class_ else "N/A"
-            marks = r.marks
-            
-            # Determine grade
-            grade = "F"
-            remarks = "Fail"
-            for min_val, max_val, g, rem in grade_scale:
-                if min_val <= marks <= max_val:
-                    grade = g
-                    remarks = rem
-                    break
-            
-            tree.insert("", "end", values=(subject, class_name, f"{marks}", grade, remarks))
+    def _select_session(self, session_id):
+        self._session_id = session_id
+        self._nav_click("My Results", self._show_results)
 
     def _show_profile(self):
         self.update_section_title("My Profile")
@@ -163,13 +159,16 @@ class StudentDashboard(BaseDashboard):
 
         make_divider(card, pady=(0, 14))
 
+        # The logged-in student is detached; resolve the class in this action's session
+        cls = self.class_svc.get_by_id(self.user.class_id) if self.user.class_id else None
+
         # Info fields in 2-column grid
         info_items = [
             ("Admission Number", self.user.admission_number),
             ("Full Name",        self.user.full_name),
             ("Gender",           self.user.gender),
             ("Date of Birth",    str(self.user.date_of_birth) if self.user.date_of_birth else "Not set"),
-            ("Class",            self.user.class_.class_name if self.user.class_ else "Not assigned"),
+            ("Class",            cls.class_name if cls else "Not assigned"),
         ]
 
         grid = tk.Frame(card, bg=COLORS["card"])
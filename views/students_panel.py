@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from config import COLORS, FONTS
+from utils.query_profiler import profiled
+from utils.table_binding import TableBinding
 from utils.ui_helpers import (
     scrollable_treeview, make_entry, make_label,
     confirm_delete, show_error, show_success, show_info
@@ -14,16 +16,21 @@ from utils.ui_helpers import (
 class StudentsPanel(tk.Frame):
     PAGE_SIZE = 20
 
-    def __init__(self, parent, student_svc, class_svc):
+    def __init__(self, parent, student_svc, reference_svc, data=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.student_svc = student_svc
-        self.class_svc = class_svc
+        self.reference_svc = reference_svc
         self._page = 1
         self._total = 0
         self._selected_id = None
         self.pack(fill="both", expand=True)
         self._build()
-        self._load()
+        self._load(data)
+
+    @classmethod
+    def fetch(cls, student_svc):
+        """The first page as _load shows it unfiltered; safe to run off the UI thread."""
+        return student_svc.search_rows("", None, 1, cls.PAGE_SIZE)
 
     # ── Build UI ──────────────────────────────────────────────────────────────
 
@@ -61,13 +68,13 @@ class StudentsPanel(tk.Frame):
                       command=cmd).pack(side="right", padx=4)
 
         # Table
-        cols = ("adm_no", "name", "gender", "dob", "class", "results")
-        headings = ("Adm No", "Full Name", "Gender", "Date of Birth", "Class", "Results")
+        cols = ("adm_no", "name", "gender", "dob", "class", "results", "average", "division")
+        headings = ("Adm No", "Full Name", "Gender", "Date of Birth", "Class", "Results", "Average", "Division")
         frame, self.tree = scrollable_treeview(self, cols, headings, height=20)
         frame.pack(fill="both", expand=True, padx=16, pady=(0, 8))
 
         # Configure column widths
-        widths = [100, 180, 70, 100, 120, 60]
+        widths = [100, 180, 70, 100, 120, 60, 70, 100]
         for col, w in zip(cols, widths):
             self.tree.column(col, width=w, minwidth=w)
 
@@ -75,6 +82,11 @@ class StudentsPanel(tk.Frame):
         self.tree.tag_configure("odd", background=COLORS["table_odd"])
         self.tree.tag_configure("even", background=COLORS["table_even"])
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._rows = TableBinding(self.tree, self._row_values, striped=True, sortable={
+            "adm_no": "admission_number", "name": "full_name", "gender": "gender",
+            "dob": "date_of_birth", "class": "class_name", "results": "result_count",
+            "average": "average", "division": "division",
+        })
 
         # Pagination bar
         pag = tk.Frame(self, bg=COLORS["bg_medium"])
@@ -97,33 +109,40 @@ class StudentsPanel(tk.Frame):
     # ── Data ─────────────────────────────────────────────────────────────────
 
     def _refresh_class_filter(self):
-        classes = self.class_svc.get_all()
-        self._class_map = {c.class_name: c.id for c in classes}
+        self._class_map = self.reference_svc.get().classes
         values = ["All"] + list(self._class_map.keys())
         self.class_filter["values"] = values
         if self.class_var.get() not in values:
             self.class_var.set("All")
 
-    def _load(self):
-        query = self.search_var.get().strip() if hasattr(self, "search_var") else ""
-        class_name = self.class_var.get() if hasattr(self, "class_var") else "All"
-        class_id = self._class_map.get(class_name) if class_name != "All" else None
-        students, total = self.student_svc.search(query, class_id, self._page, self.PAGE_SIZE)
+    @profiled()
+    def _load(self, data=None):
+        if data is None:
+            query = self.search_var.get().strip() if hasattr(self, "search_var") else ""
+            class_name = self.class_var.get() if hasattr(self, "class_var") else "All"
+            class_id = self._class_map.get(class_name) if class_name != "All" else None
+            data = self.student_svc.search_rows(query, class_id, self._page, self.PAGE_SIZE)
+        students, total = data
         self._total = total
         self._populate(students)
         pages = max(1, (total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
         self.page_lbl.configure(
             text=f"Showing {len(students)} of {total}  |  Page {self._page}/{pages}")
 
+    def refresh(self):
+        self._refresh_class_filter()
+        self._load()
+
     def _populate(self, students):
-        self.tree.delete(*self.tree.get_children())
-        for i, s in enumerate(students):
-            class_name = s.class_.class_name if s.class_ else "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(s.id), tags=(tag,), values=(
-                s.admission_number, s.full_name, s.gender,
-                str(s.date_of_birth or "—"), class_name, len(s.results),
-            ))
+        self._rows.update(students)
+
+    @staticmethod
+    def _row_values(s):
+        return (
+            s.admission_number, s.full_name, s.gender,
+            str(s.date_of_birth or "—"), s.class_name or "—", s.result_count,
+            f"{s.average:.1f}" if s.average is not None else "—", s.division or "—",
+        )
 
     def _on_select(self, _event):
         sel = self.tree.selection()
@@ -147,7 +166,7 @@ class StudentsPanel(tk.Frame):
     # ── CRUD dialogs ──────────────────────────────────────────────────────────
 
     def _open_add(self):
-        StudentFormDialog(self, self.student_svc, self.class_svc,
+        StudentFormDialog(self, self.student_svc, self.reference_svc,
                           on_save=self._load)
 
     def _open_edit(self):
@@ -158,7 +177,7 @@ class StudentsPanel(tk.Frame):
         if not student:
             show_error("Not Found", "Student not found.")
             return
-        StudentFormDialog(self, self.student_svc, self.class_svc,
+        StudentFormDialog(self, self.student_svc, self.reference_svc,
                           student=student, on_save=self._load)
 
     def _do_delete(self):
@@ -168,7 +187,8 @@ class StudentsPanel(tk.Frame):
         student = self.student_svc.get_by_id(self._selected_id)
         if not student:
             return
-        if confirm_delete(student.full_name):
+        plan = self.student_svc.delete(self._selected_id, dry_run=True)
+        if confirm_delete(f"{student.full_name} ({plan.describe()})"):
             try:
                 self.student_svc.delete(self._selected_id)
                 self._selected_id = None
@@ -179,10 +199,10 @@ class StudentsPanel(tk.Frame):
 
 
 class StudentFormDialog(tk.Toplevel):
-    def __init__(self, parent, student_svc, class_svc, student=None, on_save=None):
+    def __init__(self, parent, student_svc, reference_svc, student=None, on_save=None):
         super().__init__(parent)
         self.student_svc = student_svc
-        self.class_svc = class_svc
+        self.reference_svc = reference_svc
         self.student = student
         self.on_save = on_save
         self.title("Edit Student" if student else "Add Student")
@@ -220,8 +240,7 @@ class StudentFormDialog(tk.Toplevel):
                      width=36, state="readonly").pack(fill="x", **pad)
 
         # Class
-        classes = self.class_svc.get_all()
-        self._class_map = {f"{c.class_name} ({c.academic_year})": c.id for c in classes}
+        self._class_map = self.reference_svc.get().class_labels
         tk.Label(form, text="Class", font=FONTS["body_bold"],
                  bg=COLORS["bg_medium"], fg=COLORS["text_secondary"]).pack(anchor="w")
         self.class_var = tk.StringVar(value="")
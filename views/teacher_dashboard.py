@@ -5,41 +5,51 @@ import tkinter as tk
 from config import COLORS, FONTS
 from views.base_dashboard import BaseDashboard
 from views.results_panel import ResultsPanel
-from services import StudentService, SubjectService, ResultService, ClassService
-from config import SessionLocal
+from services import (
+    StudentService, ResultService, AnalyticsService, ExamSessionService, ReferenceDataService
+)
+from config import ScopedSession
 
 
 class TeacherDashboard(BaseDashboard):
     def __init__(self, master, user, logout_callback):
-        self._db = SessionLocal()
+        self._db = ScopedSession
         self._init_services(user)
         self.NAV_ITEMS = [
             ("My Subjects & Marks", self._show_results),
             ("My Class Performance", self._show_class_perf),
         ]
+        self.PREFETCH = {
+            "My Subjects & Marks": lambda: ResultsPanel.fetch(self.result_svc),
+            "My Class Performance": lambda: self.analytics_svc.teacher_performance(user.id),
+        }
         super().__init__(master, user, "TEACHER", logout_callback)
         self._nav_click("My Subjects & Marks", self._show_results)
 
     def _init_services(self, user):
         db = self._db
         self.student_svc = StudentService(db)
-        self.subject_svc = SubjectService(db)
         self.result_svc = ResultService(db)
-        self.class_svc = ClassService(db)
+        self.reference_svc = ReferenceDataService(db)
+        self.analytics_svc = AnalyticsService(db)
+        self.exam_session_svc = ExamSessionService(db)
 
     def _show_results(self):
         self.update_section_title("Enter Student Marks")
-        ResultsPanel(
+        return ResultsPanel(
             self.get_content_frame(),
-            self.result_svc, self.student_svc, self.subject_svc, self.class_svc,
-            teacher=self.user,
+            self.result_svc, self.student_svc, self.reference_svc,
+            teacher=self.user, exam_session_svc=self.exam_session_svc,
+            data=self.prefetched("My Subjects & Marks"),
         )
 
     def _show_class_perf(self):
         self.update_section_title("Class Performance")
         f = self.get_content_frame()
         from utils.ui_helpers import make_divider, make_stat_card
-        subjects = self.subject_svc.get_by_teacher(self.user.id)
+        subjects = self.prefetched("My Class Performance")
+        if subjects is None:
+            subjects = self.analytics_svc.teacher_performance(self.user.id)
 
         # Header
         header = tk.Frame(f, bg=COLORS["bg_medium"], pady=20)
@@ -73,8 +83,7 @@ class TeacherDashboard(BaseDashboard):
         ]
 
         for idx, subject in enumerate(subjects):
-            results = self.result_svc.get_by_subject(subject.id)
-            class_name = subject.class_.class_name if subject.class_ else "\u2014"
+            class_name = subject.class_name or "\u2014"
             color = accent_cycle[idx % len(accent_cycle)]
 
             # Card with left accent bar
@@ -96,20 +105,18 @@ class TeacherDashboard(BaseDashboard):
                      font=FONTS["small"], bg=COLORS["card"],
                      fg=COLORS["text_secondary"]).pack(side="right")
 
-            if results:
-                avg = sum(r.marks for r in results) / len(results)
-                pass_c = sum(1 for r in results if r.marks >= 50)
-                fail_c = len(results) - pass_c
-
+            if subject.students:
                 # Mini stat row
                 stats_row = tk.Frame(card, bg=COLORS["card"])
                 stats_row.pack(fill="x", pady=(10, 0))
 
                 for s_text, s_val, s_fg in [
-                    ("Students",    len(results),           COLORS["text_primary"]),
-                    ("Avg Score",   f"{avg:.1f}%",          COLORS["accent"]),
-                    ("Passed",      f"{pass_c}",            COLORS["success"]),
-                    ("Failed",      f"{fail_c}",            COLORS["danger"]),
+                    ("Students",    subject.students,               COLORS["text_primary"]),
+                    ("Avg Score",   f"{subject.average:.1f}%",      COLORS["accent"]),
+                    ("Passed",      f"{subject.passed}",            COLORS["success"]),
+                    ("Failed",      f"{subject.failed}",            COLORS["danger"]),
+                    ("Lowest",      f"{subject.min_marks:.1f}",     COLORS["text_primary"]),
+                    ("Highest",     f"{subject.max_marks:.1f}",     COLORS["text_primary"]),
                 ]:
                     box = tk.Frame(stats_row, bg=COLORS["bg_light"],
                                    highlightbackground=COLORS["border"],
@@ -119,6 +126,11 @@ class TeacherDashboard(BaseDashboard):
                              bg=COLORS["bg_light"], fg=s_fg).pack()
                     tk.Label(box, text=s_text, font=("Segoe UI", 8),
                              bg=COLORS["bg_light"], fg=COLORS["text_secondary"]).pack()
+
+                grades = "   ".join(f"{g}: {n}" for g, n in subject.grade_counts.items())
+                tk.Label(card, text=f"Grades   {grades}",
+                         font=FONTS["small"], bg=COLORS["card"],
+                         fg=COLORS["text_secondary"]).pack(anchor="w", pady=(8, 0))
             else:
                 tk.Label(card, text="No marks entered yet.",
                          font=FONTS["small"], bg=COLORS["card"],
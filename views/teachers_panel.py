@@ -4,6 +4,8 @@ views/teachers_panel.py - Teacher Management CRUD panel (Admin only)
 import tkinter as tk
 from tkinter import ttk
 from config import COLORS, FONTS
+from utils.query_profiler import profiled
+from utils.table_binding import TableBinding
 from utils.ui_helpers import (
     scrollable_treeview, make_entry, make_label,
     confirm_delete, show_error, show_success, show_info
@@ -11,14 +13,14 @@ from utils.ui_helpers import (
 
 
 class TeachersPanel(tk.Frame):
-    def __init__(self, parent, teacher_svc, subject_svc):
+    def __init__(self, parent, teacher_svc, subject_svc, data=None):
         super().__init__(parent, bg=COLORS["bg_medium"])
         self.teacher_svc = teacher_svc
         self.subject_svc = subject_svc
         self._selected_id = None
         self.pack(fill="both", expand=True)
         self._build()
-        self._load()
+        self._load(data)
 
     def _build(self):
         toolbar = tk.Frame(self, bg=COLORS["bg_medium"], pady=10)
@@ -43,17 +45,20 @@ class TeachersPanel(tk.Frame):
         self.tree.tag_configure("odd", background=COLORS["table_odd"])
         self.tree.tag_configure("even", background=COLORS["table_even"])
         self.tree.bind("<<TreeviewSelect>>", lambda e: self._on_select())
+        self._rows = TableBinding(self.tree, lambda t: (
+            t.id, t.full_name, t.email, t.subject_names or "—",
+            t.created_at.strftime("%Y-%m-%d") if t.created_at else "—",
+        ), striped=True, sortable={
+            "id": "id", "name": "full_name", "email": "email",
+            "subjects": "subject_names", "created": "created_at",
+        })
+
+    @profiled()
+    def _load(self, data=None):
+        self._rows.update(self.teacher_svc.get_all_rows() if data is None else data)
 
-    def _load(self):
-        self.tree.delete(*self.tree.get_children())
-        teachers = self.teacher_svc.get_all()
-        for i, t in enumerate(teachers):
-            subj_names = ", ".join(s.subject_name for s in t.subjects) or "—"
-            tag = "odd" if i % 2 else "even"
-            self.tree.insert("", "end", iid=str(t.id), tags=(tag,), values=(
-                t.id, t.full_name, t.email, subj_names,
-                t.created_at.strftime("%Y-%m-%d"),
-            ))
+    def refresh(self):
+        self._load()
 
     def _on_select(self):
         sel = self.tree.selection()